@@ -0,0 +1,193 @@
+"""
+Pre-provisioned student/company/admin accounts with exclusive leases for the E2E suites
+
+What it does
+- Keeps the pool in .harness/accounts.json:
+	python account_pool.py provision --students 4 --companies 2   # confirmed accounts via GoTrue admin API
+	python account_pool.py add admin <email> <password>           # register an existing login
+- lease(role, fallback) hands a suite one account for its exclusive use. Each lease is a lock
+  file created with O_EXCL, so parallel master.py workers never share an account (one shard's
+  Cancel RSVP would otherwise undo another's RSVP). Locks of dead processes, or older than
+  LEASE_TTL_SEC, are taken over.
+- Without a pool file, or without an account of that role, lease() yields `fallback` (the
+  suite's STUDENT_EMAIL / COMPANY_EMAIL / ADMIN_EMAIL settings) exactly as before
+
+Only the sign-up scripts create accounts through the UI; everything else logs in with a lease.
+
+Environment options (PowerShell)
+- $env:ACCOUNT_POOL_FILE = "...\\accounts.json"
+- $env:LEASE_WAIT_SEC = "300"    # how long to wait for a free account of a role
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Iterator, List
+
+try:
+	import psutil
+except ImportError:  # optional: stale locks then expire by age only
+	psutil = None
+
+from supabase_rest import SupabaseError, SupabaseRest
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ACCOUNT_POOL_FILE = os.getenv("ACCOUNT_POOL_FILE", os.path.join(HERE, ".harness", "accounts.json"))
+LOCK_DIR = os.path.join(os.path.dirname(ACCOUNT_POOL_FILE), "locks")
+LEASE_WAIT_SEC = float(os.getenv("LEASE_WAIT_SEC", "300"))
+LEASE_TTL_SEC = 30 * 60
+LEASE_POLL_SEC = 1.0
+POOL_PASSWORD = "PoolPass123!"
+
+ROLES = ["student", "company", "admin"]
+
+
+@dataclass
+class Account:
+	role: str
+	email: str
+	password: str
+
+
+def load_accounts(path: str = ACCOUNT_POOL_FILE) -> List[Account]:
+	if not os.path.exists(path):
+		return []
+	with open(path, encoding="utf-8") as fh:
+		return [Account(**row) for row in json.load(fh)]
+
+
+def save_accounts(accounts: List[Account], path: str = ACCOUNT_POOL_FILE) -> None:
+	os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+	with open(path, "w", encoding="utf-8") as fh:
+		json.dump([asdict(a) for a in accounts], fh, indent=2)
+
+
+def _lock_path(account: Account) -> str:
+	return os.path.join(LOCK_DIR, re.sub(r"[^A-Za-z0-9._-]+", "_", account.email) + ".lock")
+
+
+def _stale(path: str) -> bool:
+	try:
+		with open(path, encoding="utf-8") as fh:
+			owner = json.load(fh)
+	except (OSError, ValueError):
+		# Half-written by a process that died between create and write
+		try:
+			return time.time() - os.path.getmtime(path) > LEASE_TTL_SEC
+		except OSError:
+			return True
+	if time.time() - owner.get("ts", 0) > LEASE_TTL_SEC:
+		return True
+	return psutil is not None and not psutil.pid_exists(owner.get("pid", 0))
+
+
+def _try_lock(account: Account) -> bool:
+	path = _lock_path(account)
+	os.makedirs(LOCK_DIR, exist_ok=True)
+	for _ in range(2):
+		try:
+			fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+		except FileExistsError:
+			if not _stale(path):
+				return False
+			try:
+				os.remove(path)
+			except OSError:
+				return False
+			continue
+		with os.fdopen(fd, "w", encoding="utf-8") as fh:
+			json.dump({"pid": os.getpid(), "ts": time.time()}, fh)
+		return True
+	return False
+
+
+@contextmanager
+def lease(role: str, fallback: Account) -> Iterator[Account]:
+	"""Exclusive use of one pooled account of `role` for the duration of the with-block."""
+	candidates = [a for a in load_accounts() if a.role == role]
+	if not candidates:
+		yield fallback
+		return
+	deadline = time.time() + LEASE_WAIT_SEC
+	while True:
+		random.shuffle(candidates)
+		for account in candidates:
+			if _try_lock(account):
+				try:
+					yield account
+				finally:
+					try:
+						os.remove(_lock_path(account))
+					except OSError:
+						pass
+				return
+		if time.time() > deadline:
+			raise RuntimeError(f"no free {role} account in {ACCOUNT_POOL_FILE} after {LEASE_WAIT_SEC:.0f}s")
+		time.sleep(LEASE_POLL_SEC)
+
+
+def provision(students: int, companies: int, path: str = ACCOUNT_POOL_FILE) -> List[Account]:
+	"""Add confirmed accounts with their profile (and, for companies, an approved organization)."""
+	client = SupabaseRest()
+	accounts = load_accounts(path)
+	now = datetime.now(timezone.utc).isoformat()
+	for role, count in (("student", students), ("company", companies)):
+		for _ in range(count - sum(1 for a in accounts if a.role == role)):
+			email = f"e2e.{role}+{uuid.uuid4().hex[:10]}@example.edu"
+			full_name = f"E2E {role.title()}"
+			user = client.admin_create_user(email, POOL_PASSWORD, full_name)
+			client.upsert(
+				"profiles",
+				[{"user_id": user["id"], "email": email, "full_name": full_name, "role": role}],
+				on_conflict="user_id",
+			)
+			if role == "company":
+				client.insert("organizations", [{
+					"name": f"E2E Org {email.split('+')[1].split('@')[0]}",
+					"owner_user_id": user["id"],
+					"status": "approved",
+					"approved_at": now,
+				}])
+			accounts.append(Account(role, email, POOL_PASSWORD))
+			print(f"[POOL] {role}: {email}")
+	save_accounts(accounts, path)
+	return accounts
+
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description="Manage the E2E account pool")
+	sub = parser.add_subparsers(dest="command", required=True)
+	prov = sub.add_parser("provision", help="create accounts until the pool has this many per role")
+	prov.add_argument("--students", type=int, default=4)
+	prov.add_argument("--companies", type=int, default=2)
+	add = sub.add_parser("add", help="register an existing account")
+	add.add_argument("role", choices=ROLES)
+	add.add_argument("email")
+	add.add_argument("password")
+	args = parser.parse_args()
+
+	if args.command == "provision":
+		try:
+			accounts = provision(args.students, args.companies)
+		except SupabaseError as e:
+			print(f"[POOL] provisioning needs SUPABASE_URL and the service-role key: {e}")
+			return 1
+	else:
+		accounts = [a for a in load_accounts() if a.email != args.email]
+		accounts.append(Account(args.role, args.email, args.password))
+		save_accounts(accounts)
+	for role in ROLES:
+		print(f"[POOL] {role}: {sum(1 for a in accounts if a.role == role)} account(s)")
+	return 0
+
+
+if __name__ == "__main__":
+	raise SystemExit(main())
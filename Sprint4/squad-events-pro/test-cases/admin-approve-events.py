@@ -10,11 +10,21 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 
+import account_pool
+import backend_replay
+import fixtures
+import harness
+import resources
+import tracing
+import warmup
+from supabase_rest import SupabaseError
+
 APP_BASE_URL = os.getenv("APP_BASE_URL", "http://localhost:5173")
 HEADLESS = os.getenv("HEADLESS", "1")
 QUIET = os.getenv("QUIET", "1")
 ADMIN_EMAIL = os.getenv("ADMIN_EMAIL", "admin")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "admin1")
+ADMIN_FIXTURE_EVENTS = int(os.getenv("ADMIN_FIXTURE_EVENTS", "3"))
 
 def build_driver():
     chrome_options = Options()
@@ -25,10 +35,15 @@ def build_driver():
     chrome_options.add_argument("--disable-gpu")
     if QUIET == "1":
         chrome_options.add_experimental_option("excludeSwitches", ["enable-logging"])
+    warmup.apply_profile(chrome_options)
     service = Service(ChromeDriverManager().install())
-    return webdriver.Chrome(service=service, options=chrome_options)
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+    resources.watch_driver(driver)
+    tracing.watch_driver(driver)
+    backend_replay.watch_driver(driver)
+    return driver
 
-def login(driver):
+def login(driver, account):
     driver.get(APP_BASE_URL)
     time.sleep(1)
     
@@ -38,9 +53,9 @@ def login(driver):
     password_field = driver.find_element(By.CSS_SELECTOR, "input[type='password']")
     
     email_field.clear()
-    email_field.send_keys(ADMIN_EMAIL)
+    email_field.send_keys(account.email)
     password_field.clear()
-    password_field.send_keys(ADMIN_PASSWORD)
+    password_field.send_keys(account.password)
     
     login_button = driver.find_element(By.XPATH, "//button[contains(text(), 'Login') or contains(text(), 'Sign In')]")
     login_button.click()
@@ -89,14 +104,29 @@ def get_pending_events(driver):
         print(f"Error finding pending events: {e}")
         return []
 
-def test_approve_event(driver):
+def take_event(pending, seeded):
+    """Pick the card to act on: one of this run's fixtures if seeded, else the first pending card."""
+    if seeded is None:
+        return pending[0] if pending else None
+    for event in pending:
+        if event['title'] in seeded:
+            event['event_id'] = seeded.pop(event['title'])
+            return event
+    return None
+
+def status_matches(fx, event, expected):
+    if fx is None or not event.get('event_id'):
+        return True
+    return fx.event_status(event['event_id']) == expected
+
+def test_approve_event(driver, seeded=None, fx=None):
     navigate_to_approve_events(driver)
     pending = get_pending_events(driver)
+    event = take_event(pending, seeded)
     
-    if not pending:
-        return True
+    if event is None:
+        return seeded is None
     
-    event = pending[0]
     event['approve_btn'].click()
     time.sleep(2)
     
@@ -104,18 +134,18 @@ def test_approve_event(driver):
         success_toast = WebDriverWait(driver, 5).until(
             EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'approved') or contains(text(), 'Approved') or contains(text(), 'Success')]"))
         )
-        return True
+        return status_matches(fx, event, 'published')
     except:
         return False
 
-def test_reject_event(driver):
+def test_reject_event(driver, seeded=None, fx=None):
     navigate_to_approve_events(driver)
     pending = get_pending_events(driver)
+    event = take_event(pending, seeded)
     
-    if not pending:
-        return True
+    if event is None:
+        return seeded is None
     
-    event = pending[0]
     event['reject_btn'].click()
     time.sleep(2)
     
@@ -123,18 +153,19 @@ def test_reject_event(driver):
         success_toast = WebDriverWait(driver, 5).until(
             EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'rejected') or contains(text(), 'Rejected') or contains(text(), 'Success')]"))
         )
-        return True
+        return status_matches(fx, event, 'rejected')
     except:
         return False
 
-def test_view_event_details(driver):
+def test_view_event_details(driver, seeded=None):
     navigate_to_approve_events(driver)
     pending = get_pending_events(driver)
+    # Viewing does not consume the fixture, so pick from a copy
+    event = take_event(pending, dict(seeded) if seeded is not None else None)
     
-    if not pending:
-        return True
+    if event is None:
+        return seeded is None
     
-    event = pending[0]
     event_title = event['title']
     
     try:
@@ -152,16 +183,32 @@ def test_view_event_details(driver):
     except:
         return False
 
+def seed_fixtures(fx):
+    if not fx.enabled:
+        return None
+    if backend_replay.REPLAYING:
+        # The replayed page only lists the pending events of the recording, not fresh fixtures
+        print("[info] Backend replay: not seeding, acting on the recorded pending events")
+        return None
+    try:
+        return {e['title']: e['event_id'] for e in fx.seed_pending_events(ADMIN_FIXTURE_EVENTS)}
+    except SupabaseError as e:
+        print(f"[warn] Could not seed pending events ({e}); using whatever is pending")
+        return None
+
 def run_all_tests():
     driver = build_driver()
     results = []
+    fx = fixtures.Fixtures()
     
     try:
-        login(driver)
-        
-        results.append(("View event details", test_view_event_details(driver)))
-        results.append(("Approve event", test_approve_event(driver)))
-        results.append(("Reject event", test_reject_event(driver)))
+        seeded = seed_fixtures(fx)
+        with account_pool.lease("admin", account_pool.Account("admin", ADMIN_EMAIL, ADMIN_PASSWORD)) as admin:
+            login(driver, admin)
+            
+            harness.collect(results, "View event details", lambda: test_view_event_details(driver, seeded))
+            harness.collect(results, "Approve event", lambda: test_approve_event(driver, seeded, fx))
+            harness.collect(results, "Reject event", lambda: test_reject_event(driver, seeded, fx))
         
         passed = sum(1 for _, result in results if result)
         failed = len(results) - passed
@@ -186,6 +233,10 @@ def run_all_tests():
         print(f"\n[ERROR] Test suite failed: {e}")
         return False
     finally:
+        try:
+            fx.teardown()
+        except SupabaseError as e:
+            print(f"[warn] Fixture teardown failed: {e}")
         driver.quit()
 
 if __name__ == "__main__":
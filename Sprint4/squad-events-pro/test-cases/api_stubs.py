@@ -0,0 +1,242 @@
+"""
+In-browser Supabase stubs for the client-side validation suites
+
+What it does
+- Intercepts the app's Supabase requests inside Chrome (CDP Fetch.requestPaused on
+  */auth/v1/* and */rest/v1/*) and answers declared routes with canned JSON after
+  STUB_LATENCY_MS, so the sign-up and create-event validation cases run with no backend
+  at all and without backend latency in their timings
+- Routes are (method, path regex) -> rows; PostgREST details the client relies on are
+  filled in: Content-Range for counts, one object for .single() (Accept
+  application/vnd.pgrst.object+json), CORS preflights
+- Anything not declared gets a 501 instead of reaching the network and is reported
+  ([STUBS] line, and an `unstubbed` field on the case in $HARNESS_RESULTS), so a page
+  that starts calling something new shows up instead of hanging on a real request
+- SIGNUP_ROUTES cover the student / organization sign-up pages, COMPANY_ROUTES a company
+  login (canned session, approved organization) through /my-events and /create-event
+
+The scripts turn it on with API_STUBS=1 and then skip their success scenarios, which need
+the real backend. Selenium drivers are stubbed over their own DevTools websocket on a
+background event loop (execute_cdp_cmd cannot receive events); async_driver pages are
+stubbed on their own session.
+
+Environment options (PowerShell)
+- $env:API_STUBS = "1"
+- $env:STUB_LATENCY_MS = "0"      # added before every stubbed answer
+
+Requires: pip install websockets
+"""
+
+import asyncio
+import base64
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import async_driver
+import harness
+
+
+API_STUBS = os.getenv("API_STUBS", "0") == "1"
+STUB_LATENCY_MS = float(os.getenv("STUB_LATENCY_MS", "0"))
+STUB_CDP_TIMEOUT_SEC = 30.0
+URL_PATTERNS = ["*/auth/v1/*", "*/rest/v1/*"]
+NOT_STUBBED_STATUS = 501
+
+STUB_USER_ID = "00000000-0000-4000-8000-000000000341"
+STUB_EMAIL = "stub.user@example.org"
+
+Send = Callable[..., Awaitable[dict]]
+
+
+def _b64url(data: bytes) -> str:
+	return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _user(role: str) -> Dict[str, Any]:
+	return {
+		"id": STUB_USER_ID,
+		"aud": "authenticated",
+		"role": "authenticated",
+		"email": STUB_EMAIL,
+		"email_confirmed_at": "2025-01-01T00:00:00Z",
+		"app_metadata": {"provider": "email", "providers": ["email"]},
+		"user_metadata": {"full_name": "Stub User", "role": role},
+		"created_at": "2025-01-01T00:00:00Z",
+	}
+
+
+def _session(role: str) -> Dict[str, Any]:
+	# supabase-js reads exp/sub from the access token, so it has to look like a JWT
+	exp = int(time.time()) + 3600
+	claims = {"sub": STUB_USER_ID, "email": STUB_EMAIL, "role": "authenticated", "aud": "authenticated", "exp": exp}
+	token = ".".join([_b64url(b'{"alg":"HS256","typ":"JWT"}'), _b64url(json.dumps(claims).encode("utf-8")), "stub"])
+	return {
+		"access_token": token,
+		"token_type": "bearer",
+		"expires_in": 3600,
+		"expires_at": exp,
+		"refresh_token": "stub-refresh-token",
+		"user": _user(role),
+	}
+
+
+@dataclass
+class Route:
+	method: str
+	path: str
+	body: Any = None
+	status: int = 200
+	latency_ms: Optional[float] = None
+	headers: Dict[str, str] = field(default_factory=dict)
+
+	def matches(self, method: str, path: str) -> bool:
+		return self.method == method and re.search(self.path, path) is not None
+
+	def respond(self, accept: str) -> Tuple[int, Any, Dict[str, str]]:
+		body = self.body() if callable(self.body) else self.body
+		headers = dict(self.headers)
+		if isinstance(body, list):
+			if "vnd.pgrst.object" in accept:
+				if len(body) != 1:
+					return 406, {"code": "PGRST116", "message": "JSON object requested, multiple (or no) rows returned",
+						"details": f"The result contains {len(body)} rows", "hint": None}, headers
+				return self.status, body[0], headers
+			headers.setdefault("Content-Range", f"0-{len(body) - 1}/{len(body)}" if body else "*/0")
+		return self.status, body, headers
+
+
+SIGNUP_ROUTES = [
+	Route("POST", r"^/auth/v1/signup$", lambda: _session("student")),
+	Route("GET", r"^/auth/v1/user$", lambda: _user("student")),
+	Route("GET", r"^/rest/v1/profiles$", []),
+	Route("POST", r"^/rest/v1/profiles$", [], status=201),
+	Route("PATCH", r"^/rest/v1/profiles$", []),
+	Route("DELETE", r"^/rest/v1/profiles$", [], status=204),
+	Route("POST", r"^/rest/v1/organization_applications$", [], status=201),
+]
+
+COMPANY_ROUTES = [
+	Route("POST", r"^/auth/v1/token$", lambda: _session("company")),
+	Route("GET", r"^/auth/v1/user$", lambda: _user("company")),
+	Route("POST", r"^/auth/v1/logout$", status=204),
+	Route("GET", r"^/rest/v1/profiles$", [{"user_id": STUB_USER_ID, "full_name": "Stub Org", "role": "company", "avatar_url": None}]),
+	Route("GET", r"^/rest/v1/organization_applications$", [{"status": "approved", "submitted_at": "2025-01-01T00:00:00Z"}]),
+	Route("GET", r"^/rest/v1/(events|starred_events|tickets|registrations|event_registrations|event_counters)$", []),
+	Route("HEAD", r"^/rest/v1/(events|tickets|registrations|event_registrations)$", []),
+]
+
+
+def _header(headers: Dict[str, str], name: str) -> str:
+	for k, v in headers.items():
+		if k.lower() == name:
+			return v
+	return ""
+
+
+class ApiStubs:
+	"""Answers one browser page's paused Supabase requests from `routes`."""
+
+	def __init__(self, routes: List[Route], latency_ms: float = STUB_LATENCY_MS) -> None:
+		self.routes = routes
+		self.latency_ms = latency_ms
+		self.served = 0
+		self.unstubbed: List[str] = []
+		self._case_unstubbed: List[str] = []
+
+	async def enable(self, send: Send, on: Callable[[str, Callable[[dict], Any]], None]) -> None:
+		on("Fetch.requestPaused", lambda params: self._paused(send, params))
+		await send("Fetch.enable", {"patterns": [{"urlPattern": p, "requestStage": "Request"} for p in URL_PATTERNS]})
+
+	def match(self, method: str, path: str) -> Optional[Route]:
+		for route in self.routes:
+			if route.matches(method, path):
+				return route
+		return None
+
+	async def _paused(self, send: Send, params: dict) -> None:
+		request = params["request"]
+		method = request["method"]
+		path = urlsplit(request["url"]).path
+		cors = [
+			{"name": "Access-Control-Allow-Origin", "value": _header(request.get("headers", {}), "origin") or "*"},
+			{"name": "Access-Control-Expose-Headers", "value": "Content-Range"},
+		]
+		reply: Dict[str, Any] = {"requestId": params["requestId"]}
+		if method == "OPTIONS":
+			reply.update(responseCode=204, responseHeaders=cors + [
+				{"name": "Access-Control-Allow-Methods", "value": "GET, POST, PATCH, PUT, DELETE, HEAD"},
+				{"name": "Access-Control-Allow-Headers", "value": _header(request.get("headers", {}), "access-control-request-headers") or "*"},
+			])
+		else:
+			route = self.match(method, path)
+			if route is None:
+				self._note_unstubbed(f"{method} {path}")
+				status, body, headers = NOT_STUBBED_STATUS, {"message": f"{method} {path} is not stubbed"}, {}
+			else:
+				latency = self.latency_ms if route.latency_ms is None else route.latency_ms
+				if latency > 0:
+					await asyncio.sleep(latency / 1000)
+				status, body, headers = route.respond(_header(request.get("headers", {}), "accept"))
+				self.served += 1
+			payload = b"" if body is None or method == "HEAD" else json.dumps(body).encode("utf-8")
+			reply.update(
+				responseCode=status,
+				responseHeaders=cors + [{"name": "Content-Type", "value": "application/json"}]
+					+ [{"name": k, "value": v} for k, v in headers.items()],
+				body=base64.b64encode(payload).decode("ascii"),
+			)
+		try:
+			await send("Fetch.fulfillRequest", reply)
+		except async_driver.CDPError:
+			pass  # the page navigated away or closed meanwhile
+
+	def _note_unstubbed(self, what: str) -> None:
+		if what not in self.unstubbed:
+			print(f"[STUBS] not stubbed: {what}")
+			self.unstubbed.append(what)
+		if what not in self._case_unstubbed:
+			self._case_unstubbed.append(what)
+
+	# harness listener: report what each case asked for that was not declared
+	def case_started(self, _name: str) -> None:
+		self._case_unstubbed = []
+
+	def case_finished(self, _name: str, _ok: bool) -> Dict[str, Any]:
+		return {"unstubbed": list(self._case_unstubbed)} if self._case_unstubbed else {}
+
+
+def watch_driver(drv: Any, routes: List[Route]) -> Optional[ApiStubs]:
+	"""Stub a Selenium Chrome driver's Supabase requests; a no-op unless API_STUBS=1.
+
+	Call it before the first drv.get so no request slips through to the real backend.
+	"""
+	if not API_STUBS:
+		return None
+	if async_driver.websockets is None:
+		raise SystemExit("[STUBS] API_STUBS=1 needs websockets (pip install websockets)")
+	loop = asyncio.new_event_loop()
+	threading.Thread(target=loop.run_forever, name="api-stubs", daemon=True).start()
+
+	def run(coro: Any) -> Any:
+		return asyncio.run_coroutine_threadsafe(coro, loop).result(STUB_CDP_TIMEOUT_SEC)
+
+	conn = run(async_driver.CDPConnection.connect(async_driver.page_ws_url(drv)))
+	stubs = ApiStubs(routes)
+	run(stubs.enable(conn.send, conn.on))
+	harness.add_listener(stubs)
+	return stubs
+
+
+async def stub_page(page: async_driver.AsyncPage, routes: List[Route]) -> Optional[ApiStubs]:
+	"""Same for an async_driver page; call it right after browser.new_page()."""
+	if not API_STUBS:
+		return None
+	stubs = ApiStubs(routes)
+	await stubs.enable(page.send, page.on)
+	return stubs
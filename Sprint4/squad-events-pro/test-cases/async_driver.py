@@ -0,0 +1,367 @@
+"""
+Asyncio browser driver over the Chrome DevTools Protocol (CDP)
+
+What it does
+- Launches Chrome with a DevTools port and talks to it over a single CDP websocket
+- Every page is a flattened CDP session on that websocket, so one event loop can drive
+  dozens of pages concurrently with asyncio.gather (no thread or process per browser)
+- Provides async counterparts of the sign-up helpers: open_signup, fill_form, click_submit
+  and wait_for_any_text
+
+Environment options (PowerShell)
+- $env:APP_BASE_URL = "http://localhost:5173"   # override base URL if needed
+- $env:HEADLESS = "1"                           # run Chrome in headless mode
+- $env:CHROME_BIN = "C:\\...\\chrome.exe"         # Chrome binary (default: first one found on PATH)
+
+Requires: pip install websockets
+
+Example
+	async with await AsyncBrowser.launch() as browser:
+		pages = [await browser.new_page() for _ in range(10)]
+		await asyncio.gather(*(open_signup(p, SIGNUP_URL) for p in pages))
+"""
+
+import asyncio
+import inspect
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import urllib.request
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import warmup
+
+try:
+	import websockets
+except ImportError:  # optional: only the async suites need it
+	websockets = None
+
+
+BASE_URL = os.getenv("APP_BASE_URL", "http://localhost:5173").rstrip("/")
+
+PAGE_WAIT_SEC = 8
+LAUNCH_WAIT_SEC = 20
+POLL_SEC = 0.1
+
+CHROME_CANDIDATES = [
+	"google-chrome",
+	"google-chrome-stable",
+	"chromium",
+	"chromium-browser",
+	"chrome",
+]
+
+
+class CDPError(Exception):
+	pass
+
+
+def find_chrome() -> str:
+	binary = os.getenv("CHROME_BIN")
+	if binary:
+		return binary
+	for name in CHROME_CANDIDATES:
+		path = shutil.which(name)
+		if path:
+			return path
+	raise CDPError("Chrome binary not found; set CHROME_BIN")
+
+
+def page_ws_url(drv: Any) -> str:
+	"""DevTools websocket of a Selenium Chrome driver's page, for a connection of our own."""
+	address = (drv.capabilities.get("goog:chromeOptions") or {}).get("debuggerAddress")
+	if not address:
+		raise CDPError("driver exposes no DevTools address")
+	with urllib.request.urlopen(f"http://{address}/json/list", timeout=5) as resp:
+		targets = json.loads(resp.read())
+	for target in targets:
+		if target.get("type") == "page" and target.get("webSocketDebuggerUrl"):
+			return target["webSocketDebuggerUrl"]
+	raise CDPError("no page target")
+
+
+def heap_from_metrics(result: Dict[str, Any]) -> float:
+	"""Used JS heap in MB from a Performance.getMetrics result."""
+	for metric in result.get("metrics", []):
+		if metric.get("name") == "JSHeapUsedSize":
+			return metric["value"] / (1024 * 1024)
+	return 0.0
+
+
+class CDPConnection:
+	"""One browser websocket; page sessions are multiplexed over it by sessionId."""
+
+	def __init__(self, ws: Any) -> None:
+		self._ws = ws
+		self._ids = itertools.count(1)
+		self._pending: Dict[int, asyncio.Future] = {}
+		self._listeners: Dict[Tuple[Optional[str], str], List[Callable[[dict], Any]]] = {}
+		self._reader = asyncio.get_running_loop().create_task(self._read_loop())
+
+	@classmethod
+	async def connect(cls, ws_url: str) -> "CDPConnection":
+		if websockets is None:
+			raise CDPError("websockets is not installed (pip install websockets)")
+		ws = await websockets.connect(ws_url, max_size=None, ping_interval=None)
+		return cls(ws)
+
+	async def send(self, method: str, params: Optional[dict] = None, session_id: Optional[str] = None) -> dict:
+		msg_id = next(self._ids)
+		msg: Dict[str, Any] = {"id": msg_id, "method": method, "params": params or {}}
+		if session_id:
+			msg["sessionId"] = session_id
+		fut = asyncio.get_running_loop().create_future()
+		self._pending[msg_id] = fut
+		await self._ws.send(json.dumps(msg))
+		return await fut
+
+	def on(self, method: str, callback: Callable[[dict], Any], session_id: Optional[str] = None) -> None:
+		self._listeners.setdefault((session_id, method), []).append(callback)
+
+	def off(self, method: str, callback: Callable[[dict], Any], session_id: Optional[str] = None) -> None:
+		callbacks = self._listeners.get((session_id, method), [])
+		if callback in callbacks:
+			callbacks.remove(callback)
+
+	async def _read_loop(self) -> None:
+		try:
+			async for raw in self._ws:
+				msg = json.loads(raw)
+				if "id" in msg:
+					fut = self._pending.pop(msg["id"], None)
+					if fut is None or fut.done():
+						continue
+					if "error" in msg:
+						fut.set_exception(CDPError(msg["error"].get("message", str(msg["error"]))))
+					else:
+						fut.set_result(msg.get("result", {}))
+					continue
+				key = (msg.get("sessionId"), msg.get("method", ""))
+				for callback in list(self._listeners.get(key, [])):
+					res = callback(msg.get("params", {}))
+					if inspect.isawaitable(res):
+						asyncio.ensure_future(res)
+		except Exception:
+			pass
+		finally:
+			for fut in self._pending.values():
+				if not fut.done():
+					fut.set_exception(CDPError("CDP connection closed"))
+			self._pending.clear()
+
+	async def close(self) -> None:
+		try:
+			await self._ws.close()
+		finally:
+			self._reader.cancel()
+
+
+class AsyncPage:
+	def __init__(self, conn: CDPConnection, target_id: str, session_id: str) -> None:
+		self.conn = conn
+		self.target_id = target_id
+		self.session_id = session_id
+
+	async def send(self, method: str, params: Optional[dict] = None) -> dict:
+		return await self.conn.send(method, params, self.session_id)
+
+	def on(self, method: str, callback: Callable[[dict], Any]) -> None:
+		self.conn.on(method, callback, self.session_id)
+
+	def off(self, method: str, callback: Callable[[dict], Any]) -> None:
+		self.conn.off(method, callback, self.session_id)
+
+	async def goto(self, url: str, timeout: float = PAGE_WAIT_SEC) -> None:
+		loaded = asyncio.get_running_loop().create_future()
+
+		def on_load(_params: dict) -> None:
+			if not loaded.done():
+				loaded.set_result(True)
+
+		self.on("Page.loadEventFired", on_load)
+		try:
+			await self.send("Page.navigate", {"url": url})
+			await asyncio.wait_for(loaded, timeout)
+		finally:
+			self.off("Page.loadEventFired", on_load)
+
+	async def evaluate(self, expression: str, await_promise: bool = False) -> Any:
+		res = await self.send(
+			"Runtime.evaluate",
+			{"expression": expression, "returnByValue": True, "awaitPromise": await_promise},
+		)
+		if "exceptionDetails" in res:
+			details = res["exceptionDetails"]
+			text = details.get("exception", {}).get("description") or details.get("text")
+			raise CDPError(f"evaluate failed: {text}")
+		return res.get("result", {}).get("value")
+
+	async def call(self, function_source: str, *args: Any, await_promise: bool = False) -> Any:
+		"""Run a JS function with JSON-serialisable arguments and return its value."""
+		arg_list = ", ".join(json.dumps(a) for a in args)
+		return await self.evaluate(f"({function_source})({arg_list})", await_promise=await_promise)
+
+	async def wait_for(self, expression: str, timeout: float) -> bool:
+		end = time.time() + timeout
+		while time.time() < end:
+			try:
+				if await self.evaluate(expression):
+					return True
+			except CDPError:
+				pass
+			await asyncio.sleep(POLL_SEC)
+		return False
+
+	async def close(self) -> None:
+		try:
+			await self.conn.send("Target.closeTarget", {"targetId": self.target_id})
+		except CDPError:
+			pass
+
+
+class AsyncBrowser:
+	def __init__(self, proc: asyncio.subprocess.Process, conn: CDPConnection, profile_dir: str) -> None:
+		self.proc = proc
+		self.conn = conn
+		self.profile_dir = profile_dir
+		self.pages: List[AsyncPage] = []
+
+	@classmethod
+	async def launch(cls, headless: Optional[bool] = None, extra_args: Optional[List[str]] = None) -> "AsyncBrowser":
+		if headless is None:
+			headless = os.getenv("HEADLESS", "1") == "1"
+		profile_dir = warmup.clone_profile() or tempfile.mkdtemp(prefix="async-chrome-")
+		args = [
+			find_chrome(),
+			"--remote-debugging-port=0",
+			f"--user-data-dir={profile_dir}",
+			"--no-first-run",
+			"--no-default-browser-check",
+			"--window-size=1280,900",
+			"--disable-gpu",
+			"--no-sandbox",
+		]
+		if headless:
+			args.append("--headless=new")
+		args.extend(extra_args or [])
+		args.append("about:blank")
+		proc = await asyncio.create_subprocess_exec(
+			*args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+		)
+
+		# Chrome writes "<port>\n<browser ws path>" once DevTools is listening
+		port_file = os.path.join(profile_dir, "DevToolsActivePort")
+		end = time.time() + LAUNCH_WAIT_SEC
+		lines: List[str] = []
+		while time.time() < end:
+			if proc.returncode is not None:
+				break
+			try:
+				with open(port_file, encoding="utf-8") as fh:
+					lines = fh.read().split()
+			except OSError:
+				lines = []
+			if len(lines) >= 2:
+				break
+			await asyncio.sleep(0.05)
+		if len(lines) < 2:
+			proc.kill()
+			shutil.rmtree(profile_dir, ignore_errors=True)
+			raise CDPError("Chrome did not expose a DevTools port")
+
+		conn = await CDPConnection.connect(f"ws://127.0.0.1:{lines[0]}{lines[1]}")
+		return cls(proc, conn, profile_dir)
+
+	async def new_page(self) -> AsyncPage:
+		target = await self.conn.send("Target.createTarget", {"url": "about:blank"})
+		attached = await self.conn.send(
+			"Target.attachToTarget", {"targetId": target["targetId"], "flatten": True}
+		)
+		page = AsyncPage(self.conn, target["targetId"], attached["sessionId"])
+		await page.send("Page.enable")
+		await page.send("Performance.enable")
+		self.pages.append(page)
+		return page
+
+	async def js_heap_used(self) -> float:
+		"""Used JS heap in MB, summed over the pages that are still open."""
+		total = 0.0
+		for page in list(self.pages):
+			try:
+				metrics = await page.send("Performance.getMetrics")
+			except CDPError:
+				self.pages.remove(page)
+				continue
+			total += heap_from_metrics(metrics)
+		return total
+
+	async def close(self) -> None:
+		try:
+			await self.conn.send("Browser.close")
+		except CDPError:
+			pass
+		await self.conn.close()
+		try:
+			await asyncio.wait_for(self.proc.wait(), 5)
+		except asyncio.TimeoutError:
+			self.proc.kill()
+		shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+	async def __aenter__(self) -> "AsyncBrowser":
+		return self
+
+	async def __aexit__(self, *_exc: Any) -> None:
+		await self.close()
+
+
+# React tracks input values through the native setter; assigning el.value directly is ignored
+CLEAR_FIELD_JS = """
+(id, keepRequired) => {
+	const el = document.getElementById(id);
+	if (!el) throw new Error('No element with id ' + id);
+	const proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+	Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, '');
+	el.dispatchEvent(new Event('input', { bubbles: true }));
+	if (!keepRequired) el.removeAttribute('required');
+	el.focus();
+	return true;
+}
+"""
+
+
+async def open_signup(page: AsyncPage, url: str, ready_id: str = "email") -> None:
+	await page.goto(url)
+	ready = await page.wait_for(f"!!document.getElementById({json.dumps(ready_id)})", PAGE_WAIT_SEC)
+	if not ready:
+		raise TimeoutError(f"#{ready_id} did not appear on {url}")
+
+
+async def fill_form(page: AsyncPage, values: Dict[str, str]) -> None:
+	"""Fill fields by id; empty values drop `required` like the Selenium fill_form."""
+	for field_id, value in values.items():
+		await page.call(CLEAR_FIELD_JS, field_id, bool(value))
+		if value:
+			# insertText goes through the same input pipeline as typing
+			await page.send("Input.insertText", {"text": value})
+
+
+async def click_submit(page: AsyncPage) -> None:
+	await page.evaluate("document.querySelector(\"button[type='submit']\").click()")
+
+
+async def wait_for_any_text(page: AsyncPage, texts: List[str], timeout: float) -> Optional[str]:
+	end = time.time() + timeout
+	while time.time() < end:
+		found = await page.call(
+			"(texts) => { const body = document.body ? document.body.textContent : ''; "
+			"return texts.find(t => body.includes(t)) || null; }",
+			texts,
+		)
+		if found:
+			return found
+		await asyncio.sleep(POLL_SEC)
+	return None
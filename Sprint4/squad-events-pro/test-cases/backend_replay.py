@@ -0,0 +1,395 @@
+"""
+Record/replay stand-in for the Supabase backend of the E2E scripts
+
+What it does
+- Runs a local HTTP server that the app uses as its Supabase URL (master.py --backend
+  bakes it into the preview build as VITE_SUPABASE_URL)
+- record: forwards every app request to the real SUPABASE_URL and keeps the exchange;
+  at the end of the run each script that passed gets a HAR file in .harness/har/, so a
+  fixture only ever comes from a green run
+- replay: answers from those HAR files without any network, matching on method, path,
+  query and body after normalization (uuids, timestamps and the tagged e-mail counters
+  of fixtures.tagged_email are masked), in recorded order when the same request repeats
+- Credentials never reach a fixture: auth headers are dropped, and the password,
+  access_token and refresh_token fields of JSON bodies are redacted in both directions
+  (access tokens keep their header and claims, which supabase-js reads, but lose the
+  signature); replay matching redacts the live request the same way
+- Requests with no recorded match get a 599 and are reported as drift (stdout and
+  .harness/har/drift.json): the app now asks something the fixture never saw
+- watch_driver(drv) tags a script's browser requests with the script name (CDP
+  Network.setExtraHTTPHeaders) so exchanges are filed per script; untagged ones (async
+  suites) go to _shared.har, which replay also consults
+
+Realtime websockets are not recorded; pages fall back to their initial fetches. The
+scripts' own Python calls (fixtures, supabase_rest) still go to the real backend, so
+fixture titles and ids differ from run to run and can never match a recording. Scripts
+therefore do not seed in replay mode (check REPLAYING) and act on whatever the recorded
+pages list instead, the way they already do when seeding is unavailable; checks against
+the real database are skipped along with the seeding, since only seeded rows carry ids.
+
+Environment options (PowerShell)
+- $env:BACKEND_MODE = "replay"         # "record" / "replay"; set by master.py --backend
+- $env:BACKEND_PORT = "54399"          # fixed, so the preview build can be reused
+- $env:HAR_DIR = "...\\har"            # default: test-cases\\.harness\\har
+
+Usage
+- python master.py --backend record    (once, against a working backend)
+- python master.py --backend replay
+- python backend_replay.py serve --mode replay   (then: $env:VITE_SUPABASE_URL =
+  "http://127.0.0.1:54399"; npm run dev; and run a script with $env:BACKEND_MODE set)
+"""
+
+import argparse
+import base64
+import http.server
+import json
+import os
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import harness
+from fixtures import EMAIL_TAG
+from supabase_rest import SUPABASE_URL
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BACKEND_MODE = os.getenv("BACKEND_MODE", "")
+REPLAYING = BACKEND_MODE == "replay"
+BACKEND_PORT = int(os.getenv("BACKEND_PORT", "54399"))
+HAR_DIR = os.getenv("HAR_DIR", os.path.join(HERE, ".harness", "har"))
+MODES = ("record", "replay")
+SCRIPT_HEADER = "X-E2E-Script"
+SHARED = "_shared"
+UPSTREAM_TIMEOUT_SEC = 30
+DRIFT_STATUS = 599
+
+# Masked before matching so a replay run's fresh ids and clocks still hit the fixture
+VOLATILE = [
+	(re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.I), "<uuid>"),
+	(re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?"), "<time>"),
+	(re.compile(re.escape(EMAIL_TAG) + r"\d+"), EMAIL_TAG + "<n>"),
+]
+# Never written to a fixture
+SECRET_HEADERS = {"authorization", "apikey", "cookie", "set-cookie"}
+SECRET_FIELDS = {"password", "access_token", "refresh_token"}
+REDACTED = "<redacted>"
+HOP_HEADERS = {"connection", "keep-alive", "transfer-encoding", "content-length", "content-encoding", "host", "upgrade"}
+EXPOSE_HEADERS = "Content-Range, Content-Profile, Preference-Applied, X-Supabase-Api-Version"
+
+Key = Tuple[str, str, str, str]
+
+
+def _mask(text: str) -> str:
+	for pattern, placeholder in VOLATILE:
+		text = pattern.sub(placeholder, text)
+	return text
+
+
+def _redact(data: Any) -> Any:
+	if isinstance(data, list):
+		return [_redact(v) for v in data]
+	if not isinstance(data, dict):
+		return data
+	out = {}
+	for key, value in data.items():
+		if key not in SECRET_FIELDS or not isinstance(value, str) or not value:
+			out[key] = _redact(value)
+		elif key == "access_token" and value.count(".") == 2:
+			# A JWT: supabase-js decodes exp/sub from the claims, only the signature is secret
+			out[key] = value.rsplit(".", 1)[0] + "." + REDACTED
+		else:
+			out[key] = REDACTED
+	return out
+
+
+def redact_body(body: bytes) -> bytes:
+	"""body with SECRET_FIELDS redacted anywhere in its JSON; anything else unchanged."""
+	try:
+		data = json.loads(body)
+	except ValueError:
+		return body
+	redacted = _redact(data)
+	return body if redacted == data else json.dumps(redacted).encode("utf-8")
+
+
+def normalize_body(body: bytes) -> str:
+	if not body:
+		return ""
+	text = body.decode("utf-8", errors="replace")
+	try:
+		text = json.dumps(_redact(json.loads(text)), sort_keys=True, separators=(",", ":"))
+	except ValueError:
+		pass
+	return _mask(text)
+
+
+def match_key(method: str, target: str, body: bytes) -> Key:
+	parts = urlsplit(target)
+	query = "&".join(f"{k}={v}" for k, v in sorted(parse_qsl(parts.query, keep_blank_values=True)))
+	return method.upper(), _mask(parts.path), _mask(query), normalize_body(body)
+
+
+def _safe_name(name: str) -> str:
+	return re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("_") or SHARED
+
+
+def _har_headers(headers: Iterable[Tuple[str, str]]) -> List[Dict[str, str]]:
+	return [{"name": k, "value": v} for k, v in headers if k.lower() not in SECRET_HEADERS]
+
+
+def _content(body: bytes, mime: str) -> Dict[str, Any]:
+	try:
+		return {"size": len(body), "mimeType": mime, "text": body.decode("utf-8")}
+	except UnicodeDecodeError:
+		return {"size": len(body), "mimeType": mime, "text": base64.b64encode(body).decode("ascii"), "encoding": "base64"}
+
+
+def _content_bytes(content: Dict[str, Any]) -> bytes:
+	text = content.get("text", "")
+	return base64.b64decode(text) if content.get("encoding") == "base64" else text.encode("utf-8")
+
+
+def watch_driver(drv: Any) -> None:
+	"""File this script's backend requests under its own name; a no-op without BACKEND_MODE."""
+	if BACKEND_MODE not in MODES:
+		return
+	try:
+		drv.execute_cdp_cmd("Network.enable", {})
+		drv.execute_cdp_cmd("Network.setExtraHTTPHeaders", {"headers": {SCRIPT_HEADER: harness.SCRIPT}})
+	except Exception as e:
+		print(f"[BACKEND] could not tag requests, they go to {SHARED}: {e}")
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"
+
+	def do_OPTIONS(self) -> None:
+		# Preflights (the script header makes every request one) never reach Supabase
+		self.send_response(204)
+		self._cors()
+		self.send_header("Access-Control-Allow-Methods", "GET, POST, PATCH, PUT, DELETE, HEAD, OPTIONS")
+		self.send_header("Access-Control-Allow-Headers", self.headers.get("Access-Control-Request-Headers", "*"))
+		self.send_header("Access-Control-Max-Age", "86400")
+		self.send_header("Content-Length", "0")
+		self.end_headers()
+
+	def do_GET(self) -> None:
+		if self.headers.get("Upgrade", "").lower() == "websocket":
+			self._reply(501, [("Content-Type", "text/plain")], b"realtime is not recorded")
+			return
+		length = int(self.headers.get("Content-Length") or 0)
+		body = self.rfile.read(length) if length else b""
+		script = self.headers.get(SCRIPT_HEADER) or SHARED
+		status, headers, payload = self.server.backend.handle(script, self.command, self.path, list(self.headers.items()), body)
+		self._reply(status, headers, payload)
+
+	do_POST = do_PATCH = do_PUT = do_DELETE = do_HEAD = do_GET
+
+	def _cors(self) -> None:
+		self.send_header("Access-Control-Allow-Origin", self.headers.get("Origin", "*"))
+		self.send_header("Access-Control-Expose-Headers", EXPOSE_HEADERS)
+		self.send_header("Vary", "Origin")
+
+	def _reply(self, status: int, headers: List[Tuple[str, str]], payload: bytes) -> None:
+		self.send_response(status)
+		for k, v in headers:
+			if k.lower() not in HOP_HEADERS and not k.lower().startswith("access-control-"):
+				self.send_header(k, v)
+		self._cors()
+		self.send_header("Content-Length", str(len(payload)))
+		self.end_headers()
+		if self.command != "HEAD":
+			self.wfile.write(payload)
+
+	def log_message(self, format: str, *args: Any) -> None:
+		pass
+
+
+class BackendReplay:
+	def __init__(self, mode: str, har_dir: str = HAR_DIR, port: int = BACKEND_PORT, upstream: str = SUPABASE_URL) -> None:
+		if mode not in MODES:
+			raise ValueError(f"mode must be one of {MODES}, not {mode!r}")
+		if mode == "record" and not upstream:
+			raise SystemExit("[BACKEND] record mode needs SUPABASE_URL (see supabase_rest.py)")
+		self.mode = mode
+		self.har_dir = har_dir
+		self.upstream = upstream.rstrip("/")
+		self.recorded: Dict[str, List[Dict[str, Any]]] = {}
+		self.drift: List[Dict[str, Any]] = []
+		self._index: Dict[str, Dict[Key, List[Dict[str, Any]]]] = {}
+		self._lock = threading.Lock()
+		self._httpd = http.server.ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+		self._httpd.daemon_threads = True
+		self._httpd.backend = self  # type: ignore[attr-defined]
+		self._thread: Optional[threading.Thread] = None
+		if mode == "replay":
+			self._load()
+
+	@property
+	def url(self) -> str:
+		return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+	def start(self) -> "BackendReplay":
+		self._thread = threading.Thread(target=self._httpd.serve_forever, name="backend-replay", daemon=True)
+		self._thread.start()
+		entries = sum(len(v) for per_key in self._index.values() for v in per_key.values())
+		loaded = f", {entries} recorded exchanges" if self.mode == "replay" else ""
+		print(f"[BACKEND] {self.mode} at {self.url}{loaded}")
+		return self
+
+	def stop(self) -> None:
+		self._httpd.shutdown()
+		self._httpd.server_close()
+
+	def __enter__(self) -> "BackendReplay":
+		return self.start()
+
+	def __exit__(self, *_exc: Any) -> None:
+		self.stop()
+
+	def handle(self, script: str, method: str, target: str, headers: List[Tuple[str, str]], body: bytes) -> Tuple[int, List[Tuple[str, str]], bytes]:
+		if self.mode == "record":
+			return self._forward(script, method, target, headers, body)
+		return self._replay(script, method, target, body)
+
+	def _forward(self, script: str, method: str, target: str, headers: List[Tuple[str, str]], body: bytes) -> Tuple[int, List[Tuple[str, str]], bytes]:
+		sent = [(k, v) for k, v in headers if k.lower() not in HOP_HEADERS and k.lower() not in ("accept-encoding", SCRIPT_HEADER.lower())]
+		req = urllib.request.Request(self.upstream + target, data=body or None, headers=dict(sent), method=method)
+		start = time.perf_counter()
+		try:
+			with urllib.request.urlopen(req, timeout=UPSTREAM_TIMEOUT_SEC) as resp:
+				status, reason, resp_headers, payload = resp.status, resp.reason, list(resp.headers.items()), resp.read()
+		except urllib.error.HTTPError as e:
+			status, reason, resp_headers, payload = e.code, e.reason, list(e.headers.items()), e.read()
+		except (urllib.error.URLError, OSError) as e:
+			return 502, [("Content-Type", "text/plain")], f"upstream unreachable: {e}".encode("utf-8")
+		elapsed = (time.perf_counter() - start) * 1000
+		parts = urlsplit(target)
+		resp_headers = [(k, v) for k, v in resp_headers if k.lower() not in HOP_HEADERS]
+		mime = dict((k.lower(), v) for k, v in resp_headers).get("content-type", "")
+		entry: Dict[str, Any] = {
+			"startedDateTime": datetime.now(timezone.utc).isoformat(),
+			"time": round(elapsed, 1),
+			"request": {
+				"method": method,
+				"url": target,
+				"httpVersion": "HTTP/1.1",
+				"headers": _har_headers(sent),
+				"queryString": [{"name": k, "value": v} for k, v in parse_qsl(parts.query, keep_blank_values=True)],
+				"postData": {"mimeType": dict((k.lower(), v) for k, v in sent).get("content-type", ""), "text": redact_body(body).decode("utf-8", errors="replace")},
+			},
+			"response": {
+				"status": status,
+				"statusText": reason,
+				"httpVersion": "HTTP/1.1",
+				"headers": _har_headers(resp_headers),
+				"content": _content(redact_body(payload), mime),
+			},
+		}
+		with self._lock:
+			self.recorded.setdefault(script, []).append(entry)
+		return status, resp_headers, payload
+
+	def _replay(self, script: str, method: str, target: str, body: bytes) -> Tuple[int, List[Tuple[str, str]], bytes]:
+		key = match_key(method, target, body)
+		with self._lock:
+			for name in (script, SHARED):
+				queue = self._index.get(name, {}).get(key)
+				if queue:
+					# Repeated requests (polling, refetches) walk the recording, then stay on its last answer
+					entry = queue.pop(0) if len(queue) > 1 else queue[0]
+					break
+			else:
+				self.drift.append({"script": script, "method": key[0], "path": key[1], "query": key[2], "body": key[3]})
+				entry = None
+		if entry is None:
+			payload = json.dumps({"message": "no recorded exchange", "key": list(key)}).encode("utf-8")
+			return DRIFT_STATUS, [("Content-Type", "application/json")], payload
+		response = entry["response"]
+		headers = [(h["name"], h["value"]) for h in response["headers"]]
+		return response["status"], headers, _content_bytes(response["content"])
+
+	def _load(self) -> None:
+		if not os.path.isdir(self.har_dir):
+			return
+		for name in sorted(os.listdir(self.har_dir)):
+			if not name.endswith(".har"):
+				continue
+			with open(os.path.join(self.har_dir, name), encoding="utf-8") as fh:
+				entries = json.load(fh)["log"]["entries"]
+			per_key: Dict[Key, List[Dict[str, Any]]] = {}
+			for entry in entries:
+				req = entry["request"]
+				body = req.get("postData", {}).get("text", "").encode("utf-8")
+				per_key.setdefault(match_key(req["method"], req["url"], body), []).append(entry)
+			self._index[name[:-len(".har")]] = per_key
+
+	def save(self, scripts: Optional[Iterable[str]] = None) -> List[str]:
+		"""Write one HAR per recorded script; `scripts` limits it to those (the green ones)."""
+		keep = None if scripts is None else {_safe_name(s) for s in scripts} | {SHARED}
+		os.makedirs(self.har_dir, exist_ok=True)
+		paths = []
+		with self._lock:
+			recorded = dict(self.recorded)
+		for script, entries in sorted(recorded.items()):
+			name = _safe_name(script)
+			if keep is not None and name not in keep:
+				print(f"[BACKEND] not saving {script}: it did not pass")
+				continue
+			path = os.path.join(self.har_dir, f"{name}.har")
+			har = {"log": {"version": "1.2", "creator": {"name": "backend_replay.py", "version": "1"}, "entries": entries}}
+			with open(path, "w", encoding="utf-8") as fh:
+				json.dump(har, fh, indent=1)
+			paths.append(path)
+		return paths
+
+	def report_drift(self) -> str:
+		path = os.path.join(self.har_dir, "drift.json")
+		os.makedirs(self.har_dir, exist_ok=True)
+		with self._lock:
+			drift = list(self.drift)
+		with open(path, "w", encoding="utf-8") as fh:
+			json.dump(drift, fh, indent=2)
+		for d in drift[:20]:
+			print(f"[DRIFT] {d['script']}: {d['method']} {d['path']}?{d['query']} {d['body'][:120]}")
+		if len(drift) > 20:
+			print(f"[DRIFT] ... {len(drift) - 20} more in {path}")
+		return path
+
+	def finish(self, green_scripts: Optional[Iterable[str]] = None) -> None:
+		"""End of run: save fixtures of the scripts that passed, or report drift."""
+		if self.mode == "record":
+			paths = self.save(green_scripts)
+			print(f"[BACKEND] recorded {sum(len(v) for v in self.recorded.values())} exchanges into {len(paths)} HAR file(s) in {self.har_dir}")
+		else:
+			path = self.report_drift()
+			print(f"[BACKEND] {len(self.drift)} unmatched request(s); details in {path}")
+
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description="Record or replay the app's Supabase traffic")
+	sub = parser.add_subparsers(dest="cmd", required=True)
+	p_serve = sub.add_parser("serve", help="run until Ctrl+C, then save (record) or report drift (replay)")
+	p_serve.add_argument("--mode", choices=MODES, default=BACKEND_MODE or "replay")
+	p_serve.add_argument("--port", type=int, default=BACKEND_PORT)
+	args = parser.parse_args()
+
+	with BackendReplay(args.mode, port=args.port) as backend:
+		try:
+			while True:
+				time.sleep(1)
+		except KeyboardInterrupt:
+			pass
+		# Standalone there is no pass/fail to go by: everything recorded is kept
+		backend.finish()
+	return 0
+
+
+if __name__ == "__main__":
+	raise SystemExit(main())
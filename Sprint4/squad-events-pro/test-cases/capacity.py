@@ -0,0 +1,105 @@
+"""
+Worker count and launch throttling for master.py
+
+What it does
+- auto_workers() picks concurrency from CPU cores, available memory and each script's
+  historical peak RSS (recorded by resources.py, kept in the timing cache)
+- LaunchGate holds back a new script process while system memory is under pressure,
+  but never the first one, so a run always makes progress
+
+Environment options (PowerShell)
+- $env:CORES_PER_WORKER = "1.5"     # CPU budget of one Chrome + chromedriver
+- $env:WORKER_MEMORY_MB = "700"     # peak RSS assumed for scripts without history
+- $env:MEMORY_RESERVE_PCT = "15"    # share of RAM kept free for the app under test / OS
+
+Memory figures come from psutil when installed, else from sysconf (Linux).
+"""
+
+import os
+import threading
+import time
+from typing import List, Optional, Tuple
+
+try:
+	import psutil
+except ImportError:  # optional: falls back to sysconf
+	psutil = None
+
+from scheduling import TimingCache
+
+
+CORES_PER_WORKER = float(os.getenv("CORES_PER_WORKER", "1.5"))
+WORKER_MEMORY_MB = float(os.getenv("WORKER_MEMORY_MB", "700"))
+MEMORY_RESERVE_PCT = float(os.getenv("MEMORY_RESERVE_PCT", "15"))
+GATE_POLL_SEC = 1.0
+
+MB = 1024 * 1024
+
+
+def memory_mb() -> Tuple[Optional[float], Optional[float]]:
+	"""(available, total) in MB, or (None, None) when unknown."""
+	if psutil is not None:
+		vm = psutil.virtual_memory()
+		return vm.available / MB, vm.total / MB
+	try:
+		page = os.sysconf("SC_PAGE_SIZE")
+		return os.sysconf("SC_AVPHYS_PAGES") * page / MB, os.sysconf("SC_PHYS_PAGES") * page / MB
+	except (AttributeError, ValueError, OSError):
+		return None, None
+
+
+def reserve_mb(total: float) -> float:
+	return total * MEMORY_RESERVE_PCT / 100
+
+
+def script_memory_mb(cache: TimingCache, script: str) -> float:
+	return cache.peak_rss(script) or WORKER_MEMORY_MB
+
+
+def auto_workers(cache: TimingCache, scripts: List[str]) -> Tuple[int, str]:
+	"""Concurrency for this machine, with a short explanation for the log."""
+	cores = os.cpu_count() or 1
+	by_cpu = max(1, int(cores / CORES_PER_WORKER))
+	available, total = memory_mb()
+	if available is None or total is None:
+		return by_cpu, f"{cores} cores, memory unknown"
+	# Size for the heaviest scripts running side by side (shards of one script repeat it)
+	per_worker = sorted((script_memory_mb(cache, s) for s in scripts), reverse=True)
+	budget = available - reserve_mb(total)
+	by_memory = 0
+	while by_memory < by_cpu and budget >= per_worker[by_memory % len(per_worker)]:
+		budget -= per_worker[by_memory % len(per_worker)]
+		by_memory += 1
+	workers = max(1, min(by_cpu, by_memory))
+	reason = (
+		f"{cores} cores -> {by_cpu}, {available:.0f} MB free -> {by_memory} "
+		f"(heaviest script {per_worker[0]:.0f} MB)"
+	)
+	return workers, reason
+
+
+class LaunchGate:
+	"""Delays launches while free memory minus the unit's expected peak drops below the reserve."""
+
+	def __init__(self) -> None:
+		self._cond = threading.Condition()
+		self._running = 0
+
+	def acquire(self, expected_mb: float) -> float:
+		"""Blocks until the unit may start; returns the seconds spent waiting."""
+		start = time.time()
+		with self._cond:
+			while self._running > 0:
+				available, total = memory_mb()
+				if available is None or total is None:
+					break
+				if available - expected_mb >= reserve_mb(total):
+					break
+				self._cond.wait(GATE_POLL_SEC)
+			self._running += 1
+		return time.time() - start
+
+	def release(self) -> None:
+		with self._cond:
+			self._running -= 1
+			self._cond.notify_all()
@@ -0,0 +1,249 @@
+"""
+Door check-in benchmark for the Scan page (db.validateAndCheckInTicket)
+
+What it does
+- Seeds one large event in the bench schema with DOOR_TICKETS tickets (QR_door_<n>), on
+  top of BENCH_TICKETS background tickets so the qr_code lookup sees a realistic table
+- Feeds a scan stream at SCAN_RATE scans per second to SCANNERS door scanners, each with
+  its own connection, doing exactly what validateAndCheckInTicket does: look the ticket
+  up by qr_code + event joined to events, check the organizer, return "Already checked
+  in" if set, otherwise update is_checked_in / checked_in_at by ticket_id
+- The stream mixes first scans with DUPLICATE_SHARE re-scans (half of them sent to two
+  scanners at the same instant, the guest waved at two doors) and INVALID_SHARE unknown
+  or other-event QR codes
+- Reports scans per second, p50/p95/p99 service time and door latency (queueing
+  included), and the anomalies: tickets reported "Check-in successful" more than once,
+  and rows whose final state disagrees with the scans that succeeded
+- --atomic runs the same stream through a single conditional
+  `update ... where not is_checked_in returning`, for comparison
+
+Output: a table on stdout and .harness\\bench\\checkin.json.
+
+Environment options (PowerShell)
+- $env:SCANNERS = "6"
+- $env:SCAN_RATE = "50"
+- $env:DOOR_TICKETS = "5000"
+- $env:DUPLICATE_SHARE = "0.1"
+- $env:INVALID_SHARE = "0.05"
+- see pg_bench.py for DATABASE_URL / BENCH_SCHEMA
+"""
+
+import argparse
+import os
+import queue
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import pg_bench
+
+
+SCANNERS = int(os.getenv("SCANNERS", "6"))
+SCAN_RATE = float(os.getenv("SCAN_RATE", "50"))
+DOOR_TICKETS = int(os.getenv("DOOR_TICKETS", "5000"))
+DUPLICATE_SHARE = float(os.getenv("DUPLICATE_SHARE", "0.1"))
+INVALID_SHARE = float(os.getenv("INVALID_SHARE", "0.05"))
+BENCH_EVENTS = 20000
+BENCH_TICKETS = 200000
+DOOR_EVENT_TITLE = "Bench door event"
+
+# Same select as validateAndCheckInTicket (tickets inner-joined to events)
+LOOKUP_SQL = """
+select t.ticket_id, t.event_id, t.is_checked_in, t.checked_in_at, t.qr_code, e.created_by, e.title
+from tickets t join events e on e.event_id = t.event_id
+where t.qr_code = %(qr)s and t.event_id = %(event_id)s
+"""
+CHECK_IN_SQL = "update tickets set is_checked_in = true, checked_in_at = now() where ticket_id = %(ticket_id)s"
+ATOMIC_SQL = """
+update tickets t set is_checked_in = true, checked_in_at = now()
+from events e
+where e.event_id = t.event_id and t.qr_code = %(qr)s and t.event_id = %(event_id)s
+	and e.created_by = %(organizer)s and not t.is_checked_in
+returning t.ticket_id
+"""
+
+SUCCESS = "Check-in successful"
+ALREADY = "Already checked in"
+NOT_FOUND = "Ticket not found"
+NOT_ORGANIZER = "You are not the organizer for this event"
+
+
+def seed_door(conn: Any, tickets: int) -> Tuple[Any, Any]:
+	"""The door event and its organizer; its tickets are reset to not checked in."""
+	row = conn.execute("select event_id, created_by from events where title = %s", (DOOR_EVENT_TITLE,)).fetchone()
+	if row is None:
+		row = conn.execute(
+			"insert into events (title, starts_at, ends_at, category, max_cap, status, created_by) "
+			"values (%s, now(), now() + interval '3 hours', 'Social', %s, 'published', gen_random_uuid()) "
+			"returning event_id, created_by",
+			(DOOR_EVENT_TITLE, tickets),
+		).fetchone()
+	event_id, organizer = row
+	have = conn.execute("select count(*) from tickets where event_id = %s", (event_id,)).fetchone()[0]
+	if have < tickets:
+		conn.execute(
+			"insert into tickets (event_id, user_id, qr_code) "
+			"select %s, gen_random_uuid(), 'QR_door_' || g from generate_series(%s, %s) g",
+			(event_id, have + 1, tickets),
+		)
+	conn.execute("update tickets set is_checked_in = false, checked_in_at = null where event_id = %s", (event_id,))
+	conn.execute("analyze tickets")
+	return event_id, organizer
+
+
+def scan_stream(total: int, tickets: int, rng: random.Random) -> List[List[str]]:
+	"""Batches of QR codes; a batch of two is the same code at two doors at once."""
+	order = [f"QR_door_{n}" for n in range(1, tickets + 1)]
+	rng.shuffle(order)
+	scanned: List[str] = []
+	stream: List[List[str]] = []
+	while len(stream) < total:
+		roll = rng.random()
+		if roll < INVALID_SHARE:
+			stream.append([rng.choice([f"QR_forged_{rng.randrange(10 ** 9)}", "QR_1"])])
+		elif roll < INVALID_SHARE + DUPLICATE_SHARE and scanned:
+			code = rng.choice(scanned[-50:])
+			stream.append([code, code] if rng.random() < 0.5 else [code])
+		elif order:
+			code = order.pop()
+			scanned.append(code)
+			# A first scan can itself be the two-doors case
+			stream.append([code, code] if rng.random() < DUPLICATE_SHARE / 2 else [code])
+		else:
+			break
+	return stream
+
+
+class Door:
+	def __init__(self, event_id: Any, organizer: Any, scanners: int, atomic: bool) -> None:
+		self.event_id = event_id
+		self.organizer = organizer
+		self.scanners = scanners
+		self.atomic = atomic
+		self.jobs: "queue.Queue[Optional[Tuple[float, str]]]" = queue.Queue()
+		self.results: List[Dict[str, Any]] = []
+		self._lock = threading.Lock()
+
+	def _validate(self, conn: Any, qr: str) -> Tuple[str, Optional[Any]]:
+		params = {"qr": qr, "event_id": self.event_id, "organizer": self.organizer}
+		if self.atomic:
+			row = conn.execute(ATOMIC_SQL, params).fetchone()
+			if row:
+				return SUCCESS, row[0]
+			found = conn.execute(LOOKUP_SQL, params).fetchone()
+			return (ALREADY if found else NOT_FOUND), (found[0] if found else None)
+		row = conn.execute(LOOKUP_SQL, params).fetchone()
+		if row is None:
+			return NOT_FOUND, None
+		ticket_id, _, is_checked_in, _, _, created_by, _ = row
+		if created_by != self.organizer:
+			return NOT_ORGANIZER, ticket_id
+		if is_checked_in:
+			return ALREADY, ticket_id
+		conn.execute(CHECK_IN_SQL, {"ticket_id": ticket_id})
+		return SUCCESS, ticket_id
+
+	def _scanner(self) -> None:
+		local = []
+		with pg_bench.connect() as conn:
+			while True:
+				job = self.jobs.get()
+				if job is None:
+					break
+				due, qr = job
+				start = time.perf_counter()
+				message, ticket_id = self._validate(conn, qr)
+				end = time.perf_counter()
+				local.append({
+					"qr": qr, "message": message, "ticket_id": ticket_id,
+					"service_ms": (end - start) * 1000, "door_ms": (end - due) * 1000,
+				})
+		with self._lock:
+			self.results.extend(local)
+
+	def run(self, stream: List[List[str]], rate: float) -> float:
+		threads = [threading.Thread(target=self._scanner, daemon=True) for _ in range(self.scanners)]
+		for t in threads:
+			t.start()
+		start = time.perf_counter()
+		for i, batch in enumerate(stream):
+			due = start + i / rate
+			time.sleep(max(0.0, due - time.perf_counter()))
+			for qr in batch:
+				self.jobs.put((due, qr))
+		for _ in threads:
+			self.jobs.put(None)
+		for t in threads:
+			t.join()
+		return time.perf_counter() - start
+
+
+def anomalies(conn: Any, event_id: Any, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+	successes = Counter(r["ticket_id"] for r in results if r["message"] == SUCCESS)
+	double = [str(t) for t, n in successes.items() if n > 1]
+	checked = {r[0] for r in conn.execute(
+		"select ticket_id from tickets where event_id = %s and is_checked_in", (event_id,)
+	).fetchall()}
+	return {
+		"double_check_ins": len(double),
+		"double_check_in_tickets": double[:20],
+		# Checked in without a successful scan, or a successful scan that did not stick
+		"state_mismatches": len(checked ^ set(successes)),
+	}
+
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description="Simulate door scanners checking in tickets")
+	parser.add_argument("--scanners", type=int, default=SCANNERS)
+	parser.add_argument("--rate", type=float, default=SCAN_RATE, help="scans per second over all doors")
+	parser.add_argument("--tickets", type=int, default=DOOR_TICKETS)
+	parser.add_argument("--scans", type=int, default=0, help="default: enough to scan every ticket once")
+	parser.add_argument("--atomic", action="store_true", help="conditional single-statement check-in")
+	args = parser.parse_args()
+
+	rng = random.Random(341)
+	with pg_bench.connect() as conn:
+		pg_bench.seed_events(conn, BENCH_EVENTS)
+		pg_bench.seed_tickets(conn, BENCH_TICKETS)
+		event_id, organizer = seed_door(conn, args.tickets)
+		lookup_plan = pg_bench.plan_summary(pg_bench.explain(conn, LOOKUP_SQL, {"qr": "QR_door_1", "event_id": event_id}))
+
+		stream = scan_stream(args.scans or args.tickets, args.tickets, rng)
+		door = Door(event_id, organizer, args.scanners, args.atomic)
+		elapsed = door.run(stream, args.rate)
+		found = anomalies(conn, event_id, door.results)
+
+	by_message: Dict[str, int] = defaultdict(int)
+	for r in door.results:
+		by_message[r["message"]] += 1
+	report = {
+		"mode": "atomic" if args.atomic else "select-then-update",
+		"scanners": args.scanners,
+		"target_rate": args.rate,
+		"scans": len(door.results),
+		"scans_per_sec": round(len(door.results) / elapsed, 1),
+		"service": pg_bench.latency_summary([r["service_ms"] for r in door.results]),
+		"door": pg_bench.latency_summary([r["door_ms"] for r in door.results]),
+		"outcomes": dict(by_message),
+		"lookup_plan": {k: lookup_plan[k] for k in ("indexes", "seq_scans", "rows_scanned", "exec_ms")},
+		**found,
+	}
+	pg_bench.print_table([{
+		"mode": report["mode"],
+		"scans/s": report["scans_per_sec"],
+		"service_p95_ms": report["service"]["p95_ms"],
+		"door_p95_ms": report["door"]["p95_ms"],
+		"double_check_ins": report["double_check_ins"],
+		"state_mismatches": report["state_mismatches"],
+		"lookup": ",".join(lookup_plan["indexes"]) or "SEQ SCAN",
+	}], ["mode", "scans/s", "service_p95_ms", "door_p95_ms", "double_check_ins", "state_mismatches", "lookup"])
+	print("[BENCH] outcomes: " + ", ".join(f"{k}: {v}" for k, v in sorted(by_message.items())))
+	path = pg_bench.write_report("checkin", report)
+	print(f"[SUMMARY] {report['double_check_ins']} double check-in(s); details in {path}")
+	return 1 if report["double_check_ins"] or report["state_mismatches"] else 0
+
+
+if __name__ == "__main__":
+	raise SystemExit(main())
@@ -16,6 +16,9 @@ Environment options (PowerShell)
 - $env:QUIET = "1"                              # suppress [info] logs, show only PASS/FAIL
 - $env:COMPANY_EMAIL = "testingsprint3@gmail.com"  # override login email
 - $env:COMPANY_PASSWORD = "testingsprint3"         # override login password
+- $env:FORM_RESET = "1"                         # reset the mounted form between cases ("0" reloads the page)
+- $env:FILL_MODE = "bulk"                       # "bulk" fills in one script call; "typing" sends keystrokes
+- $env:API_STUBS = "1"                          # answer Supabase from canned JSON in the browser (api_stubs.py)
 
 Run (PowerShell)
 1) Start the app in another terminal: npm install; npm run dev
@@ -32,8 +35,9 @@ Run (PowerShell)
 import os
 import sys
 import time
+from contextlib import ExitStack
 from datetime import datetime, timedelta
-from typing import List, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -45,6 +49,17 @@ from selenium.webdriver.support.select import Select
 from selenium.webdriver.common.keys import Keys
 from webdriver_manager.chrome import ChromeDriverManager
 
+import account_pool
+import api_stubs
+import backend_replay
+import fixtures
+import form_helpers
+import harness
+import resources
+import tracing
+import warmup
+from supabase_rest import SupabaseError
+
 
 BASE_URL = os.getenv("APP_BASE_URL", "http://localhost:5173").rstrip("/")
 LOGIN_URL = BASE_URL  
@@ -61,6 +76,10 @@ PAGE_WAIT_SEC = 15
 TOAST_WAIT_SEC = 6
 EVENT_MINUTES_AHEAD = int(os.getenv("EVENT_MINUTES_AHEAD", "180") or 180)
 
+EVENT_FIELD_IDS = ["title", "description", "date", "location", "capacity", "image"]
+TAG_PLACEHOLDER = "Add a tag"
+FILL_MODE = os.getenv("FILL_MODE", "bulk")
+
 
 def xpath_contains_text(text: str) -> str:
 	if "'" not in text:
@@ -78,9 +97,14 @@ def build_driver() -> webdriver.Chrome:
 	opts.add_argument("--window-size=1280,900")
 	opts.add_argument("--disable-gpu")
 	opts.add_argument("--no-sandbox")
+	warmup.apply_profile(opts)
 	service = Service(ChromeDriverManager().install())
 	drv = webdriver.Chrome(service=service, options=opts)
 	drv.implicitly_wait(2)
+	resources.watch_driver(drv)
+	tracing.watch_driver(drv)
+	backend_replay.watch_driver(drv)
+	api_stubs.watch_driver(drv, api_stubs.COMPANY_ROUTES)
 	return drv
 
 
@@ -112,8 +136,8 @@ def wait_for_any_text(drv: webdriver.Chrome, texts: List[str], timeout: int) ->
 	return None
 
 
-def login(drv: webdriver.Chrome) -> bool:
-	info(f"[info] Logging in as {COMPANY_EMAIL}...")
+def login(drv: webdriver.Chrome, account: account_pool.Account) -> bool:
+	info(f"[info] Logging in as {account.email}...")
 	drv.get(LOGIN_URL)
 	
 	try:
@@ -123,11 +147,11 @@ def login(drv: webdriver.Chrome) -> bool:
 		
 		email_field = drv.find_element(By.ID, "email")
 		email_field.clear()
-		email_field.send_keys(COMPANY_EMAIL)
+		email_field.send_keys(account.email)
 		
 		password_field = drv.find_element(By.ID, "password")
 		password_field.clear()
-		password_field.send_keys(COMPANY_PASSWORD)
+		password_field.send_keys(account.password)
 		
 		drv.find_element(By.XPATH, "//button[@type='submit']").click()
 		
@@ -218,6 +242,18 @@ def open_create_event(drv: webdriver.Chrome) -> Tuple[str, bool]:
 		return state, False
 
 
+def normalize_event_date(date: str) -> str:
+	if 'T' not in date or len(date) < 16:
+		return format_future_datetime()
+	try:
+		parsed = datetime.strptime(date, "%Y-%m-%dT%H:%M")
+		if parsed <= datetime.now():
+			return format_future_datetime()
+	except Exception:
+		return format_future_datetime()
+	return date
+
+
 def fill_event_form(
 	drv: webdriver.Chrome,
 	*,
@@ -230,6 +266,61 @@ def fill_event_form(
 	image_url: str,
 	tags: List[str],
 	preserve_required: bool = True,
+	mode: Optional[str] = None,
+) -> None:
+	"""Fill the create-event form; "bulk" uses one script round trip, "typing" sends real keystrokes."""
+	if (mode or FILL_MODE) == "bulk":
+		fields = {
+			"title": title,
+			"description": description,
+			"date": normalize_event_date(date) if date else "",
+			"location": location,
+			"capacity": max_capacity,
+			"image": image_url,
+		}
+		try:
+			result = form_helpers.bulk_fill(
+				drv,
+				fields,
+				keep_required=preserve_required,
+				select_text=category,
+				tags=tags,
+				tag_placeholder=TAG_PLACEHOLDER,
+			)
+			mismatches = form_helpers.bulk_fill_mismatches(result, fields, category, tags)
+		except Exception as e:
+			mismatches = [str(e)]
+		if not mismatches:
+			info(f"[info] Form filled in one round trip (date={fields['date']})")
+			return
+		info(f"[warn] Bulk fill mismatch ({', '.join(mismatches)}); falling back to typing")
+
+	type_event_form(
+		drv,
+		title=title,
+		description=description,
+		date=date,
+		location=location,
+		category=category,
+		max_capacity=max_capacity,
+		image_url=image_url,
+		tags=tags,
+		preserve_required=preserve_required,
+	)
+
+
+def type_event_form(
+	drv: webdriver.Chrome,
+	*,
+	title: str,
+	description: str,
+	date: str,
+	location: str,
+	category: str,
+	max_capacity: str,
+	image_url: str,
+	tags: List[str],
+	preserve_required: bool = True,
 ) -> None:
 	def set_val(field_id: str, value: str) -> None:
 		el = drv.find_element(By.ID, field_id)
@@ -266,7 +357,7 @@ def fill_event_form(
 				info(f"[info] Date set to: {final_val}")
 			else:
 				if not preserve_required:
-					drv.execute_script("arguments[0].removeAttribute('required');", el)
+					drv.execute_script(form_helpers.DROP_REQUIRED_JS, el)
 			return
 
 		el.clear()
@@ -274,21 +365,12 @@ def fill_event_form(
 			el.send_keys(value)
 		else:
 			if not preserve_required:
-				drv.execute_script("arguments[0].removeAttribute('required');", el)
+				drv.execute_script(form_helpers.DROP_REQUIRED_JS, el)
 	
 	set_val("title", title)
 	set_val("description", description)
 	if date:
-		_set_date = date
-		if 'T' not in _set_date or len(_set_date) < 16:
-			_set_date = format_future_datetime()
-		try:
-			parsed = datetime.strptime(_set_date, "%Y-%m-%dT%H:%M")
-			if parsed <= datetime.now():
-				_set_date = format_future_datetime()
-		except Exception:
-			_set_date = format_future_datetime()
-		set_val("date", _set_date)
+		set_val("date", normalize_event_date(date))
 	else:
 		set_val("date", "")
 	set_val("location", location)
@@ -363,7 +445,10 @@ def run_validation_case(
 		expected_list = (
 			[expected_toast] if isinstance(expected_toast, str) else list(expected_toast)
 		)
-		state, ready = open_create_event(drv)
+		if form_helpers.reset_form(drv, EVENT_FIELD_IDS, ready_id="title", tag_placeholder=TAG_PLACEHOLDER):
+			state, ready = "form", True
+		else:
+			state, ready = open_create_event(drv)
 		if not ready:
 			return (name, False, f'Page state "{state}" not ready for form')
 		fill_event_form(
@@ -393,107 +478,96 @@ def run_validation_case(
 		return (name, False, f"Exception: {e}")
 
 
-def run_validation_suite(drv: webdriver.Chrome) -> Tuple[int, int, List[Tuple[str, bool, str]]]:
-	results: List[Tuple[str, bool, str]] = []
-
-
+def validation_cases() -> List[Dict[str, Any]]:
 	future_date = format_future_datetime(7 * 24 * 60)
-
-	results.append(
-		run_validation_case(
-			drv,
-			"empty title",
-			title="",
-			description="Test description",
-			date=future_date,
-			location="Test Location",
-			category="Technology",
-			max_capacity="50",
-			image_url="",
-			tags=[],
-			expected_toast="Please fill out this field",  
-		)
-	)
-	
-
-	results.append(
-		run_validation_case(
-			drv,
-			"empty description",
-			title="Test Event",
-			description="",
-			date=future_date,
-			location="Test Location",
-			category="Technology",
-			max_capacity="50",
-			image_url="",
-			tags=[],
-			expected_toast="Please fill out this field",
-		)
-	)
-	
-	results.append(
-		run_validation_case(
-			drv,
-			"empty date",
-			title="Test Event",
-			description="Test description",
-			date="",
-			location="Test Location",
-			category="Technology",
-			max_capacity="50",
-			image_url="",
-			tags=[],
-			expected_toast="Please fill out this field",
-		)
-	)
-	
-	results.append(
-		run_validation_case(
-			drv,
-			"empty location",
-			title="Test Event",
-			description="Test description",
-			date=future_date,
-			location="",
-			category="Technology",
-			max_capacity="50",
-			image_url="",
-			tags=[],
-			expected_toast="Please fill out this field",
-		)
-	)
-	
-	results.append(
-		run_validation_case(
-			drv,
-			"invalid capacity (0)",
-			title="Test Event",
-			description="Test description",
-			date=future_date,
-			location="Test Location",
-			category="Technology",
-			max_capacity="0",
-			image_url="",
-			tags=[],
-			expected_toast=[
+	return [
+		{
+			"name": "empty title",
+			"title": "",
+			"description": "Test description",
+			"date": future_date,
+			"location": "Test Location",
+			"category": "Technology",
+			"max_capacity": "50",
+			"image_url": "",
+			"tags": [],
+			"expected_toast": "Please fill out this field",
+		},
+		{
+			"name": "empty description",
+			"title": "Test Event",
+			"description": "",
+			"date": future_date,
+			"location": "Test Location",
+			"category": "Technology",
+			"max_capacity": "50",
+			"image_url": "",
+			"tags": [],
+			"expected_toast": "Please fill out this field",
+		},
+		{
+			"name": "empty date",
+			"title": "Test Event",
+			"description": "Test description",
+			"date": "",
+			"location": "Test Location",
+			"category": "Technology",
+			"max_capacity": "50",
+			"image_url": "",
+			"tags": [],
+			"expected_toast": "Please fill out this field",
+		},
+		{
+			"name": "empty location",
+			"title": "Test Event",
+			"description": "Test description",
+			"date": future_date,
+			"location": "",
+			"category": "Technology",
+			"max_capacity": "50",
+			"image_url": "",
+			"tags": [],
+			"expected_toast": "Please fill out this field",
+		},
+		{
+			"name": "invalid capacity (0)",
+			"title": "Test Event",
+			"description": "Test description",
+			"date": future_date,
+			"location": "Test Location",
+			"category": "Technology",
+			"max_capacity": "0",
+			"image_url": "",
+			"tags": [],
+			"expected_toast": [
 				"greater than or equal to 1",
 				"Please fill out this field",
 				"Please enter a number",
 			],
-		)
-	)
-	
+		},
+	]
+
+
+def run_validation_suite(drv: webdriver.Chrome) -> Tuple[int, int, List[Tuple[str, bool, str]]]:
+	results: List[Tuple[str, bool, str]] = []
+	for case in validation_cases():
+		if not harness.selected(case["name"]):
+			continue
+		fields = dict(case)
+		name = fields.pop("name")
+		results.append(harness.run_case(name, lambda: run_validation_case(drv, name, **fields)))
+
 	passed = sum(1 for _, ok, _ in results if ok)
 	failures = len(results) - passed
 	return passed, failures, results
 
 
-def run_success_scenario(drv: webdriver.Chrome) -> int:
+def run_success_scenario(drv: webdriver.Chrome, fx: fixtures.Fixtures) -> int:
 	"""Attempt to create a valid event."""
 	info("[info] Running success event creation scenario...")
 	
-	timestamp = int(time.time())
+	title = f"{fixtures.FIXTURE_PREFIX} Test Event {int(time.time())}"
+	fx.track_event_title(title)
 	future_date = format_future_datetime(7 * 24 * 60)
 	
 	try:
@@ -505,7 +579,7 @@ def run_success_scenario(drv: webdriver.Chrome) -> int:
 		
 		fill_event_form(
 			drv,
-			title=f"Test Event {timestamp}",
+			title=title,
 			description="This is a test event created by automated testing",
 			date=future_date,
 			location="Hall building",
@@ -563,9 +637,13 @@ def main() -> int:
 	info(f"[info] Company Email: {COMPANY_EMAIL}")
 	
 	drv = build_driver()
+	leases = ExitStack()
+	fx = fixtures.Fixtures()
 	
 	try:
-		if not login(drv):
+		fallback = account_pool.Account("company", COMPANY_EMAIL, COMPANY_PASSWORD)
+		company = leases.enter_context(account_pool.lease("company", fallback))
+		if not login(drv, company):
 			print("[fail] Could not login as company user")
 			return 1
 		
@@ -587,13 +665,20 @@ def main() -> int:
 		overall_failures = failed
 		
 		
-		if os.getenv("RUN_SUCCESS", "0") == "1":
-			res = run_success_scenario(drv)
-			overall_failures += 1 if res != 0 else 0
+		# The success scenario needs the real backend, so stubbed runs skip it
+		if os.getenv("RUN_SUCCESS", "0") == "1" and not api_stubs.API_STUBS and harness.selected("success scenario"):
+			ok = harness.run_case("success scenario", lambda: run_success_scenario(drv, fx) == 0)
+			overall_failures += 0 if ok else 1
 		
 		return 0 if overall_failures == 0 else 1
 		
 	finally:
+		leases.close()
+		if fx.enabled:
+			try:
+				fx.teardown()
+			except SupabaseError as e:
+				print(f"[warn] Could not remove the created event: {e}")
 		try:
 			drv.quit()
 		except Exception:
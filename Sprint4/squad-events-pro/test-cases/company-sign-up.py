@@ -1,8 +1,8 @@
+import asyncio
 import os
 import sys
 import time
-from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -12,6 +12,17 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 
+import api_stubs
+import async_driver
+import backend_replay
+import fixtures
+import form_helpers
+import harness
+import resources
+import tracing
+import warmup
+from supabase_rest import SupabaseError
+
 
 BASE_URL = os.getenv("APP_BASE_URL", "http://localhost:5173").rstrip("/")
 SIGNUP_URL = f"{BASE_URL}/OrgSignUp"
@@ -20,11 +31,21 @@ QUIET = os.getenv("QUIET", "1") == "1"
 PAGE_WAIT_SEC = 8
 TOAST_WAIT_SEC = 5
 
+# fill_form keyword -> input id, used by the async driver
+FIELD_IDS = {
+	"org_name": "orgName",
+	"full_name": "fullName",
+	"email": "email",
+	"confirm_email": "confirmEmail",
+	"website": "website",
+	"logo_url": "logoUrl",
+	"password": "password",
+	"confirm_password": "confirmPassword",
+}
+
 
 def unique_email(domain: str = "organization.org") -> str:
-	now = int(time.time())
-	micro = datetime.utcnow().microsecond
-	return f"org.test+{now}{micro}@{domain}"
+	return fixtures.tagged_email("org.test", domain)
 
 
 def xpath_contains_text(text: str) -> str:
@@ -43,9 +64,14 @@ def build_driver() -> webdriver.Chrome:
 	opts.add_argument("--window-size=1280,900")
 	opts.add_argument("--disable-gpu")
 	opts.add_argument("--no-sandbox")
+	warmup.apply_profile(opts)
 	service = Service(ChromeDriverManager().install())
 	drv = webdriver.Chrome(service=service, options=opts)
 	drv.implicitly_wait(2)
+	resources.watch_driver(drv)
+	tracing.watch_driver(drv)
+	backend_replay.watch_driver(drv)
+	api_stubs.watch_driver(drv, api_stubs.SIGNUP_ROUTES)
 	return drv
 
 
@@ -80,7 +106,7 @@ def fill_form(
 		if value:
 			el.send_keys(value)
 		else:
-			drv.execute_script("arguments[0].removeAttribute('required');", el)
+			drv.execute_script(form_helpers.DROP_REQUIRED_JS, el)
 
 	set_val("orgName", org_name)
 	set_val("fullName", full_name)
@@ -112,6 +138,106 @@ def wait_for_any_text(drv: webdriver.Chrome, texts: List[str], timeout: int) ->
 	return None
 
 
+VALIDATION_CASES: List[Dict[str, str]] = [
+	{
+		"name": "empty organization name",
+		"org_name": "",
+		"full_name": "Contact Person",
+		"email": "org@example.org",
+		"confirm_email": "org@example.org",
+		"website": "",
+		"logo_url": "",
+		"password": "SecurePass123!",
+		"confirm_password": "SecurePass123!",
+		"expected_toast": "Organization name is required.",
+	},
+	{
+		"name": "empty contact full name",
+		"org_name": "Test Org",
+		"full_name": "",
+		"email": "org@example.org",
+		"confirm_email": "org@example.org",
+		"website": "",
+		"logo_url": "",
+		"password": "SecurePass123!",
+		"confirm_password": "SecurePass123!",
+		"expected_toast": "Contact full name is required.",
+	},
+	{
+		"name": "empty email",
+		"org_name": "Test Org",
+		"full_name": "Contact Person",
+		"email": "",
+		"confirm_email": "org@example.org",
+		"website": "",
+		"logo_url": "",
+		"password": "SecurePass123!",
+		"confirm_password": "SecurePass123!",
+		"expected_toast": "Email is required.",
+	},
+	{
+		"name": "empty confirm email",
+		"org_name": "Test Org",
+		"full_name": "Contact Person",
+		"email": "org@example.org",
+		"confirm_email": "",
+		"website": "",
+		"logo_url": "",
+		"password": "SecurePass123!",
+		"confirm_password": "SecurePass123!",
+		"expected_toast": "Please confirm your email.",
+	},
+	{
+		"name": "email mismatch",
+		"org_name": "Test Org",
+		"full_name": "Contact Person",
+		"email": "org1@example.org",
+		"confirm_email": "org2@example.org",
+		"website": "",
+		"logo_url": "",
+		"password": "SecurePass123!",
+		"confirm_password": "SecurePass123!",
+		"expected_toast": "Emails do not match.",
+	},
+	{
+		"name": "empty password",
+		"org_name": "Test Org",
+		"full_name": "Contact Person",
+		"email": "org@example.org",
+		"confirm_email": "org@example.org",
+		"website": "",
+		"logo_url": "",
+		"password": "",
+		"confirm_password": "",
+		"expected_toast": "Password is required.",
+	},
+	{
+		"name": "short password",
+		"org_name": "Test Org",
+		"full_name": "Contact Person",
+		"email": "org@example.org",
+		"confirm_email": "org@example.org",
+		"website": "",
+		"logo_url": "",
+		"password": "Short1",
+		"confirm_password": "Short1",
+		"expected_toast": "Password must be at least 8 characters.",
+	},
+	{
+		"name": "password mismatch",
+		"org_name": "Test Org",
+		"full_name": "Contact Person",
+		"email": "org@example.org",
+		"confirm_email": "org@example.org",
+		"website": "",
+		"logo_url": "",
+		"password": "SecurePass123!",
+		"confirm_password": "Different123!",
+		"expected_toast": "Passwords do not match.",
+	},
+]
+
+
 def run_validation_case(
 	drv: webdriver.Chrome,
 	name: str,
@@ -127,7 +253,8 @@ def run_validation_case(
 	expected_toast: str,
 ) -> Tuple[str, bool, str]:
 	try:
-		open_signup(drv)
+		if not form_helpers.reset_form(drv, list(FIELD_IDS.values()), ready_id="orgName"):
+			open_signup(drv)
 		fill_form(
 			drv,
 			org_name=org_name,
@@ -150,143 +277,64 @@ def run_validation_case(
 
 def run_validation_suite(drv: webdriver.Chrome) -> Tuple[int, int, List[Tuple[str, bool, str]]]:
 	results: List[Tuple[str, bool, str]] = []
-	
-	results.append(
-		run_validation_case(
-			drv,
-			"empty organization name",
-			org_name="",
-			full_name="Contact Person",
-			email="org@example.org",
-			confirm_email="org@example.org",
-			website="",
-			logo_url="",
-			password="SecurePass123!",
-			confirm_password="SecurePass123!",
-			expected_toast="Organization name is required.",
-		)
-	)
-	
-	results.append(
-		run_validation_case(
-			drv,
-			"empty contact full name",
-			org_name="Test Org",
-			full_name="",
-			email="org@example.org",
-			confirm_email="org@example.org",
-			website="",
-			logo_url="",
-			password="SecurePass123!",
-			confirm_password="SecurePass123!",
-			expected_toast="Contact full name is required.",
-		)
-	)
-	
-	results.append(
-		run_validation_case(
-			drv,
-			"empty email",
-			org_name="Test Org",
-			full_name="Contact Person",
-			email="",
-			confirm_email="org@example.org",
-			website="",
-			logo_url="",
-			password="SecurePass123!",
-			confirm_password="SecurePass123!",
-			expected_toast="Email is required.",
-		)
-	)
-	
-	results.append(
-		run_validation_case(
-			drv,
-			"empty confirm email",
-			org_name="Test Org",
-			full_name="Contact Person",
-			email="org@example.org",
-			confirm_email="",
-			website="",
-			logo_url="",
-			password="SecurePass123!",
-			confirm_password="SecurePass123!",
-			expected_toast="Please confirm your email.",
-		)
-	)
-	
-	results.append(
-		run_validation_case(
-			drv,
-			"email mismatch",
-			org_name="Test Org",
-			full_name="Contact Person",
-			email="org1@example.org",
-			confirm_email="org2@example.org",
-			website="",
-			logo_url="",
-			password="SecurePass123!",
-			confirm_password="SecurePass123!",
-			expected_toast="Emails do not match.",
-		)
-	)
-	
-	results.append(
-		run_validation_case(
-			drv,
-			"empty password",
-			org_name="Test Org",
-			full_name="Contact Person",
-			email="org@example.org",
-			confirm_email="org@example.org",
-			website="",
-			logo_url="",
-			password="",
-			confirm_password="",
-			expected_toast="Password is required.",
-		)
-	)
+	for case in VALIDATION_CASES:
+		if not harness.selected(case["name"]):
+			continue
+		fields = dict(case)
+		name = fields.pop("name")
+		results.append(harness.run_case(name, lambda: run_validation_case(drv, name, **fields)))
 
-	results.append(
-		run_validation_case(
-			drv,
-			"short password",
-			org_name="Test Org",
-			full_name="Contact Person",
-			email="org@example.org",
-			confirm_email="org@example.org",
-			website="",
-			logo_url="",
-			password="Short1",
-			confirm_password="Short1",
-			expected_toast="Password must be at least 8 characters.",
-		)
-	)
-	
-	results.append(
-		run_validation_case(
-			drv,
-			"password mismatch",
-			org_name="Test Org",
-			full_name="Contact Person",
-			email="org@example.org",
-			confirm_email="org@example.org",
-			website="",
-			logo_url="",
-			password="SecurePass123!",
-			confirm_password="Different123!",
-			expected_toast="Passwords do not match.",
+	passed = sum(1 for _, ok, _ in results if ok)
+	failures = len(results) - passed
+	return passed, failures, results
+
+
+async def run_async_validation_case(
+	browser: async_driver.AsyncBrowser, case: Dict[str, str]
+) -> Tuple[str, bool, str]:
+	fields = dict(case)
+	name = fields.pop("name")
+	expected_toast = fields.pop("expected_toast")
+	page = await browser.new_page()
+	result: Tuple[str, bool, str] = (name, False, "not run")
+	try:
+		await api_stubs.stub_page(page, api_stubs.SIGNUP_ROUTES)
+		await async_driver.open_signup(page, SIGNUP_URL, ready_id="orgName")
+		await async_driver.fill_form(page, {FIELD_IDS[k]: v for k, v in fields.items()})
+		await async_driver.click_submit(page)
+		match = await async_driver.wait_for_any_text(page, [expected_toast], timeout=TOAST_WAIT_SEC)
+		if match:
+			result = (name, True, f"Saw expected toast: {match}")
+		else:
+			result = (name, False, f"Did not see expected toast: '{expected_toast}'")
+	except Exception as e:
+		result = (name, False, f"Exception: {e}")
+	finally:
+		await page.close()
+	return result
+
+
+async def run_validation_suite_async() -> Tuple[int, int, List[Tuple[str, bool, str]]]:
+	"""Run every validation case in its own page of one browser, concurrently."""
+	async with await async_driver.AsyncBrowser.launch() as browser:
+		resources.watch_async_browser(browser)
+		results = list(
+			await asyncio.gather(*(
+				harness.run_case_async(c["name"], lambda c=c: run_async_validation_case(browser, c))
+				for c in VALIDATION_CASES
+				if harness.selected(c["name"])
+			))
 		)
-	)
 
 	passed = sum(1 for _, ok, _ in results if ok)
 	failures = len(results) - passed
 	return passed, failures, results
 
 
-def run_success_scenario(drv: webdriver.Chrome) -> int:
+def run_success_scenario(drv: webdriver.Chrome, fx: fixtures.Fixtures) -> int:
 	strict = os.getenv("STRICT", "0") == "1"
 	email = unique_email()
+	fx.track_signup(email)
 	full_name = "Test Contact"
 	org_name = f"Test Organization {int(time.time())}"
 	password = "SecurePass123!"
@@ -341,11 +389,19 @@ def run_success_scenario(drv: webdriver.Chrome) -> int:
 def main() -> int:
 	info(f"[info] Base URL: {BASE_URL}")
 	info(f"[info] OrgSignUp URL: {SIGNUP_URL}")
-	drv = build_driver()
+	use_async = os.getenv("ASYNC_DRIVER", "0") == "1"
+	# The success scenario needs the real backend, so stubbed runs skip it
+	run_success = os.getenv("RUN_SUCCESS", "0") == "1" and not api_stubs.API_STUBS
+	drv = build_driver() if (run_success or not use_async) else None
+	fx = fixtures.Fixtures()
 
 	try:
-		info("[info] Running client-side validation suite…")
-		passed, failed, results = run_validation_suite(drv)
+		if use_async:
+			info("[info] Running client-side validation suite on the async driver…")
+			passed, failed, results = asyncio.run(run_validation_suite_async())
+		else:
+			info("[info] Running client-side validation suite…")
+			passed, failed, results = run_validation_suite(drv)
 		for name, ok, msg in results:
 			status = "PASS" if ok else "FAIL"
 			print(f" - [{status}] {name}: {msg}")
@@ -353,18 +409,24 @@ def main() -> int:
 
 		overall_failures = failed
 
-		if os.getenv("RUN_SUCCESS", "0") == "1":
+		if run_success and harness.selected("success scenario"):
 			info("[info] Running success organization signup scenario…")
-			res = run_success_scenario(drv)
-			overall_failures += 1 if res != 0 else 0
+			ok = harness.run_case("success scenario", lambda: run_success_scenario(drv, fx) == 0)
+			overall_failures += 0 if ok else 1
 
 		return 0 if overall_failures == 0 else 1
 
 	finally:
-		try:
-			drv.quit()
-		except Exception:
-			pass
+		if fx.enabled:
+			try:
+				fx.teardown()
+			except SupabaseError as e:
+				print(f"[warn] Could not remove signup accounts: {e}")
+		if drv is not None:
+			try:
+				drv.quit()
+			except Exception:
+				pass
 
 
 if __name__ == "__main__":
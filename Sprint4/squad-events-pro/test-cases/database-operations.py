@@ -10,6 +10,13 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 
+import account_pool
+import backend_replay
+import harness
+import resources
+import tracing
+import warmup
+
 APP_BASE_URL = os.getenv("APP_BASE_URL", "http://localhost:5173")
 HEADLESS = os.getenv("HEADLESS", "1")
 QUIET = os.getenv("QUIET", "1")
@@ -27,8 +34,13 @@ def build_driver():
     chrome_options.add_argument("--disable-gpu")
     if QUIET == "1":
         chrome_options.add_experimental_option("excludeSwitches", ["enable-logging"])
-    service = Service(ChromeDriverManager().install())  
-    return webdriver.Chrome(service=service, options=chrome_options)
+    warmup.apply_profile(chrome_options)
+    service = Service(ChromeDriverManager().install())
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+    resources.watch_driver(driver)
+    tracing.watch_driver(driver)
+    backend_replay.watch_driver(driver)
+    return driver
 
 def login(driver, email, password):
     driver.get(APP_BASE_URL)
@@ -258,27 +270,32 @@ def test_navigation_links(driver):
 def run_all_tests():
     driver = build_driver()
     results = []
+    student_fallback = account_pool.Account("student", STUDENT_EMAIL, STUDENT_PASSWORD)
+    company_fallback = account_pool.Account("company", COMPANY_EMAIL, COMPANY_PASSWORD)
     
     try:
         # Test with student account
-        if not login(driver, STUDENT_EMAIL, STUDENT_PASSWORD):
-            print("Warning: Could not login as student")
-        
-        results.append(("Event details page", test_event_details_page(driver)))
-        results.append(("View tickets", test_view_tickets(driver)))
-        results.append(("RSVP to event", test_rsvp_event(driver)))
-        results.append(("Cancel RSVP", test_cancel_rsvp(driver)))
-        results.append(("Starred events", test_starred_events(driver)))
-        results.append(("Event filters", test_event_filters(driver)))
-        results.append(("Navigation links", test_navigation_links(driver)))
+        with account_pool.lease("student", student_fallback) as student:
+            if not login(driver, student.email, student.password):
+                print("Warning: Could not login as student")
+            
+            harness.collect(results, "Event details page", lambda: test_event_details_page(driver))
+            harness.collect(results, "View tickets", lambda: test_view_tickets(driver))
+            harness.collect(results, "RSVP to event", lambda: test_rsvp_event(driver))
+            harness.collect(results, "Cancel RSVP", lambda: test_cancel_rsvp(driver))
+            harness.collect(results, "Starred events", lambda: test_starred_events(driver))
+            harness.collect(results, "Event filters", lambda: test_event_filters(driver))
+            harness.collect(results, "Navigation links", lambda: test_navigation_links(driver))
         
         # Test with company account if available
-        try:
-            driver.delete_all_cookies()
-            if login(driver, COMPANY_EMAIL, COMPANY_PASSWORD):
-                results.append(("Company create event", test_company_create_event(driver)))
-        except:
-            pass
+        if harness.selected("Company create event"):
+            try:
+                driver.delete_all_cookies()
+                with account_pool.lease("company", company_fallback) as company:
+                    if login(driver, company.email, company.password):
+                        harness.collect(results, "Company create event", lambda: test_company_create_event(driver))
+            except:
+                pass
         
         passed = sum(1 for _, result in results if result)
         failed = len(results) - passed
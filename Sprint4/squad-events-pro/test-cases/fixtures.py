@@ -0,0 +1,300 @@
+"""
+Data fixtures for the E2E suites
+
+What it does
+- Seeds N pending events or N pending organization applications directly through the
+  Supabase REST layer (no UI), so admin approval suites always have work to do
+- Every seeded row carries a unique per-run title, so parallel runs never pick each
+  other's rows
+- Tears everything it created down again (dependent rows first, like deleteEventAdmin)
+- Removes the accounts the sign-up success scenarios create through the UI, so they do not
+  pile up as orphan users
+
+Tagging scheme: everything the harness creates is recognisable without bookkeeping.
+- events / organization applications: title or name starts with FIXTURE_PREFIX
+- accounts: the e-mail local part contains EMAIL_TAG (see tagged_email)
+Rows from before this scheme are recognised by the exact formats the old scripts produced
+(LEGACY_* regexes: "Test Event <unix time>", student.test+<digits>@example.edu, ...), so
+hand-made rows that merely look similar are never touched. `python fixtures.py sweep
+--older-than 24` (or `master.py --sweep-hours 24` at the end of a run) deletes tagged rows
+in batches, oldest first, so leftovers of crashed runs do not slow listEvents and the
+admin pages.
+
+Environment options (PowerShell)
+- $env:SUPABASE_URL / $env:SUPABASE_SERVICE_ROLE_KEY   # see supabase_rest.py
+- $env:FIXTURE_ORGANIZER_ID = "<profile uuid>"        # owner of seeded events/applications
+- $env:COMPANY_EMAIL = "testingapproval@gmail.com"     # used to look the organizer up otherwise
+
+Usage
+	with Fixtures() as fx:
+		events = fx.seed_pending_events(3)
+		...
+"""
+
+import argparse
+import os
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from supabase_rest import SupabaseError, SupabaseRest, in_filter
+
+
+FIXTURE_PREFIX = "[fixture]"
+EMAIL_TAG = "+e2e-"
+# PostgREST filters, anchored to what the pre-tagging scripts generated
+LEGACY_EVENT_TITLES = [r"match.^Test Event [0-9]{10}$"]
+LEGACY_EMAILS = [r"match.^student\.test\+[0-9]+@example\.edu$", r"match.^org\.test\+[0-9]+@organization\.org$"]
+TEARDOWN_BATCH = 100
+SEED_BATCH = 500
+
+# Same order as db.deleteEventAdmin's manual cascade
+EVENT_CHILD_TABLES = ["event_counters", "tickets", "registrations", "event_registrations", "starred_events"]
+
+
+def _iso(dt: datetime) -> str:
+	return dt.astimezone(timezone.utc).isoformat()
+
+
+def tagged_email(local: str, domain: str) -> str:
+	"""Unique, sweepable e-mail for accounts created through the UI."""
+	return f"{local}{EMAIL_TAG}{time.time_ns()}@{domain}"
+
+
+def _batches(values: List[str]) -> Iterable[List[str]]:
+	for i in range(0, len(values), TEARDOWN_BATCH):
+		yield values[i:i + TEARDOWN_BATCH]
+
+
+class Fixtures:
+	def __init__(self, client: Optional[SupabaseRest] = None, run_id: Optional[str] = None) -> None:
+		self.client = client or SupabaseRest()
+		self.run_id = run_id or uuid.uuid4().hex[:8]
+		self.event_ids: List[str] = []
+		self.application_ids: List[str] = []
+		self.application_names: List[str] = []
+		self.signup_emails: List[str] = []
+		self.event_titles: List[str] = []
+		self._organizer_id: Optional[str] = None
+
+	@property
+	def enabled(self) -> bool:
+		return self.client.enabled
+
+	def label(self, kind: str, index: int) -> str:
+		return f"{FIXTURE_PREFIX} {kind} {self.run_id}-{index}"
+
+	def organizer_id(self) -> str:
+		if self._organizer_id:
+			return self._organizer_id
+		explicit = os.getenv("FIXTURE_ORGANIZER_ID")
+		if explicit:
+			self._organizer_id = explicit
+			return explicit
+		email = os.getenv("COMPANY_EMAIL")
+		rows: List[dict] = []
+		if email:
+			rows = self.client.select("profiles", {"select": "user_id", "email": f"eq.{email.lower()}", "limit": "1"})
+		if not rows:
+			rows = self.client.select("profiles", {"select": "user_id", "role": "eq.company", "limit": "1"})
+		if not rows:
+			raise SupabaseError(0, "no company profile to own fixtures; set FIXTURE_ORGANIZER_ID")
+		self._organizer_id = rows[0]["user_id"]
+		return self._organizer_id
+
+	def seed_pending_events(self, n: int, *, category: str = "Technology") -> List[dict]:
+		return self.seed_events(n, status="pending", categories=[category])
+
+	def seed_events(self, n: int, *, status: str, categories: List[str], spread_days: int = 0) -> List[dict]:
+		"""Insert n events in SEED_BATCH chunks, cycling through `categories` and spreading
+		starts_at over `spread_days` days from next week."""
+		organizer = self.organizer_id()
+		starts = datetime.now(timezone.utc) + timedelta(days=7)
+		now = _iso(datetime.now(timezone.utc))
+		base = len(self.event_ids)
+		created: List[dict] = []
+		for offset in range(0, n, SEED_BATCH):
+			rows = []
+			for i in range(offset, min(n, offset + SEED_BATCH)):
+				start = starts + timedelta(days=i % spread_days if spread_days else 0)
+				rows.append({
+					"title": self.label("event", base + i),
+					"description": "Seeded by the E2E harness",
+					"starts_at": _iso(start),
+					"ends_at": _iso(start + timedelta(hours=2)),
+					"location": "Hall building",
+					"category": categories[i % len(categories)],
+					"created_by": organizer,
+					"org_name": "Fixture Org",
+					"max_cap": 50,
+					"status": status,
+					"created_at": now,
+				})
+			batch = self.client.insert("events", rows)
+			# Track per batch so a failure halfway still tears down what was inserted
+			self.event_ids.extend(r["event_id"] for r in batch)
+			created.extend(batch)
+		return created
+
+	def seed_pending_companies(self, n: int) -> List[dict]:
+		applicant = self.organizer_id()
+		now = _iso(datetime.now(timezone.utc))
+		rows = []
+		for i in range(n):
+			name = self.label("org", len(self.application_ids) + i)
+			rows.append({
+				"applicant_user_id": applicant,
+				"proposed_name": name,
+				"email": f"fixture+{self.run_id}.{i}@organization.org",
+				"website_url": None,
+				"logo_url": None,
+				"status": "pending",
+				"submitted_at": now,
+				"notes": FIXTURE_PREFIX,
+			})
+		created = self.client.insert("organization_applications", rows)
+		self.application_ids.extend(r["application_id"] for r in created)
+		self.application_names.extend(r["proposed_name"] for r in created)
+		return created
+
+	def track_signup(self, email: str) -> None:
+		"""Delete this UI-created account (auth user, profile, organization rows) on teardown."""
+		self.signup_emails.append(email.lower())
+
+	def track_event_title(self, title: str) -> None:
+		"""Delete events created through the UI with this title on teardown."""
+		self.event_titles.append(title)
+
+	def event_status(self, event_id: str) -> Optional[str]:
+		rows = self.client.select("events", {"select": "status", "event_id": f"eq.{event_id}"})
+		return rows[0]["status"] if rows else None
+
+	def teardown(self) -> None:
+		if self.event_titles:
+			rows = self.client.select("events", {"select": "event_id", "title": in_filter(self.event_titles)})
+			self.event_ids.extend(r["event_id"] for r in rows)
+			self.event_titles = []
+		if self.event_ids:
+			self.delete_events(self.event_ids)
+			self.event_ids = []
+		if self.application_ids:
+			# Approving an application creates an organizations row with the same name
+			self._delete_quietly("organizations", {"name": in_filter(self.application_names)})
+			self._delete_quietly("organization_applications", {"application_id": in_filter(self.application_ids)})
+			self.application_ids = []
+			self.application_names = []
+		if self.signup_emails:
+			profiles = self.client.select(
+				"profiles", {"select": "user_id", "email": in_filter(self.signup_emails)}
+			)
+			self.delete_users([p["user_id"] for p in profiles])
+			self.signup_emails = []
+
+	def delete_events(self, event_ids: List[str]) -> None:
+		"""Batched version of db.deleteEventAdmin's manual cascade; events that still cannot be
+		deleted (a dependent table we do not know about) go through the admin_delete_event RPC."""
+		for batch in _batches(event_ids):
+			ids = in_filter(batch)
+			for table in EVENT_CHILD_TABLES:
+				self._delete_quietly(table, {"event_id": ids})
+			try:
+				self.client.delete("events", {"event_id": ids})
+			except SupabaseError as e:
+				if e.status != 409:
+					raise
+				for event_id in batch:
+					self.client.rpc("admin_delete_event", {"p_event_id": event_id})
+
+	def delete_users(self, user_ids: List[str]) -> None:
+		"""Auth users plus their profile, organization and application rows."""
+		for batch in _batches(user_ids):
+			ids = in_filter(batch)
+			self._delete_quietly("organization_applications", {"applicant_user_id": ids})
+			self._delete_quietly("organizations", {"owner_user_id": ids})
+			self._delete_quietly("profiles", {"user_id": ids})
+			for user_id in batch:
+				try:
+					self.client.admin_delete_user(user_id)
+				except SupabaseError as e:
+					if e.status != 404:
+						raise
+
+	def _select_tagged(self, table: str, column: str, filters: List[str], params: Dict[str, str]) -> List[dict]:
+		rows: List[dict] = []
+		for expr in filters:
+			rows.extend(self.client.select(table, {**params, column: expr}))
+		return rows
+
+	def sweep(self, older_than_hours: float, force: bool = False) -> Dict[str, int]:
+		"""Delete every tagged row older than the cutoff, whichever run created it.
+
+		Accounts are only swept by age. Where profiles has no created_at to filter on they
+		are left alone unless force=True, which deletes every tagged account regardless.
+		"""
+		cutoff = _iso(datetime.now(timezone.utc) - timedelta(hours=older_than_hours))
+		events = self._select_tagged(
+			"events", "title", [f"like.{FIXTURE_PREFIX}*"] + LEGACY_EVENT_TITLES,
+			{"select": "event_id", "created_at": f"lt.{cutoff}", "order": "created_at.asc"},
+		)
+		self.delete_events(sorted({r["event_id"] for r in events}))
+
+		applications = self._select_tagged(
+			"organization_applications", "proposed_name", [f"like.{FIXTURE_PREFIX}*"],
+			{"select": "application_id,proposed_name", "submitted_at": f"lt.{cutoff}"},
+		)
+		for batch in _batches([r["application_id"] for r in applications]):
+			names = [r["proposed_name"] for r in applications if r["application_id"] in batch]
+			self._delete_quietly("organizations", {"name": in_filter(names)})
+			self._delete_quietly("organization_applications", {"application_id": in_filter(batch)})
+
+		email_patterns = [f"like.*{EMAIL_TAG}*"] + LEGACY_EMAILS
+		try:
+			profiles = self._select_tagged(
+				"profiles", "email", email_patterns, {"select": "user_id", "created_at": f"lt.{cutoff}"}
+			)
+		except SupabaseError as e:
+			if e.status != 400:
+				raise
+			# profiles without created_at: the age cutoff cannot be applied, so accounts of
+			# runs still in progress would go too
+			if force:
+				profiles = self._select_tagged("profiles", "email", email_patterns, {"select": "user_id"})
+			else:
+				print("[sweep] profiles has no created_at; skipping accounts (--force deletes every tagged account)")
+				profiles = []
+		self.delete_users(sorted({r["user_id"] for r in profiles}))
+		return {"events": len(events), "applications": len(applications), "users": len(profiles)}
+
+	def _delete_quietly(self, table: str, filters: dict) -> None:
+		try:
+			self.client.delete(table, filters)
+		except SupabaseError as e:
+			# Optional tables (event_counters, registrations, ...) may not exist everywhere
+			if e.status not in (400, 404):
+				raise
+
+	def __enter__(self) -> "Fixtures":
+		return self
+
+	def __exit__(self, *_exc: Any) -> None:
+		self.teardown()
+
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description="Remove test-created data")
+	parser.add_argument("command", choices=["sweep"])
+	parser.add_argument("--older-than", type=float, default=24.0, help="hours")
+	parser.add_argument("--force", action="store_true", help="delete tagged accounts even when their age cannot be checked")
+	args = parser.parse_args()
+	fx = Fixtures()
+	if not fx.enabled:
+		print("[sweep] SUPABASE_URL / key not configured")
+		return 1
+	counts = fx.sweep(args.older_than, force=args.force)
+	print("[sweep] deleted " + ", ".join(f"{n} {kind}" for kind, n in counts.items()))
+	return 0
+
+
+if __name__ == "__main__":
+	raise SystemExit(main())
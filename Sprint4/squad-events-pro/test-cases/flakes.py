@@ -0,0 +1,88 @@
+"""
+Flake statistics and quarantine for master.py
+
+What it does
+- Keeps the last FLAKE_HISTORY outcomes of every case: "pass", "flaky" (passed on retry)
+  or "fail"
+- Quarantines a case once it has at least FLAKE_MIN_RUNS outcomes and FLAKE_THRESHOLD of
+  them were "flaky". Hard failures do not count: a case that fails even on retry is broken
+  (or just regressed), not flaky, and keeps blocking
+- Releases a quarantined case after FLAKE_RELEASE_STREAK clean passes in a row
+- Moves a quarantined case back to blocking after FLAKE_REBLOCK_STREAK "fail" outcomes in
+  a row (no pass even on retry): that is a regression, not flakiness. Its history starts
+  over, so it is judged on the runs after the regression only
+
+master.py runs quarantined cases in their own non-blocking lane.
+"""
+
+import json
+import os
+from typing import Any, Dict, List
+
+from scheduling import UnitResult
+
+
+FLAKE_HISTORY = 20
+FLAKE_MIN_RUNS = 5
+FLAKE_THRESHOLD = 0.1
+FLAKE_RELEASE_STREAK = 10
+FLAKE_REBLOCK_STREAK = 3
+
+
+def outcome(row: Dict[str, Any]) -> str:
+	if not row["ok"]:
+		return "fail"
+	return "flaky" if row.get("attempts", 1) > 1 else "pass"
+
+
+class FlakeStats:
+	def __init__(self, path: str) -> None:
+		self.path = path
+		self.data: Dict[str, Any] = {"cases": {}}
+		if os.path.exists(path):
+			try:
+				with open(path, encoding="utf-8") as fh:
+					self.data = json.load(fh)
+			except (OSError, ValueError):
+				pass
+
+	def _entry(self, script: str, case: str) -> Dict[str, Any]:
+		key = f"{script}::{case}"
+		return self.data.setdefault("cases", {}).setdefault(key, {"history": [], "quarantined": False})
+
+	@staticmethod
+	def unstable_rate(history: List[str]) -> float:
+		if not history:
+			return 0.0
+		return sum(1 for h in history if h == "flaky") / len(history)
+
+	def update(self, results: List[UnitResult]) -> None:
+		for result in results:
+			for row in result.cases:
+				entry = self._entry(result.unit.script, row["case"])
+				entry["history"] = (entry["history"] + [outcome(row)])[-FLAKE_HISTORY:]
+				history = entry["history"]
+				if entry["quarantined"]:
+					recent = history[-FLAKE_RELEASE_STREAK:]
+					if len(recent) == FLAKE_RELEASE_STREAK and all(h == "pass" for h in recent):
+						entry["quarantined"] = False
+					elif history[-FLAKE_REBLOCK_STREAK:] == ["fail"] * FLAKE_REBLOCK_STREAK:
+						entry["quarantined"] = False
+						entry["history"] = []
+				elif len(history) >= FLAKE_MIN_RUNS and self.unstable_rate(history) >= FLAKE_THRESHOLD:
+					entry["quarantined"] = True
+
+	def quarantined(self) -> Dict[str, List[str]]:
+		held: Dict[str, List[str]] = {}
+		for key, entry in self.data.get("cases", {}).items():
+			if entry.get("quarantined"):
+				script, case = key.split("::", 1)
+				held.setdefault(script, []).append(case)
+		return held
+
+	def save(self) -> None:
+		os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+		tmp = f"{self.path}.tmp"
+		with open(tmp, "w", encoding="utf-8") as fh:
+			json.dump(self.data, fh, indent=2, sort_keys=True)
+		os.replace(tmp, self.path)
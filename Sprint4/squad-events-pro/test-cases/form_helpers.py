@@ -0,0 +1,214 @@
+"""
+Shared form helpers for the Selenium suites
+
+What it does
+- reset_form: puts an already-mounted form back into a pristine state (React field state,
+  tags, toasts, `required` attributes) without reloading the page, then verifies it
+- Suites call reset_form before each validation case and only fall back to a full
+  navigation (open_signup / open_create_event) when the reset check fails
+- bulk_fill: sets every field, a select option and tags in one in-page call using
+  React-compatible native value setters, and returns the resulting values for verification
+
+Environment options (PowerShell)
+- $env:FORM_RESET = "1"    # "0" forces a full page load before every validation case
+"""
+
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from selenium import webdriver
+
+
+FORM_RESET = os.getenv("FORM_RESET", "1") == "1"
+
+RESET_WAIT_SEC = 2.0
+
+# Used instead of a bare removeAttribute so reset_form knows which fields to restore
+DROP_REQUIRED_JS = """
+const el = arguments[0];
+if (el.hasAttribute('required')) el.dataset.resetRequired = '1';
+el.removeAttribute('required');
+"""
+
+# React tracks input values through the native setter; assigning el.value directly is ignored
+RESET_FORM_JS = """
+const [ids, readyId, tagPlaceholder] = arguments;
+if (!document.getElementById(readyId)) return false;
+
+document.querySelectorAll('[toast-close]').forEach(b => b.click());
+
+const setNative = (el, value) => {
+	const proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+	Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+	el.dispatchEvent(new Event('input', { bubbles: true }));
+	el.dispatchEvent(new Event('change', { bubbles: true }));
+};
+
+for (const id of ids) {
+	const el = document.getElementById(id);
+	if (!el) return false;
+	setNative(el, '');
+	if (el.dataset.resetRequired === '1') {
+		el.setAttribute('required', '');
+		delete el.dataset.resetRequired;
+	}
+}
+
+if (tagPlaceholder) {
+	const tagInput = document.querySelector(`input[placeholder="${tagPlaceholder}"]`);
+	if (!tagInput) return false;
+	setNative(tagInput, '');
+	// React commits a removal after this script returns, so re-querying would hit the first
+	// tag every time. Badges are keyed by tag and each X removes its own tag: click them all.
+	const group = tagInput.closest('.space-y-2') || document;
+	for (const x of [...group.querySelectorAll('svg.cursor-pointer')]) {
+		x.dispatchEvent(new MouseEvent('click', { bubbles: true }));
+	}
+}
+
+if (document.activeElement) document.activeElement.blur();
+return true;
+"""
+
+PRISTINE_JS = """
+const [ids, tagPlaceholder] = arguments;
+const fieldsEmpty = ids.every(id => {
+	const el = document.getElementById(id);
+	return el && el.value === '' && !el.dataset.resetRequired;
+});
+const noToasts = document.querySelectorAll('[toast-close]').length === 0;
+let noTags = true;
+if (tagPlaceholder) {
+	const tagInput = document.querySelector(`input[placeholder="${tagPlaceholder}"]`);
+	const group = tagInput ? (tagInput.closest('.space-y-2') || document) : null;
+	noTags = !!tagInput && tagInput.value === '' && !group.querySelector('svg.cursor-pointer');
+}
+const submit = document.querySelector("button[type='submit']");
+return fieldsEmpty && noToasts && noTags && !!submit && !submit.disabled;
+"""
+
+
+def reset_form(
+	drv: webdriver.Chrome,
+	field_ids: List[str],
+	*,
+	ready_id: str,
+	tag_placeholder: Optional[str] = None,
+) -> bool:
+	"""Reset the mounted form in place; False means the caller should navigate instead."""
+	if not FORM_RESET:
+		return False
+	try:
+		if not drv.execute_script(RESET_FORM_JS, field_ids, ready_id, tag_placeholder):
+			return False
+		end = time.time() + RESET_WAIT_SEC
+		while time.time() < end:
+			if drv.execute_script(PRISTINE_JS, field_ids, tag_placeholder):
+				return True
+			time.sleep(0.1)
+	except Exception:
+		pass
+	return False
+
+
+# One async script: fields, select option and tags are applied in the page, then read back.
+# Awaiting a frame between steps lets React commit state before the next interaction.
+BULK_FILL_JS = """
+const [values, keepRequired, selectText, tags, tagPlaceholder, done] = arguments;
+const frame = () => new Promise(r => requestAnimationFrame(() => setTimeout(r, 0)));
+const setNative = (el, value) => {
+	const proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+	Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+	el.dispatchEvent(new Event('input', { bubbles: true }));
+	el.dispatchEvent(new Event('change', { bubbles: true }));
+};
+
+(async () => {
+	for (const [id, value] of Object.entries(values)) {
+		const el = document.getElementById(id);
+		if (!el) throw new Error('No element with id ' + id);
+		if (el.type === 'datetime-local') el.removeAttribute('min');
+		setNative(el, value);
+		if (!value && !keepRequired) {
+			if (el.hasAttribute('required')) el.dataset.resetRequired = '1';
+			el.removeAttribute('required');
+		}
+	}
+	await frame();
+
+	let selected = null;
+	if (selectText) {
+		const trigger = document.querySelector("button[role='combobox']");
+		if (trigger) {
+			trigger.dispatchEvent(new PointerEvent('pointerdown', { bubbles: true, button: 0, pointerType: 'mouse' }));
+			let option = null;
+			for (let i = 0; i < 20 && !option; i++) {
+				await frame();
+				option = [...document.querySelectorAll("[role='option']")].find(o => o.textContent.includes(selectText));
+			}
+			if (option) {
+				option.click();
+				await frame();
+			}
+			selected = trigger.textContent.trim();
+		}
+	}
+
+	let tagGroup = null;
+	if (tagPlaceholder) {
+		const input = document.querySelector(`input[placeholder="${tagPlaceholder}"]`);
+		if (input) {
+			tagGroup = input.closest('.space-y-2');
+			const addBtn = [...input.parentElement.querySelectorAll('button')].find(b => b.textContent.trim() === 'Add');
+			for (const tag of tags) {
+				setNative(input, tag);
+				await frame();
+				if (addBtn) addBtn.click();
+				await frame();
+			}
+		}
+	}
+
+	const fields = {};
+	for (const id of Object.keys(values)) fields[id] = document.getElementById(id).value;
+	const addedTags = tagGroup
+		? [...tagGroup.querySelectorAll('svg.cursor-pointer')].map(x => x.parentElement.textContent.trim())
+		: [];
+	done({ fields, selected, tags: addedTags });
+})().catch(e => done({ error: String(e) }));
+"""
+
+
+def bulk_fill(
+	drv: webdriver.Chrome,
+	values: Dict[str, str],
+	*,
+	keep_required: bool = True,
+	select_text: str = "",
+	tags: Optional[List[str]] = None,
+	tag_placeholder: Optional[str] = None,
+) -> Dict[str, Any]:
+	"""Fill fields (by id), one select option and tags in a single round trip; returns what the page holds."""
+	return drv.execute_async_script(
+		BULK_FILL_JS, values, keep_required, select_text, tags or [], tag_placeholder
+	)
+
+
+def bulk_fill_mismatches(
+	result: Dict[str, Any],
+	values: Dict[str, str],
+	select_text: str = "",
+	tags: Optional[List[str]] = None,
+) -> List[str]:
+	if result.get("error"):
+		return [result["error"]]
+	mismatches = [
+		field_id for field_id, value in values.items()
+		if result.get("fields", {}).get(field_id) != value
+	]
+	if select_text and select_text not in (result.get("selected") or ""):
+		mismatches.append("select")
+	if sorted(result.get("tags") or []) != sorted({t.strip() for t in (tags or []) if t.strip()}):
+		mismatches.append("tags")
+	return mismatches
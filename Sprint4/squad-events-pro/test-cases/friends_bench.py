@@ -0,0 +1,316 @@
+"""
+Friend-graph scaling test for getFriends / getFriendsEvents / getIncomingFriendRequests
+
+What it does
+- Seeds BENCH_USERS profiles in the bench schema with a power-law friend graph (a few
+  popular students, a long tail with a handful of friends), a few tickets per user and
+  some pending requests
+- Adds one probe user per degree in FRIEND_DEGREES (10 ... 1000), whose friends are
+  picked by preferential attachment, so power users know the popular students
+- Replays, for every probe, the calls src/services/database.ts makes, one statement per
+  supabase-js round trip and in the same order (getFriendsEvents: both friend_requests
+  directions, tickets for the friends, event_registrations / registrations when that
+  finds nothing, then the events)
+- Records per function: backend calls, rows fetched, in-database p50/p95, the size of
+  the `in.(...)` filters the app puts in the URL, and an estimated page latency of
+  p50 + calls x RTT_MS, since the calls are awaited one after another
+- Fits latency = a + b x degree, writes the curve to .harness\\bench\\friends_curve.json
+  (and friends_curve.png with matplotlib) and, with --baseline, fails when any point is
+  more than REGRESSION_FACTOR slower than the saved curve
+
+Environment options (PowerShell)
+- $env:FRIEND_DEGREES = "10,30,100,300,1000"
+- $env:BENCH_USERS = "20000"
+- $env:RTT_MS = "30"                 # one supabase-js round trip from the browser
+- $env:REGRESSION_FACTOR = "1.5"
+- see pg_bench.py for DATABASE_URL / BENCH_SCHEMA
+
+Usage
+	python friends_bench.py
+	python friends_bench.py --baseline .harness\\bench\\friends_curve.baseline.json
+
+Requires: pip install matplotlib (optional, for the plot)
+"""
+
+import argparse
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+	import matplotlib
+	matplotlib.use("Agg")
+	import matplotlib.pyplot as plt
+except ImportError:  # optional: the JSON curve is written either way
+	plt = None
+
+import pg_bench
+from supabase_rest import in_filter
+
+
+FRIEND_DEGREES = os.getenv("FRIEND_DEGREES", "10,30,100,300,1000")
+BENCH_USERS = int(os.getenv("BENCH_USERS", "20000"))
+BENCH_EVENTS = 20000
+BENCH_RUNS = int(os.getenv("BENCH_RUNS", "20"))
+RTT_MS = float(os.getenv("RTT_MS", "30"))
+REGRESSION_FACTOR = float(os.getenv("REGRESSION_FACTOR", "1.5"))
+PROBE_EMAIL = "bench-probe-{degree}@bench.local"
+
+FUNCTIONS = ["getFriends", "getFriendsEvents", "getIncomingFriendRequests"]
+
+
+def seed_graph(conn: Any, users: int) -> None:
+	pg_bench.seed_events(conn, BENCH_EVENTS)
+	have = conn.execute("select count(*) from profiles where email like 'bench-user-%'").fetchone()[0]
+	if have >= users:
+		return
+	conn.execute(
+		"insert into profiles (email, full_name) "
+		"select 'bench-user-' || g || '@bench.local', 'Bench User ' || g from generate_series(%s, %s) g",
+		(have + 1, users),
+	)
+	# Out-degree ~ Pareto, targets skewed to low ranks: a few hubs, a long tail
+	conn.execute(
+		"""
+		with u as (select array_agg(user_id order by email) ids from profiles where email like 'bench-user-%%')
+		insert into friend_requests (requester_id, addressee_id, status, created_at)
+		select u.ids[g], u.ids[1 + floor(power(random(), 2.5) * array_length(u.ids, 1))::int],
+			case when random() < 0.9 then 'accepted' else 'pending' end,
+			now() - random() * interval '180 days'
+		from u, generate_series(%(from)s, %(to)s) g,
+			lateral generate_series(1, least(300, floor(2 * power(random() + 1e-9 + 0 * g, -1 / 1.3)))::int) d
+		""",
+		{"from": have + 1, "to": users},
+	)
+	conn.execute("delete from friend_requests where requester_id = addressee_id")
+	conn.execute(
+		"""
+		insert into friendships (user_id, friend_id, created_at)
+		select requester_id, addressee_id, created_at from friend_requests where status = 'accepted'
+		union all
+		select addressee_id, requester_id, created_at from friend_requests where status = 'accepted'
+		on conflict do nothing
+		"""
+	)
+	conn.execute(
+		"""
+		with e as (select array_agg(event_id) ids from events)
+		insert into tickets (event_id, user_id, qr_code)
+		select e.ids[1 + floor(random() * array_length(e.ids, 1))::int], p.user_id, 'QR_friend_' || p.user_id || '_' || k
+		from e, profiles p, lateral generate_series(1, floor(random() * 6 + 0 * length(p.email))::int) k
+		where p.email like 'bench-user-%'
+		"""
+	)
+	conn.execute("analyze profiles; analyze friend_requests; analyze friendships; analyze tickets")
+
+
+def seed_probe(conn: Any, degree: int) -> Any:
+	email = PROBE_EMAIL.format(degree=degree)
+	row = conn.execute("select user_id from profiles where email = %s", (email,)).fetchone()
+	if row:
+		return row[0]
+	uid = conn.execute(
+		"insert into profiles (email, full_name) values (%s, %s) returning user_id", (email, f"Probe {degree}")
+	).fetchone()[0]
+	# Weighted sampling without replacement (key = random^(1/weight)), weight = 1 + degree
+	conn.execute(
+		"""
+		with deg as (
+			select p.user_id, count(f.friend_id) d
+			from profiles p left join friendships f on f.user_id = p.user_id
+			where p.email like 'bench-user-%%' group by p.user_id
+		), picked as (
+			select user_id, row_number() over () n from deg
+			order by power(random(), 1.0 / (1 + d)) desc limit %(degree)s
+		)
+		insert into friend_requests (requester_id, addressee_id, status)
+		select case when n %% 2 = 0 then %(uid)s else user_id end,
+			case when n %% 2 = 0 then user_id else %(uid)s end, 'accepted'
+		from picked
+		""",
+		{"uid": uid, "degree": degree},
+	)
+	conn.execute(
+		"insert into friendships (user_id, friend_id) "
+		"select %(uid)s, case when requester_id = %(uid)s then addressee_id else requester_id end "
+		"from friend_requests where status = 'accepted' and %(uid)s in (requester_id, addressee_id)",
+		{"uid": uid},
+	)
+	conn.execute(
+		"insert into friend_requests (requester_id, addressee_id, status) "
+		"select user_id, %s, 'pending' from profiles where email like 'bench-user-%%' order by random() limit %s",
+		(uid, max(1, degree // 10)),
+	)
+	return uid
+
+
+class Replay:
+	"""Runs one app function as its sequence of round trips and counts them."""
+
+	def __init__(self, conn: Any, uid: Any) -> None:
+		self.conn = conn
+		self.uid = uid
+		self.calls = 0
+		self.rows = 0
+		self.url_bytes = 0
+
+	def _call(self, sql: str, params: Any = None, in_values: Optional[List[Any]] = None) -> List[tuple]:
+		self.calls += 1
+		if in_values is not None:
+			self.url_bytes = max(self.url_bytes, len(in_filter(in_values)))
+		rows = self.conn.execute(sql, params).fetchall()
+		self.rows += len(rows)
+		return rows
+
+	def get_friends(self) -> None:
+		self._call("select user_id, friend_id, created_at from friendships where user_id = %s", (self.uid,))
+
+	def get_friends_events(self) -> None:
+		fr1 = self._call(
+			"select addressee_id from friend_requests where requester_id = %s and status = 'accepted'", (self.uid,)
+		)
+		fr2 = self._call(
+			"select requester_id from friend_requests where addressee_id = %s and status = 'accepted'", (self.uid,)
+		)
+		friends = list({r[0] for r in fr1} | {r[0] for r in fr2})
+		if not friends:
+			return
+		rows = self._call("select event_id, user_id from tickets where user_id = any(%s)", (friends,), friends)
+		if not rows:
+			rows = self._call(
+				"select event_id, user_id, status from event_registrations where user_id = any(%s)", (friends,), friends
+			)
+		if not rows:
+			rows = self._call("select event_id, user_id from registrations where user_id = any(%s)", (friends,), friends)
+		event_ids = list({r[0] for r in rows})
+		if not event_ids:
+			return
+		self._call(
+			"select event_id, title, description, starts_at, ends_at, location, max_cap, image_url, status, "
+			"created_at, created_by, category from events where event_id = any(%s) order by starts_at asc",
+			(event_ids,),
+			event_ids,
+		)
+
+	def get_incoming_friend_requests(self) -> None:
+		self._call(
+			"select fr.request_id, fr.requester_id, fr.addressee_id, fr.created_at, fr.status, "
+			"p.user_id, p.full_name, p.avatar_url, p.email "
+			"from friend_requests fr left join profiles p on p.user_id = fr.requester_id "
+			"where fr.addressee_id = %s and fr.status = 'pending' order by fr.created_at desc",
+			(self.uid,),
+		)
+
+
+def measure(conn: Any, uid: Any, name: str, runs: int) -> Dict[str, Any]:
+	method: Dict[str, Callable[[Replay], None]] = {
+		"getFriends": Replay.get_friends,
+		"getFriendsEvents": Replay.get_friends_events,
+		"getIncomingFriendRequests": Replay.get_incoming_friend_requests,
+	}
+	last: Dict[str, Replay] = {}
+
+	def once() -> None:
+		replay = Replay(conn, uid)
+		method[name](replay)
+		last["replay"] = replay
+
+	samples = pg_bench.time_calls(once, runs)
+	replay = last["replay"]
+	latency = pg_bench.latency_summary(samples)
+	return {
+		"calls": replay.calls,
+		"rows": replay.rows,
+		"url_bytes": replay.url_bytes,
+		**latency,
+		"page_ms": round(latency["p50_ms"] + replay.calls * RTT_MS, 1),
+	}
+
+
+def fit(points: List[Dict[str, Any]], name: str) -> Dict[str, float]:
+	xs = [p["degree"] for p in points]
+	ys = [p[name]["page_ms"] for p in points]
+	n = len(xs)
+	mean_x, mean_y = sum(xs) / n, sum(ys) / n
+	var = sum((x - mean_x) ** 2 for x in xs)
+	slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var if var else 0.0
+	return {"intercept_ms": round(mean_y - slope * mean_x, 2), "ms_per_friend": round(slope, 4)}
+
+
+def regressions(points: List[Dict[str, Any]], baseline_path: str) -> List[str]:
+	with open(baseline_path, encoding="utf-8") as fh:
+		baseline = {p["degree"]: p for p in json.load(fh)["points"]}
+	found = []
+	for point in points:
+		base = baseline.get(point["degree"])
+		if not base:
+			continue
+		for name in FUNCTIONS:
+			now, then = point[name], base.get(name)
+			if not then:
+				continue
+			if now["page_ms"] > then["page_ms"] * REGRESSION_FACTOR:
+				found.append(f"{name} at degree {point['degree']}: {then['page_ms']} -> {now['page_ms']} ms")
+			if now["calls"] > then["calls"]:
+				found.append(f"{name} at degree {point['degree']}: {then['calls']} -> {now['calls']} calls")
+	return found
+
+
+def plot(points: List[Dict[str, Any]], path: str) -> None:
+	fig, ax = plt.subplots(figsize=(8, 5))
+	for name in FUNCTIONS:
+		ax.plot([p["degree"] for p in points], [p[name]["page_ms"] for p in points], marker="o", label=name)
+	ax.set_xscale("log")
+	ax.set_xlabel("friends")
+	ax.set_ylabel(f"estimated page latency (ms, RTT {RTT_MS:.0f} ms)")
+	ax.set_title("Friend queries vs graph degree")
+	ax.legend()
+	fig.tight_layout()
+	fig.savefig(path)
+	plt.close(fig)
+
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description="Measure friend queries against friend count")
+	parser.add_argument("--degrees", default=FRIEND_DEGREES)
+	parser.add_argument("--users", type=int, default=BENCH_USERS)
+	parser.add_argument("--runs", type=int, default=BENCH_RUNS)
+	parser.add_argument("--baseline", help="friends_curve.json of an earlier run to regress against")
+	args = parser.parse_args()
+	degrees = sorted(int(d) for d in args.degrees.split(","))
+
+	points: List[Dict[str, Any]] = []
+	with pg_bench.connect() as conn:
+		seed_graph(conn, args.users)
+		for degree in degrees:
+			uid = seed_probe(conn, degree)
+			point: Dict[str, Any] = {"degree": degree}
+			for name in FUNCTIONS:
+				point[name] = measure(conn, uid, name, args.runs)
+			points.append(point)
+			print(f"[BENCH] degree {degree}: " + ", ".join(
+				f"{name} {point[name]['calls']} calls / {point[name]['p50_ms']} ms" for name in FUNCTIONS
+			))
+
+	pg_bench.print_table(
+		[{"degree": p["degree"], **{f"{n}_page_ms": p[n]["page_ms"] for n in FUNCTIONS},
+			"events_url_bytes": p["getFriendsEvents"]["url_bytes"]} for p in points],
+		["degree", *(f"{n}_page_ms" for n in FUNCTIONS), "events_url_bytes"],
+	)
+	curve = {"rtt_ms": RTT_MS, "fit": {n: fit(points, n) for n in FUNCTIONS} if len(points) > 1 else {}, "points": points}
+	path = pg_bench.write_report("friends_curve", curve)
+	if plt is not None and points:
+		plot(points, os.path.splitext(path)[0] + ".png")
+	for name, line in curve["fit"].items():
+		print(f"[SUMMARY] {name}: {line['intercept_ms']} ms + {line['ms_per_friend']} ms per friend")
+
+	if args.baseline:
+		found = regressions(points, args.baseline)
+		for line in found:
+			print(f"[REGRESSION] {line}")
+		return 1 if found else 0
+	return 0
+
+
+if __name__ == "__main__":
+	raise SystemExit(main())
@@ -0,0 +1,150 @@
+"""
+Per-case reporting shared by the E2E scripts
+
+What it does
+- Times every validation case / test_* function and appends one JSON line per case to
+  $HARNESS_RESULTS, which master.py turns into JUnit XML and a timing cache
+- Honors $HARNESS_CASES / $HARNESS_SKIP_CASES (JSON lists of case names) so master.py can
+  split one script's cases across several workers
+- Retries a failing case in place (not the whole script) within a capped budget and
+  marks cases that only passed on retry as flaky
+- Lets other helpers (resource sampling, tracing, ...) hook into case start/finish
+
+Environment options (PowerShell)
+- $env:HARNESS_RETRIES = "1"        # extra attempts per failing case (master.py sets it; 0 otherwise)
+- $env:HARNESS_RETRY_BUDGET = "3"   # extra attempts per script run, across all cases
+
+Scripts run standalone exactly as before when none of these variables are set.
+"""
+
+import json
+import os
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+RESULTS_FILE = os.getenv("HARNESS_RESULTS")
+SCRIPT = os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else "unknown"
+MAX_RETRIES = int(os.getenv("HARNESS_RETRIES", "0"))
+RETRY_BUDGET = int(os.getenv("HARNESS_RETRY_BUDGET", "3"))
+
+
+def _case_set(var: str) -> Optional[Set[str]]:
+	raw = os.getenv(var)
+	if not raw:
+		return None
+	return set(json.loads(raw))
+
+
+INCLUDE_CASES = _case_set("HARNESS_CASES")
+SKIP_CASES = _case_set("HARNESS_SKIP_CASES") or set()
+
+_listeners: List[Any] = []
+_retries_left = RETRY_BUDGET
+
+
+def add_listener(listener: Any) -> None:
+	"""Listener may define case_started(name) and case_finished(name, ok) -> dict of extra fields."""
+	_listeners.append(listener)
+
+
+def selected(name: str) -> bool:
+	if name in SKIP_CASES:
+		return False
+	return INCLUDE_CASES is None or name in INCLUDE_CASES
+
+
+def record(name: str, ok: bool, message: str, duration: float, **extra: Any) -> None:
+	if not RESULTS_FILE:
+		return
+	row: Dict[str, Any] = {
+		"script": SCRIPT,
+		"case": name,
+		"ok": bool(ok),
+		"message": message,
+		"duration": round(duration, 3),
+		"ts": time.time(),
+	}
+	row.update(extra)
+	with open(RESULTS_FILE, "a", encoding="utf-8") as fh:
+		fh.write(json.dumps(row) + "\n")
+
+
+def _outcome(result: Any) -> tuple:
+	# Suites return either (name, ok, message) tuples or plain booleans
+	if isinstance(result, tuple) and len(result) == 3:
+		return bool(result[1]), str(result[2])
+	return bool(result), ""
+
+
+def _started(name: str) -> None:
+	for listener in _listeners:
+		if hasattr(listener, "case_started"):
+			listener.case_started(name)
+
+
+def _finished(name: str, ok: bool, message: str, duration: float, attempts: int) -> None:
+	extra: Dict[str, Any] = {"attempts": attempts, "flaky": ok and attempts > 1}
+	for listener in _listeners:
+		if hasattr(listener, "case_finished"):
+			extra.update(listener.case_finished(name, ok) or {})
+	record(name, ok, message, duration, **extra)
+
+
+def _retry_allowed(name: str, attempts: int, message: str) -> bool:
+	global _retries_left
+	if attempts > MAX_RETRIES or _retries_left <= 0:
+		return False
+	_retries_left -= 1
+	print(f"[RETRY] {name} (attempt {attempts} failed: {message})")
+	return True
+
+
+def run_case(name: str, fn: Callable[[], Any]) -> Any:
+	"""Run one case, retrying failures within the budget; returns what the last attempt returned."""
+	_started(name)
+	start = time.time()
+	attempts, ok, message = 0, False, ""
+	try:
+		while True:
+			attempts += 1
+			try:
+				result = fn()
+			except Exception as e:
+				ok, message = False, f"Exception: {e}"
+				if not _retry_allowed(name, attempts, message):
+					raise
+				continue
+			ok, message = _outcome(result)
+			if ok or not _retry_allowed(name, attempts, message):
+				return result
+	finally:
+		_finished(name, ok, message, time.time() - start, attempts)
+
+
+async def run_case_async(name: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+	"""Coroutine twin of run_case for the asyncio suites."""
+	_started(name)
+	start = time.time()
+	attempts, ok, message = 0, False, ""
+	try:
+		while True:
+			attempts += 1
+			try:
+				result = await fn()
+			except Exception as e:
+				ok, message = False, f"Exception: {e}"
+				if not _retry_allowed(name, attempts, message):
+					raise
+				continue
+			ok, message = _outcome(result)
+			if ok or not _retry_allowed(name, attempts, message):
+				return result
+	finally:
+		_finished(name, ok, message, time.time() - start, attempts)
+
+
+def collect(results: List[tuple], name: str, fn: Callable[[], Any]) -> None:
+	"""Append (name, result) for boolean test_* functions, skipping deselected cases."""
+	if selected(name):
+		results.append((name, run_case(name, fn)))
@@ -0,0 +1,389 @@
+"""
+Per-second load-test metrics store for locustfile.py (SQLite, one file for every run)
+
+What it does
+- Listens to Locust's request events and, once a second, writes per endpoint
+  (request type + name) and per second: requests, failures, bytes, sum/max latency and
+  an HDR-style latency histogram (log-linear buckets, under 2% relative error), plus the
+  running user count
+- Optionally keeps every raw sample too (LOAD_STORE_SAMPLES=1)
+- Each Locust run becomes a row in `runs`, so nothing is lost when the web UI closes
+- `live` tails the newest run in the terminal: rolling RPS, failures and p50/p95/p99 per
+  endpoint over the last few seconds
+- `compare` puts two runs side by side per endpoint, with the p95 change
+
+Several Locust processes (--processes / workers on one machine) can share the file; set
+LOAD_RUN_ID so they record into the same run.
+
+Environment options (PowerShell)
+- $env:LOAD_STORE = "...\\load.sqlite"   # default: test-cases\\.harness\\load.sqlite, "" disables
+- $env:LOAD_RUN_ID = "checkout-v2"       # default: a timestamp
+- $env:LOAD_STORE_SAMPLES = "1"
+
+Usage
+- locust -f locustfile.py ...            (records automatically)
+- python load_store.py runs
+- python load_store.py live [--window 10]
+- python load_store.py compare <run_a> <run_b>     (or: previous latest)
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LOAD_STORE = os.getenv("LOAD_STORE", os.path.join(HERE, ".harness", "load.sqlite"))
+LOAD_RUN_ID = os.getenv("LOAD_RUN_ID", "")
+LOAD_STORE_SAMPLES = os.getenv("LOAD_STORE_SAMPLES", "0") == "1"
+FLUSH_SEC = 1.0
+LIVE_WINDOW_SEC = 10
+
+# Latencies are bucketed in microseconds: values below 2**SUB_BITS keep their own bucket,
+# above that every power of two is split into 2**(SUB_BITS - 1) equal buckets
+SUB_BITS = 6
+HALF = 1 << (SUB_BITS - 1)
+
+SCHEMA_SQL = """
+create table if not exists runs (
+	run_id text primary key,
+	started_at real not null,
+	ended_at real,
+	host text
+);
+create table if not exists stats (
+	run_id text not null,
+	second integer not null,
+	request_type text not null,
+	name text not null,
+	requests integer not null,
+	failures integer not null,
+	bytes integer not null,
+	sum_ms real not null,
+	max_ms real not null,
+	primary key (run_id, second, request_type, name)
+) without rowid;
+create table if not exists histogram (
+	run_id text not null,
+	second integer not null,
+	request_type text not null,
+	name text not null,
+	bucket integer not null,
+	count integer not null,
+	primary key (run_id, second, request_type, name, bucket)
+) without rowid;
+create table if not exists users (
+	run_id text not null,
+	second integer not null,
+	users integer not null,
+	primary key (run_id, second)
+) without rowid;
+create table if not exists samples (
+	run_id text not null,
+	at real not null,
+	request_type text not null,
+	name text not null,
+	ms real not null,
+	bytes integer not null,
+	ok integer not null
+);
+"""
+
+Key = Tuple[int, str, str]
+
+
+def bucket_of(ms: float) -> int:
+	us = max(0, int(ms * 1000))
+	shift = max(0, us.bit_length() - SUB_BITS)
+	return us if shift == 0 else shift * HALF + (us >> shift)
+
+
+def bucket_ms(bucket: int) -> float:
+	"""Midpoint of a bucket, in milliseconds."""
+	if bucket < 2 * HALF:
+		return bucket / 1000
+	shift = bucket // HALF - 1
+	low = (bucket - shift * HALF) << shift
+	return (low + (1 << shift) / 2) / 1000
+
+
+def histogram_percentiles(counts: Dict[int, int], qs: Iterable[float] = (50, 95, 99)) -> Dict[str, Optional[float]]:
+	total = sum(counts.values())
+	out: Dict[str, Optional[float]] = {}
+	ordered = sorted(counts.items())
+	for q in qs:
+		if not total:
+			out[f"p{q:g}_ms"] = None
+			continue
+		rank = q / 100 * total
+		seen = 0
+		for bucket, n in ordered:
+			seen += n
+			if seen >= rank:
+				out[f"p{q:g}_ms"] = round(bucket_ms(bucket), 1)
+				break
+	return out
+
+
+def connect(path: str = LOAD_STORE) -> sqlite3.Connection:
+	os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+	conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+	conn.execute("pragma journal_mode = wal")
+	conn.execute("pragma synchronous = normal")
+	conn.executescript(SCHEMA_SQL)
+	return conn
+
+
+class Recorder:
+	"""Buffers request events in memory and writes them out once a second."""
+
+	def __init__(self, path: str = LOAD_STORE, run_id: str = "", keep_samples: bool = LOAD_STORE_SAMPLES) -> None:
+		self.path = path
+		self.run_id = run_id or LOAD_RUN_ID or datetime.now().strftime("%Y%m%d-%H%M%S")
+		self.keep_samples = keep_samples
+		self.users = lambda: 0
+		self._stats: Dict[Key, List[float]] = {}
+		self._histogram: Dict[Key, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+		self._samples: List[Tuple[Any, ...]] = []
+		self._lock = threading.Lock()
+		self._stop = threading.Event()
+		self._thread: Optional[threading.Thread] = None
+		self._conn: Optional[sqlite3.Connection] = None
+
+	def record(self, request_type: str, name: str, response_time: Optional[float], response_length: Optional[int], exception: Any = None, **_kwargs: Any) -> None:
+		now = time.time()
+		ms = float(response_time or 0)
+		key = (int(now), request_type, name)
+		with self._lock:
+			row = self._stats.get(key)
+			if row is None:
+				row = self._stats[key] = [0, 0, 0, 0.0, 0.0]
+			row[0] += 1
+			row[1] += exception is not None
+			row[2] += response_length or 0
+			row[3] += ms
+			row[4] = max(row[4], ms)
+			self._histogram[key][bucket_of(ms)] += 1
+			if self.keep_samples:
+				self._samples.append((self.run_id, now, request_type, name, ms, response_length or 0, int(exception is None)))
+
+	def start(self, host: str = "") -> None:
+		self._conn = connect(self.path)
+		self._conn.execute(
+			"insert into runs (run_id, started_at, host) values (?, ?, ?) on conflict (run_id) do nothing",
+			(self.run_id, time.time(), host),
+		)
+		self._conn.commit()
+		self._stop.clear()
+		self._thread = threading.Thread(target=self._loop, daemon=True)
+		self._thread.start()
+		print(f"[LOAD] recording run {self.run_id} into {self.path}")
+
+	def stop(self) -> None:
+		if self._thread is None:
+			return
+		self._stop.set()
+		self._thread.join()
+		self._thread = None
+		self.flush()
+		self._conn.execute("update runs set ended_at = ? where run_id = ?", (time.time(), self.run_id))
+		self._conn.commit()
+		self._conn.close()
+		self._conn = None
+
+	def _loop(self) -> None:
+		while not self._stop.wait(FLUSH_SEC):
+			self.flush()
+
+	def flush(self) -> None:
+		with self._lock:
+			stats, self._stats = self._stats, {}
+			histogram, self._histogram = self._histogram, defaultdict(lambda: defaultdict(int))
+			samples, self._samples = self._samples, []
+		conn = self._conn
+		# Upserts add up, so a second split over two flushes (or two processes) stays whole
+		conn.executemany(
+			"insert into stats values (?, ?, ?, ?, ?, ?, ?, ?, ?) on conflict (run_id, second, request_type, name) do update set "
+			"requests = requests + excluded.requests, failures = failures + excluded.failures, "
+			"bytes = bytes + excluded.bytes, sum_ms = sum_ms + excluded.sum_ms, max_ms = max(max_ms, excluded.max_ms)",
+			[(self.run_id, *key, *row) for key, row in stats.items()],
+		)
+		conn.executemany(
+			"insert into histogram values (?, ?, ?, ?, ?, ?) "
+			"on conflict (run_id, second, request_type, name, bucket) do update set count = count + excluded.count",
+			[(self.run_id, *key, bucket, n) for key, buckets in histogram.items() for bucket, n in buckets.items()],
+		)
+		conn.execute(
+			"insert into users values (?, ?, ?) on conflict (run_id, second) do update set users = excluded.users",
+			(self.run_id, int(time.time()), self.users()),
+		)
+		if samples:
+			conn.executemany("insert into samples values (?, ?, ?, ?, ?, ?, ?)", samples)
+		conn.commit()
+
+
+def attach(environment: Any, path: str = LOAD_STORE) -> Optional[Recorder]:
+	"""Record every run of this Locust environment; a no-op when LOAD_STORE is empty."""
+	if not path:
+		return None
+	recorder = Recorder(path)
+	environment.events.request.add_listener(recorder.record)
+
+	def on_test_start(**_kwargs: Any) -> None:
+		runner = environment.runner
+		recorder.users = lambda: runner.user_count if runner else 0
+		recorder.start(environment.host or "")
+
+	environment.events.test_start.add_listener(on_test_start)
+	environment.events.test_stop.add_listener(lambda **_kwargs: recorder.stop())
+	return recorder
+
+
+def resolve_run(conn: sqlite3.Connection, run: str) -> str:
+	"""A run id, or "latest" / "previous" counted by start time."""
+	if run in ("latest", "previous"):
+		rows = conn.execute("select run_id from runs order by started_at desc limit 2").fetchall()
+		index = 0 if run == "latest" else 1
+		if len(rows) <= index:
+			raise SystemExit(f"[LOAD] no {run} run in {LOAD_STORE}")
+		return rows[index][0]
+	if conn.execute("select 1 from runs where run_id = ?", (run,)).fetchone() is None:
+		raise SystemExit(f"[LOAD] unknown run {run}")
+	return run
+
+
+def summarize(conn: sqlite3.Connection, run_id: str, since: int = 0, until: int = 2 ** 62) -> Dict[Tuple[str, str], Dict[str, Any]]:
+	"""Per endpoint totals and percentiles of a run over epoch seconds [since, until)."""
+	where = "run_id = ? and second >= ? and second < ?"
+	params = (run_id, since, until)
+	out: Dict[Tuple[str, str], Dict[str, Any]] = {}
+	for request_type, name, requests, failures, sum_ms, max_ms, first, last in conn.execute(
+		f"select request_type, name, sum(requests), sum(failures), sum(sum_ms), max(max_ms), min(second), max(second) "
+		f"from stats where {where} group by request_type, name",
+		params,
+	):
+		out[(request_type, name)] = {
+			"requests": requests,
+			"failures": failures,
+			"fail_pct": round(100.0 * failures / requests, 2) if requests else 0.0,
+			"mean_ms": round(sum_ms / requests, 1) if requests else None,
+			"max_ms": round(max_ms, 1),
+			"seconds": last - first + 1,
+		}
+	counts: Dict[Tuple[str, str], Dict[int, int]] = defaultdict(dict)
+	for request_type, name, bucket, n in conn.execute(
+		f"select request_type, name, bucket, sum(count) from histogram where {where} group by request_type, name, bucket",
+		params,
+	):
+		counts[(request_type, name)][bucket] = n
+	for key, row in out.items():
+		row.update(histogram_percentiles(counts[key]))
+	return out
+
+
+def list_runs(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+	rows = []
+	for run_id, started, ended, host in conn.execute(
+		"select run_id, started_at, ended_at, host from runs order by started_at"
+	).fetchall():
+		requests, failures, first, last = conn.execute(
+			"select sum(requests), sum(failures), min(second), max(second) from stats where run_id = ?", (run_id,)
+		).fetchone()
+		peak = conn.execute("select max(users) from users where run_id = ?", (run_id,)).fetchone()[0]
+		rows.append({
+			"run": run_id,
+			"started": datetime.fromtimestamp(started).strftime("%Y-%m-%d %H:%M"),
+			"duration_s": round((ended or time.time()) - started),
+			"host": host or "",
+			"peak_users": peak or 0,
+			"requests": requests or 0,
+			"rps": round((requests or 0) / (last - first + 1), 1) if first is not None else 0,
+			"fail_pct": round(100.0 * failures / requests, 2) if requests else 0.0,
+		})
+	return rows
+
+
+def live(conn: sqlite3.Connection, run: str, window: int) -> None:
+	import pg_bench
+
+	while True:
+		run_id = resolve_run(conn, run)
+		now = int(time.time())
+		# The current second is still being filled; stop at the last complete one
+		rows = []
+		for (request_type, name), s in sorted(summarize(conn, run_id, since=now - window, until=now).items()):
+			rows.append({
+				"type": request_type, "name": name,
+				"rps": round(s["requests"] / window, 1), "fail_pct": s["fail_pct"],
+				"p50_ms": s["p50_ms"], "p95_ms": s["p95_ms"], "p99_ms": s["p99_ms"], "max_ms": s["max_ms"],
+			})
+		users = conn.execute("select users from users where run_id = ? order by second desc limit 1", (run_id,)).fetchone()
+		print("\033[2J\033[H", end="")
+		print(f"[LOAD] run {run_id}, {users[0] if users else 0} users, last {window}s ({datetime.now():%H:%M:%S}); Ctrl+C to quit\n")
+		pg_bench.print_table(rows, ["type", "name", "rps", "fail_pct", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+		time.sleep(FLUSH_SEC)
+
+
+def compare(conn: sqlite3.Connection, a: str, b: str) -> List[Dict[str, Any]]:
+	run_a, run_b = resolve_run(conn, a), resolve_run(conn, b)
+	left, right = summarize(conn, run_a), summarize(conn, run_b)
+	rows = []
+	for key in sorted(set(left) | set(right)):
+		x, y = left.get(key, {}), right.get(key, {})
+		row: Dict[str, Any] = {"type": key[0], "name": key[1]}
+		for label, s in (("a", x), ("b", y)):
+			row[f"{label}_rps"] = round(s["requests"] / s["seconds"], 1) if s else "-"
+			row[f"{label}_fail_pct"] = s.get("fail_pct", "-")
+			for q in ("p50_ms", "p95_ms", "p99_ms"):
+				row[f"{label}_{q}"] = s.get(q, "-")
+		if x.get("p95_ms") and y.get("p95_ms"):
+			row["p95_change"] = f"{100.0 * (y['p95_ms'] - x['p95_ms']) / x['p95_ms']:+.1f}%"
+		else:
+			row["p95_change"] = "-"
+		rows.append(row)
+	print(f"[LOAD] a = {run_a}, b = {run_b}")
+	return rows
+
+
+def main() -> int:
+	import pg_bench
+
+	parser = argparse.ArgumentParser(description="Inspect load-test runs recorded by locustfile.py")
+	parser.add_argument("--store", default=LOAD_STORE)
+	sub = parser.add_subparsers(dest="cmd", required=True)
+	sub.add_parser("runs", help="list recorded runs")
+	p_live = sub.add_parser("live", help="rolling view of a run in progress")
+	p_live.add_argument("--run", default="latest")
+	p_live.add_argument("--window", type=int, default=LIVE_WINDOW_SEC, help="seconds")
+	p_compare = sub.add_parser("compare", help="two runs side by side per endpoint")
+	p_compare.add_argument("run_a")
+	p_compare.add_argument("run_b")
+	args = parser.parse_args()
+
+	if not os.path.exists(args.store):
+		raise SystemExit(f"[LOAD] no store at {args.store}; run locust first")
+	conn = connect(args.store)
+	if args.cmd == "runs":
+		rows = list_runs(conn)
+		pg_bench.print_table(rows, ["run", "started", "duration_s", "host", "peak_users", "requests", "rps", "fail_pct"])
+	elif args.cmd == "live":
+		try:
+			live(conn, args.run, args.window)
+		except KeyboardInterrupt:
+			pass
+	else:
+		rows = compare(conn, args.run_a, args.run_b)
+		columns = ["type", "name"] + [
+			f"{side}_{m}" for side in ("a", "b") for m in ("rps", "fail_pct", "p50_ms", "p95_ms", "p99_ms")
+		] + ["p95_change"]
+		pg_bench.print_table(rows, columns)
+	return 0
+
+
+if __name__ == "__main__":
+	raise SystemExit(main())
@@ -1,5 +1,66 @@
-from locust import HttpUser, task, between
+from locust import HttpUser, User, events, task, between
 import os
+import random
+import time
+
+import load_store
+from fixtures import tagged_email
+from supabase_rest import SUPABASE_ANON_KEY, SUPABASE_URL, SupabaseError, SupabaseRest
+from token_pool import POOL_EMAIL_DOMAIN, POOL_PASSWORD, TOKEN_POOL_FILE, TokenPool, load as load_token_pool
+
+
+APP_BASE_URL = os.getenv("APP_BASE_URL", "http://localhost:5173").rstrip("/")
+BROWSER_USERS = int(os.getenv("BROWSER_USERS", "0"))
+STUDENT_EMAIL = os.getenv("STUDENT_EMAIL", "student@gmail.com")
+STUDENT_PASSWORD = os.getenv("STUDENT_PASSWORD", "student1")
+RENDER_TIMEOUT_SEC = 20
+# Measures auth.signIn / auth.signUp throughput on its own: AUTH_SCENARIO=1 locust ... AuthUser
+AUTH_SCENARIO = os.getenv("AUTH_SCENARIO") == "1"
+
+_token_pool = None
+
+
+def token_pool():
+    # One pool per Locust process, loaded on first use
+    global _token_pool
+    if _token_pool is None:
+        _token_pool = TokenPool()
+    return _token_pool
+
+
+def pool_ready():
+    # Users that need pooled accounts stay abstract until the pool holds some
+    try:
+        return bool(SUPABASE_URL and load_token_pool(TOKEN_POOL_FILE))
+    except (OSError, ValueError):
+        return False
+
+
+@events.init.add_listener
+def record_run(environment, **_kwargs):
+    # Per-second stats and latency histograms of every run go to .harness/load.sqlite
+    # (python load_store.py live / compare)
+    load_store.attach(environment)
+
+# Client-side navigation (what a click on a nav link does), timed inside the page until the
+# new route has painted a heading and no skeleton (.animate-pulse) or spinner is left
+ROUTE_RENDERED_JS = """
+const [path, timeoutMs, done] = arguments;
+for (const h of document.querySelectorAll('h1, h2, h3')) h.dataset.staleRoute = '1';
+const t0 = performance.now();
+history.pushState({}, '', path);
+dispatchEvent(new PopStateEvent('popstate', { state: history.state }));
+let stable = 0;
+const tick = () => {
+    const fresh = [...document.querySelectorAll('h1, h2, h3')].some(h => !h.dataset.staleRoute);
+    const busy = document.querySelector('.animate-pulse, .animate-spin');
+    stable = fresh && !busy ? stable + 1 : 0;
+    if (stable >= 2) return done({ ms: performance.now() - t0 });
+    if (performance.now() - t0 > timeoutMs) return done({ error: 'not rendered within ' + timeoutMs + ' ms' });
+    requestAnimationFrame(tick);
+};
+requestAnimationFrame(tick);
+"""
 
 
 class FrontendUser(HttpUser):
@@ -30,3 +91,207 @@ class FrontendUser(HttpUser):
     @task(1)
     def visit_login(self):
         self.client.get("/login")
+
+
+class BrowserUser(User):
+    """A few real headless Chrome users mixed in with the HTTP users.
+
+    They log in as the student account and walk the database-operations.py routes through
+    client-side navigation, reporting route-to-rendered time as BROWSER requests, so the
+    Locust stats show end-user latency (including React rendering) under backend load.
+    """
+
+    # Opt-in (BROWSER_USERS=2): HTTP-only runs have no selenium or Chrome
+    abstract = BROWSER_USERS <= 0
+    fixed_count = BROWSER_USERS
+    wait_time = between(2, 5)
+
+    def on_start(self):
+        # Imported here so HTTP-only runs do not need selenium installed
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        self.base_url = (self.host or APP_BASE_URL).rstrip("/")
+        opts = Options()
+        opts.add_argument("--headless=new")
+        opts.add_argument("--window-size=1280,900")
+        opts.add_argument("--no-sandbox")
+        opts.add_argument("--disable-dev-shm-usage")
+        opts.add_argument("--disable-gpu")
+        self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=opts)
+        self.driver.set_script_timeout(RENDER_TIMEOUT_SEC + 5)
+        self.path = None
+        self.event_ids = self._event_ids()
+        self._timed("login", self._login)
+
+    def on_stop(self):
+        self.driver.quit()
+
+    def _event_ids(self):
+        rest = SupabaseRest()
+        if not rest.enabled:
+            return []
+        try:
+            rows = rest.select("events", {"select": "event_id", "status": "eq.published", "limit": "20"})
+        except SupabaseError:
+            return []
+        return [r["event_id"] for r in rows]
+
+    def _login(self):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        self.driver.get(self.base_url)
+        email = WebDriverWait(self.driver, RENDER_TIMEOUT_SEC).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='email']"))
+        )
+        email.send_keys(STUDENT_EMAIL)
+        self.driver.find_element(By.CSS_SELECTOR, "input[type='password']").send_keys(STUDENT_PASSWORD)
+        self.driver.find_element(
+            By.XPATH, "//button[contains(text(), 'Login') or contains(text(), 'Sign In')]"
+        ).click()
+        WebDriverWait(self.driver, RENDER_TIMEOUT_SEC).until(
+            lambda d: not d.find_elements(By.CSS_SELECTOR, "input[type='password']")
+        )
+        self.path = None
+
+    def _fire(self, name, elapsed_ms, exc):
+        self.environment.events.request.fire(
+            request_type="BROWSER",
+            name=name,
+            response_time=elapsed_ms,
+            response_length=0,
+            exception=exc,
+            context={},
+        )
+
+    def _timed(self, name, fn):
+        exc = None
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            exc = e
+        self._fire(name, (time.perf_counter() - start) * 1000, exc)
+
+    def _route(self, path, name=None):
+        if self.path == path:
+            # Same route twice would not remount the page; hop home first (not measured)
+            self.driver.execute_async_script(ROUTE_RENDERED_JS, "/", RENDER_TIMEOUT_SEC * 1000)
+        exc = None
+        start = time.perf_counter()
+        try:
+            result = self.driver.execute_async_script(ROUTE_RENDERED_JS, path, RENDER_TIMEOUT_SEC * 1000)
+            if result.get("error"):
+                raise RuntimeError(result["error"])
+            elapsed = result["ms"]
+        except Exception as e:
+            exc = e
+            elapsed = (time.perf_counter() - start) * 1000
+        self.path = path
+        self._fire(name or path, elapsed, exc)
+
+    @task(3)
+    def search_events(self):
+        self._route("/search")
+
+    @task(2)
+    def analytics(self):
+        self._route("/analytics")
+
+    @task(2)
+    def my_tickets(self):
+        self._route("/my-tickets")
+
+    @task(1)
+    def event_details(self):
+        if self.event_ids:
+            self._route(f"/events/{random.choice(self.event_ids)}", name="/events/[id]")
+
+
+class SupabaseUser(HttpUser):
+    """Logged-in student hitting the same PostgREST queries as the app.
+
+    Sessions come from the pre-provisioned token pool (python token_pool.py provision),
+    so starting users never signs anyone in. Skipped until the pool has accounts.
+    """
+
+    abstract = not pool_ready()
+    # --host (the app's URL in CI) overrides this, hence the absolute URLs below
+    host = SUPABASE_URL
+    wait_time = between(1, 3)
+
+    def on_start(self):
+        self.account = token_pool().lease()
+
+    def on_stop(self):
+        token_pool().release(self.account)
+
+    def _headers(self):
+        # Read on every request: the background refresher swaps tokens in place
+        return {"apikey": SUPABASE_ANON_KEY, "Authorization": f"Bearer {self.account['access_token']}"}
+
+    @task(3)
+    def list_events(self):
+        self.client.get(f"{SUPABASE_URL}/rest/v1/events", params={"select": "*"}, headers=self._headers(), name="events")
+
+    @task(2)
+    def my_tickets(self):
+        self.client.get(
+            f"{SUPABASE_URL}/rest/v1/tickets",
+            params={"select": "ticket_id,event_id,user_id,qr_code,created_at", "user_id": f"eq.{self.account['user_id']}"},
+            headers=self._headers(),
+            name="tickets (mine)",
+        )
+
+    @task(1)
+    def starred(self):
+        self.client.get(
+            f"{SUPABASE_URL}/rest/v1/starred_events",
+            params={"select": "event_id", "user_id": f"eq.{self.account['user_id']}"},
+            headers=self._headers(),
+            name="starred_events (mine)",
+        )
+
+
+class AuthUser(HttpUser):
+    """auth.signIn / auth.signUp throughput; only runs when AUTH_SCENARIO=1 and the pool exists.
+
+    Sign-in uses the pool accounts; sign-up creates tagged throwaway accounts that
+    `python fixtures.py sweep` removes.
+    """
+
+    abstract = not (AUTH_SCENARIO and pool_ready())
+    # --host (the app's URL in CI) overrides this, hence the absolute URLs below
+    host = SUPABASE_URL
+    wait_time = between(0.5, 1.5)
+
+    def _headers(self):
+        return {"apikey": SUPABASE_ANON_KEY, "Authorization": f"Bearer {SUPABASE_ANON_KEY}"}
+
+    @task(4)
+    def sign_in(self):
+        accounts = token_pool().accounts
+        if not accounts:
+            return
+        email = random.choice(accounts)["email"]
+        self.client.post(
+            f"{SUPABASE_URL}/auth/v1/token",
+            params={"grant_type": "password"},
+            json={"email": email, "password": POOL_PASSWORD},
+            headers=self._headers(),
+            name="auth.signIn",
+        )
+
+    @task(1)
+    def sign_up(self):
+        email = tagged_email(f"signup{random.randint(0, 999)}", POOL_EMAIL_DOMAIN)
+        self.client.post(
+            f"{SUPABASE_URL}/auth/v1/signup",
+            json={"email": email, "password": POOL_PASSWORD, "data": {"full_name": "Load Test"}},
+            headers=self._headers(),
+            name="auth.signUp",
+        )
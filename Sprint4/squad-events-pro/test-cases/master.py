@@ -1,6 +1,25 @@
+import argparse
+import json
+import os
 import subprocess
 import sys
-import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from backend_replay import BackendReplay
+from capacity import LaunchGate, auto_workers, script_memory_mb
+from fixtures import Fixtures
+from flakes import FlakeStats
+from preview_server import PreviewServer
+from reports import write_junit
+from scheduling import TimingCache, UnitResult, WorkUnit, plan
+import warmup
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HARNESS_DIR = os.getenv("HARNESS_DIR", os.path.join(HERE, ".harness"))
 
 scripts = [
     "student-sign-up.py",
@@ -10,19 +29,190 @@ scripts = [
     "database-operations.py",
 ]
 
-results = []
+_print_lock = threading.Lock()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the E2E scripts and report per-case results")
+    parser.add_argument("--workers", default=os.getenv("WORKERS", "auto"),
+                        help="parallel script processes, or 'auto' to size from cores and memory; "
+                             "long scripts are split into case shards")
+    parser.add_argument("--junit", default=os.path.join(HARNESS_DIR, "junit.xml"))
+    parser.add_argument("--timings", default=os.path.join(HARNESS_DIR, "timings.json"))
+    parser.add_argument("--flakes", default=os.path.join(HARNESS_DIR, "flakes.json"))
+    parser.add_argument("--retries", type=int, default=int(os.getenv("HARNESS_RETRIES", "1")),
+                        help="extra attempts for a failing case")
+    parser.add_argument("--retry-budget", type=int, default=int(os.getenv("HARNESS_RETRY_BUDGET", "3")),
+                        help="extra attempts per script run, across all its cases")
+    parser.add_argument("--no-quarantine", action="store_true",
+                        help="run known-flaky cases in the blocking lane too")
+    parser.add_argument("--sweep-hours", type=float, default=float(os.getenv("SWEEP_HOURS", "0")),
+                        help="after the run, delete test-created rows older than this many hours "
+                             "(off by default; the sweep is destructive, enable it where wanted)")
+    parser.add_argument("--preview", action="store_true", default=os.getenv("PREVIEW_BUILD") == "1",
+                        help="build the app once (cached by source hash) and test the production bundle "
+                             "instead of the Vite dev server")
+    parser.add_argument("--backend", choices=["record", "replay"], default=os.getenv("BACKEND_MODE") or None,
+                        help="point the app at a local Supabase stand-in that records exchanges into "
+                             ".harness/har (kept for scripts that pass) or replays them; implies --preview")
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false", default=os.getenv("WARMUP", "1") == "1",
+                        help="skip crawling the app once and building the warm Chrome profile the scripts start from")
+    return parser.parse_args()
+
+
+def read_cases(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def run_unit(unit: WorkUnit, capture: bool, args, gate: LaunchGate, cache: TimingCache) -> UnitResult:
+    waited = gate.acquire(script_memory_mb(cache, unit.script))
+    try:
+        return _run_unit(unit, capture, args, waited)
+    finally:
+        gate.release()
+
+
+def _run_unit(unit: WorkUnit, capture: bool, args, waited: float) -> UnitResult:
+    fd, results_path = tempfile.mkstemp(prefix="cases-", suffix=".jsonl", dir=HARNESS_DIR)
+    os.close(fd)
+    env = dict(
+        os.environ,
+        HARNESS_RESULTS=results_path,
+        HARNESS_TIMINGS=args.timings,
+        HARNESS_RETRIES=str(args.retries),
+        HARNESS_RETRY_BUDGET=str(args.retry_budget),
+    )
+    if unit.cases is not None:
+        env["HARNESS_CASES"] = json.dumps(unit.cases)
+    if unit.skip_cases:
+        env["HARNESS_SKIP_CASES"] = json.dumps(unit.skip_cases)
+
+    with _print_lock:
+        held = f", held {waited:.0f}s for memory" if waited >= 1 else ""
+        print(f"[RUN] {unit.label} (expected {unit.expected:.0f}s{held})")
+    start = time.time()
+    proc = subprocess.run(
+        [sys.executable, unit.script],
+        cwd=HERE,
+        env=env,
+        stdout=subprocess.PIPE if capture else None,
+        stderr=subprocess.STDOUT if capture else None,
+        text=True,
+    )
+    duration = time.time() - start
+    cases = read_cases(results_path)
+    os.remove(results_path)
+
+    output = proc.stdout or ""
+    if capture:
+        # Print each unit's output as one block so parallel runs stay readable
+        with _print_lock:
+            print(f"----- {unit.label} ({duration:.1f}s, exit {proc.returncode}) -----")
+            print(output, end="" if output.endswith("\n") else "\n")
+    return UnitResult(unit, proc.returncode, duration, cases, output)
+
+
+def sweep(hours):
+    fx = Fixtures()
+    if hours <= 0 or not fx.enabled:
+        return
+    try:
+        counts = fx.sweep(hours)
+    except Exception as e:
+        print(f"[SWEEP] failed: {e}")
+        return
+    if any(counts.values()):
+        print("[SWEEP] deleted " + ", ".join(f"{n} {kind}" for kind, n in counts.items()))
+
+
+def main():
+    args = parse_args()
+    os.makedirs(HARNESS_DIR, exist_ok=True)
+    with ExitStack() as stack:
+        backend = None
+        if args.backend:
+            # The stand-in's URL is baked into the build, so it always runs against a preview
+            backend = stack.enter_context(BackendReplay(args.backend))
+            os.environ["VITE_SUPABASE_URL"] = backend.url
+            os.environ["BACKEND_MODE"] = args.backend
+            args.preview = True
+        if args.preview:
+            server = stack.enter_context(PreviewServer.from_cache())
+            os.environ["APP_BASE_URL"] = server.url
+        if args.warmup:
+            try:
+                warmup.run()
+                os.environ["WARM_PROFILE"] = "1"
+            except Exception as e:
+                # Without it the scripts start cold, which is slower but not wrong
+                print(f"[WARMUP] skipped: {e}")
+        return run_all(args, backend)
+
+
+def run_all(args, backend=None):
+    cache = TimingCache(args.timings)
+    flakes = FlakeStats(args.flakes)
+    quarantine = {} if args.no_quarantine else flakes.quarantined()
+    if args.workers == "auto":
+        workers, reason = auto_workers(cache, scripts)
+        print(f"[WORKERS] {workers} ({reason})")
+    else:
+        workers = max(1, int(args.workers))
+    units = plan(scripts, cache, workers, quarantine)
+    gate = LaunchGate()
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda unit: run_unit(unit, workers > 1, args, gate, cache), units))
+    wall = time.time() - start
+
+    for result in results:
+        cache.update(result)
+    cache.save()
+    flakes.update(results)
+    flakes.save()
+    write_junit(args.junit, results)
+    sweep(args.sweep_hours)
+
+    print("\n[SUMMARY]")
+    failed = False
+    green = []
+    for script in scripts:
+        runs = [r for r in results if r.unit.script == script and r.unit.lane == "main"]
+        codes = [r.returncode for r in runs if r.returncode != 0]
+        cases = [c for r in runs for c in r.cases]
+        bad = sum(1 for c in cases if not c["ok"])
+        status = "PASS" if not codes else f"FAIL (exit {codes[0]})"
+        detail = f"{len(cases) - bad}/{len(cases)} cases, " if cases else ""
+        flaky = sum(1 for c in cases if c.get("flaky"))
+        if flaky:
+            detail += f"{flaky} flaky, "
+        peaks = [c for c in cases if "rss_peak_mb" in c]
+        if peaks:
+            hog = max(peaks, key=lambda c: c["rss_peak_mb"])
+            detail += f"peak {hog['rss_peak_mb']:.0f} MB in '{hog['case']}', "
+        traces = sum(1 for c in cases if c.get("trace"))
+        if traces:
+            detail += f"{traces} trace(s), "
+        print(f" - {script}: {status} [{detail}{sum(r.duration for r in runs):.1f}s]")
+        failed = failed or bool(codes)
+        if not codes:
+            green.append(script)
+
+    held = [c for r in results if r.unit.lane == "quarantine" for c in r.cases]
+    if held:
+        print("\n[QUARANTINE] (non-blocking)")
+        for c in held:
+            print(f" - {c['script']} :: {c['case']}: {'PASS' if c['ok'] else 'FAIL'}")
+    print(f" wall {wall:.1f}s with {workers} worker(s); JUnit: {args.junit}")
+    if backend is not None:
+        backend.finish(green)
 
-for script in scripts:
-    print(f"[RUN] {script}")
-    proc = subprocess.run([sys.executable, script], cwd=os.path.dirname(__file__))
-    results.append((script, proc.returncode))
+    return 1 if failed else 0
 
-print("\n[SUMMARY]")
-for script, code in results:
-    status = "PASS" if code == 0 else f"FAIL (exit {code})"
-    print(f" - {script}: {status}")
 
-if any(code != 0 for _, code in results):
-    sys.exit(1)
-else:
-    sys.exit(0)
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+Throughput test for the payment RPCs of db/create_payments_and_rpc.sql
+
+What it does
+- Installs db/create_payments_and_rpc.sql into the bench schema (table, its three indexes,
+  mock_process_payment, get_latest_payment) and seeds events and tickets (pg_bench.py)
+- Grows payments through BENCH_PAYMENT_SIZES rows and, at each size, runs BENCH_WORKERS
+  connections for BENCH_DURATION_SEC doing what a paid RSVP does: mock_process_payment
+  for a ticket holder (which also marks their ticket/registration paid) mixed with
+  get_latest_payment lookups, PAYMENT_SHARE of calls being payments
+- A few ticket holders on a few events take most of the traffic (HOT_SHARE), like a
+  popular paid event going on sale, so row locks on tickets actually contend
+- Reports throughput, p50/p95/p99 per RPC, lock waits (workers seen waiting on a Lock
+  in pg_stat_activity, sampled every LOCK_SAMPLE_SEC) and deadlocks
+- EXPLAINs the lookup and ticket-update statements inside both RPCs at every size and
+  flags any that stop using an index
+
+Output: a table on stdout and .harness\\bench\\payments.json.
+
+Environment options (PowerShell)
+- $env:BENCH_PAYMENT_SIZES = "100000,1000000,3000000"
+- $env:BENCH_WORKERS = "16"
+- $env:BENCH_DURATION_SEC = "30"
+- $env:PAYMENT_SHARE = "0.3"
+- see pg_bench.py for DATABASE_URL / BENCH_SCHEMA
+"""
+
+import argparse
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+import pg_bench
+
+
+APP_ROOT = os.path.dirname(pg_bench.HERE)
+PAYMENTS_SQL = os.path.join(APP_ROOT, "db", "create_payments_and_rpc.sql")
+
+BENCH_PAYMENT_SIZES = os.getenv("BENCH_PAYMENT_SIZES", "100000,1000000,3000000")
+BENCH_WORKERS = int(os.getenv("BENCH_WORKERS", "16"))
+BENCH_DURATION_SEC = float(os.getenv("BENCH_DURATION_SEC", "30"))
+PAYMENT_SHARE = float(os.getenv("PAYMENT_SHARE", "0.3"))
+BENCH_EVENTS = 20000
+BENCH_TICKETS = 200000
+PAYER_POOL = 5000
+HOT_SHARE = 0.2
+HOT_PAYERS = 20
+LOCK_SAMPLE_SEC = 0.2
+APPLICATION_NAME = "payments_bench"
+
+LATEST_SQL = (
+	"select payment_id, amount, status, message, created_at from payments "
+	"where event_id = %(event_id)s and user_id = %(user_id)s order by created_at desc limit 1"
+)
+TICKET_UPDATE_SQL = "update tickets set is_paid = true where event_id = %(event_id)s and user_id = %(user_id)s"
+
+
+def install(conn: Any) -> None:
+	pg_bench.ensure_schema(conn)
+	with open(PAYMENTS_SQL, encoding="utf-8") as fh:
+		sql = fh.read()
+	conn.execute(sql.replace("public.", f"{pg_bench.BENCH_SCHEMA}."))
+
+
+def grow_payments(conn: Any, total: int) -> int:
+	"""Top up payments to `total`: one in ten for a ticket holder, the rest for strangers."""
+	missing = total - pg_bench.row_count(conn, "payments")
+	if missing <= 0:
+		return 0
+	conn.execute(
+		"""
+		with e as (select array_agg(event_id) ids from events),
+			t as (select array_agg(event_id) ev, array_agg(user_id) us
+				from (select event_id, user_id from tickets limit %(pairs)s) x)
+		insert into payments (event_id, user_id, amount, status, message, created_at)
+		select case when g %% 10 = 0 then t.ev[1 + g %% array_length(t.ev, 1)]
+				else e.ids[1 + (g * 13) %% array_length(e.ids, 1)] end,
+			case when g %% 10 = 0 then t.us[1 + g %% array_length(t.us, 1)] else gen_random_uuid() end,
+			10 + g %% 90, case when g %% 5 = 0 then 'failure' else 'success' end, 'seeded',
+			now() - (g %% 525600) * interval '1 minute'
+		from generate_series(1, %(n)s) g, e, t
+		""",
+		{"pairs": PAYER_POOL * 4, "n": missing},
+	)
+	conn.execute("analyze payments")
+	return missing
+
+
+def payer_pool(conn: Any) -> List[Tuple[Any, Any]]:
+	return conn.execute(
+		"select event_id, user_id from tickets order by random() limit %s", (PAYER_POOL,)
+	).fetchall()
+
+
+class Load:
+	def __init__(self, payers: List[Tuple[Any, Any]], workers: int, duration: float) -> None:
+		self.payers = payers
+		self.hot = payers[:HOT_PAYERS]
+		self.workers = workers
+		self.duration = duration
+		self.samples: Dict[str, List[float]] = defaultdict(list)
+		self.errors: Dict[str, int] = defaultdict(int)
+		self.lock_waits: List[int] = []
+		self._lock = threading.Lock()
+		self._stop = threading.Event()
+
+	def _pick(self, rng: random.Random) -> Tuple[Any, Any]:
+		return rng.choice(self.hot if rng.random() < HOT_SHARE else self.payers)
+
+	def _worker(self, seed: int) -> None:
+		rng = random.Random(seed)
+		local: Dict[str, List[float]] = defaultdict(list)
+		with pg_bench.connect() as conn:
+			conn.execute(f"set application_name to {APPLICATION_NAME}")
+			while not self._stop.is_set():
+				event_id, user_id = self._pick(rng)
+				if rng.random() < PAYMENT_SHARE:
+					name, sql = "mock_process_payment", "select * from mock_process_payment(%(event_id)s, %(amount)s, %(user_id)s)"
+				else:
+					name, sql = "get_latest_payment", "select * from get_latest_payment(%(event_id)s, %(user_id)s)"
+				start = time.perf_counter()
+				try:
+					conn.execute(sql, {"event_id": event_id, "user_id": user_id, "amount": 25}).fetchall()
+				except Exception as e:
+					with self._lock:
+						self.errors[f"{name}: {type(e).__name__}"] += 1
+					continue
+				local[name].append((time.perf_counter() - start) * 1000)
+		with self._lock:
+			for name, values in local.items():
+				self.samples[name].extend(values)
+
+	def _monitor(self) -> None:
+		with pg_bench.connect() as conn:
+			while not self._stop.is_set():
+				waiting = conn.execute(
+					"select count(*) from pg_stat_activity where application_name = %s and wait_event_type = 'Lock'",
+					(APPLICATION_NAME,),
+				).fetchone()[0]
+				self.lock_waits.append(waiting)
+				time.sleep(LOCK_SAMPLE_SEC)
+
+	def run(self) -> float:
+		threads = [threading.Thread(target=self._worker, args=(i,), daemon=True) for i in range(self.workers)]
+		threads.append(threading.Thread(target=self._monitor, daemon=True))
+		start = time.perf_counter()
+		for t in threads:
+			t.start()
+		time.sleep(self.duration)
+		self._stop.set()
+		for t in threads:
+			t.join()
+		return time.perf_counter() - start
+
+
+def deadlocks(conn: Any) -> int:
+	return conn.execute("select deadlocks from pg_stat_database where datname = current_database()").fetchone()[0]
+
+
+def check_plans(conn: Any, payer: Tuple[Any, Any]) -> Dict[str, Any]:
+	params = {"event_id": payer[0], "user_id": payer[1]}
+	plans = {"get_latest_payment": pg_bench.plan_summary(pg_bench.explain(conn, LATEST_SQL, params))}
+	# EXPLAIN ANALYZE executes the update; keep the ticket untouched
+	with conn.transaction(force_rollback=True):
+		plans["ticket_update"] = pg_bench.plan_summary(pg_bench.explain(conn, TICKET_UPDATE_SQL, params))
+	return {
+		name: {k: p[k] for k in ("indexes", "seq_scans", "rows_scanned", "rows_returned", "exec_ms")}
+		for name, p in plans.items()
+	}
+
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description="Load-test mock_process_payment / get_latest_payment")
+	parser.add_argument("--sizes", default=BENCH_PAYMENT_SIZES, help="comma-separated payments row counts")
+	parser.add_argument("--workers", type=int, default=BENCH_WORKERS)
+	parser.add_argument("--duration", type=float, default=BENCH_DURATION_SEC)
+	args = parser.parse_args()
+	sizes = sorted(int(s) for s in args.sizes.split(","))
+
+	points: List[Dict[str, Any]] = []
+	with pg_bench.connect() as conn:
+		if pg_bench.BENCH_SCHEMA == "public":
+			sizes = [pg_bench.row_count(conn, "payments")]
+		else:
+			install(conn)
+			pg_bench.seed_events(conn, BENCH_EVENTS)
+			pg_bench.seed_tickets(conn, BENCH_TICKETS)
+		payers = payer_pool(conn)
+		if not payers:
+			raise SystemExit("[BENCH] no tickets to pay for")
+		for size in sizes:
+			if pg_bench.BENCH_SCHEMA != "public":
+				current = pg_bench.row_count(conn, "payments")
+				if current > size:
+					print(f"[BENCH] skipping {size}: payments already has {current} rows")
+					continue
+				grow_payments(conn, size)
+			plans = check_plans(conn, payers[0])
+			before = deadlocks(conn)
+			load = Load(payers, args.workers, args.duration)
+			elapsed = load.run()
+			point: Dict[str, Any] = {
+				"payments": size,
+				"workers": args.workers,
+				"throughput_rps": round(sum(len(v) for v in load.samples.values()) / elapsed, 1),
+				"lock_waits_max": max(load.lock_waits, default=0),
+				"lock_waits_mean": round(sum(load.lock_waits) / max(1, len(load.lock_waits)), 2),
+				"deadlocks": deadlocks(conn) - before,
+				"errors": dict(load.errors),
+				"plans": plans,
+			}
+			for name, samples in load.samples.items():
+				point[name] = {"calls": len(samples), **pg_bench.latency_summary(samples)}
+			points.append(point)
+			print(f"[BENCH] {size} payments: {point['throughput_rps']} calls/s")
+
+	rows = []
+	unindexed = []
+	for p in points:
+		for name, plan in p["plans"].items():
+			if plan["seq_scans"]:
+				unindexed.append(f"{name} at {p['payments']} payments")
+		rows.append({
+			"payments": p["payments"],
+			"rps": p["throughput_rps"],
+			"pay_p99_ms": p.get("mock_process_payment", {}).get("p99_ms", "-"),
+			"latest_p99_ms": p.get("get_latest_payment", {}).get("p99_ms", "-"),
+			"lock_waits_max": p["lock_waits_max"],
+			"deadlocks": p["deadlocks"],
+			"latest_index": ",".join(p["plans"]["get_latest_payment"]["indexes"]) or "SEQ SCAN",
+			"latest_rows_scanned": p["plans"]["get_latest_payment"]["rows_scanned"],
+		})
+	pg_bench.print_table(rows, list(rows[0]) if rows else ["payments"])
+	path = pg_bench.write_report("payments", points)
+	for where in unindexed:
+		print(f"[SUMMARY] seq scan: {where}")
+	print(f"[SUMMARY] {len(points)} sizes, {len(unindexed)} unindexed plan(s); details in {path}")
+	return 1 if unindexed else 0
+
+
+if __name__ == "__main__":
+	raise SystemExit(main())
@@ -0,0 +1,170 @@
+"""
+Production-build preview server for the E2E suites
+
+What it does
+- Builds the app once with `vite build` into .harness/builds/<source hash>/, where the hash
+  covers src/, public/, index.html, the build configs, the lockfile, .env files and VITE_*
+  variables; an unchanged tree reuses the cached build without running node at all
+- Serves that build from a local static server with the SPA fallback `vite preview` has
+  (unknown extension-less routes get index.html, missing files and /assets/ paths a 404,
+  hashed assets are cacheable), so every drv.get measures what users get instead of the
+  dev server's on-demand ESM transforms
+- Used by master.py --preview, which points APP_BASE_URL at the server for every script
+
+Environment options (PowerShell)
+- $env:PREVIEW_BUILD = "1"         # same as master.py --preview
+- $env:PREVIEW_PORT = "4173"       # default: any free port
+- $env:BUILD_CACHE_KEEP = "3"      # builds kept in .harness\\builds
+
+Usage
+	with PreviewServer.from_cache() as server:
+		os.environ["APP_BASE_URL"] = server.url
+"""
+
+import hashlib
+import http.server
+import os
+import shutil
+import subprocess
+import threading
+from typing import Iterator, List, Optional
+from urllib.parse import urlsplit
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP_ROOT = os.path.dirname(HERE)
+BUILD_DIR = os.path.join(HERE, ".harness", "builds")
+
+PREVIEW_PORT = int(os.getenv("PREVIEW_PORT", "0"))
+BUILD_CACHE_KEEP = int(os.getenv("BUILD_CACHE_KEEP", "3"))
+
+# Everything vite build reads besides node_modules
+SOURCE_DIRS = ["src", "public"]
+SOURCE_FILES = [
+	"index.html",
+	"vite.config.ts",
+	"tailwind.config.ts",
+	"postcss.config.js",
+	"tsconfig.json",
+	"tsconfig.app.json",
+	"package.json",
+	"package-lock.json",
+	".env",
+	".env.local",
+	".env.production",
+	".env.production.local",
+]
+COMPLETE_MARKER = ".build-complete"
+
+
+def _source_files(root: str) -> Iterator[str]:
+	for name in SOURCE_FILES:
+		path = os.path.join(root, name)
+		if os.path.isfile(path):
+			yield path
+	for directory in SOURCE_DIRS:
+		for base, dirs, files in os.walk(os.path.join(root, directory)):
+			dirs.sort()
+			for name in sorted(files):
+				yield os.path.join(base, name)
+
+
+def source_hash(root: str = APP_ROOT) -> str:
+	digest = hashlib.sha256()
+	for path in _source_files(root):
+		digest.update(os.path.relpath(path, root).replace(os.sep, "/").encode("utf-8") + b"\0")
+		with open(path, "rb") as fh:
+			for block in iter(lambda: fh.read(1 << 16), b""):
+				digest.update(block)
+	for key in sorted(k for k in os.environ if k.startswith("VITE_")):
+		digest.update(f"{key}={os.environ[key]}\0".encode("utf-8"))
+	return digest.hexdigest()[:16]
+
+
+def build(root: str = APP_ROOT, cache_dir: str = BUILD_DIR) -> str:
+	"""Return the directory of a production build of the current sources, building if needed."""
+	out_dir = os.path.join(cache_dir, source_hash(root))
+	if os.path.exists(os.path.join(out_dir, COMPLETE_MARKER)):
+		print(f"[PREVIEW] reusing build {os.path.basename(out_dir)}")
+		return out_dir
+	print(f"[PREVIEW] building {os.path.basename(out_dir)}")
+	shutil.rmtree(out_dir, ignore_errors=True)
+	npx = shutil.which("npx") or shutil.which("npx.cmd") or "npx"
+	subprocess.run([npx, "vite", "build", "--outDir", out_dir, "--emptyOutDir"], cwd=root, check=True)
+	open(os.path.join(out_dir, COMPLETE_MARKER), "w").close()
+	_prune(cache_dir, keep=out_dir)
+	return out_dir
+
+
+def _prune(cache_dir: str, keep: str) -> None:
+	builds: List[str] = [
+		os.path.join(cache_dir, name) for name in os.listdir(cache_dir)
+		if os.path.join(cache_dir, name) != keep
+	]
+	builds.sort(key=os.path.getmtime, reverse=True)
+	for old in builds[max(0, BUILD_CACHE_KEEP - 1):]:
+		shutil.rmtree(old, ignore_errors=True)
+
+
+class _SpaHandler(http.server.SimpleHTTPRequestHandler):
+	# Only set by send_head; error replies sent before it (unsupported methods, bad request
+	# lines) must still get through end_headers
+	path = ""
+	_immutable = False
+
+	def send_head(self):  # type: ignore[override]
+		self._immutable = False
+		path = self.translate_path(self.path)
+		route = urlsplit(self.path).path
+		if not os.path.exists(path):
+			if route.startswith("/assets/") or os.path.splitext(route)[1]:
+				# A missing file, not a route: index.html would only break the script or style
+				self.send_error(404)
+				return None
+			# Client-side routes (/SignUp, /admin/...) all boot from index.html
+			self.path = "/index.html"
+		else:
+			self._immutable = route.startswith("/assets/")
+		return super().send_head()
+
+	def end_headers(self) -> None:
+		if self._immutable:
+			self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+		else:
+			self.send_header("Cache-Control", "no-cache")
+		super().end_headers()
+
+	def log_message(self, format: str, *args) -> None:
+		pass
+
+
+class PreviewServer:
+	def __init__(self, build_dir: str, port: int = PREVIEW_PORT) -> None:
+		self.build_dir = build_dir
+		handler = lambda *a, **kw: _SpaHandler(*a, directory=build_dir, **kw)
+		self._httpd = http.server.ThreadingHTTPServer(("127.0.0.1", port), handler)
+		self._thread: Optional[threading.Thread] = None
+
+	@classmethod
+	def from_cache(cls) -> "PreviewServer":
+		return cls(build())
+
+	@property
+	def url(self) -> str:
+		return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+	def start(self) -> "PreviewServer":
+		self._thread = threading.Thread(target=self._httpd.serve_forever, name="preview-server", daemon=True)
+		self._thread.start()
+		print(f"[PREVIEW] serving {self.build_dir} at {self.url}")
+		return self
+
+	def stop(self) -> None:
+		self._httpd.shutdown()
+		self._httpd.server_close()
+
+	def __enter__(self) -> "PreviewServer":
+		return self.start()
+
+	def __exit__(self, *_exc) -> None:
+		self.stop()
@@ -0,0 +1,188 @@
+"""
+Query-shape benchmark for listEvents() and db.getEvents() (src/services/database.ts)
+
+What it does
+- Seeds the bench schema with BENCH_EVENTS events (see pg_bench.py)
+- Rebuilds, as SQL, the query PostgREST runs for every filter combination:
+	listEvents: categories x orgIds x dateFrom x dateTo x q, each with sort soonest/newest
+	getEvents:  organizerId x approved (unset/true/false) x search x category, page 1 of 20,
+	            plus the count=exact query supabase-js sends alongside it
+- Times each shape BENCH_RUNS times (p50/p95/p99) and captures one
+  EXPLAIN (ANALYZE, BUFFERS) plan, reporting rows scanned against rows returned
+- Flags every shape whose plan sequentially scans events; exit code 1 when any does,
+  so the report can gate a migration that adds indexes. Unfiltered shapes that read the
+  whole table (listEvents without filters, the unfiltered getEvents count) are expected
+  to seq scan and are only noted, never fail the run
+
+Filter values are picked from the seeded data (a real category, an organization with
+events, a 30-day window) so each shape selects a realistic slice.
+
+Output: a table on stdout and .harness\\bench\\query_shapes.json with the full plans.
+
+Environment options (PowerShell)
+- $env:BENCH_EVENTS = "200000"
+- $env:BENCH_RUNS = "30"
+- see pg_bench.py for DATABASE_URL / BENCH_SCHEMA
+
+Usage
+	python query_bench.py
+	python query_bench.py --only listEvents --runs 100
+"""
+
+import argparse
+import itertools
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+import pg_bench
+
+
+BENCH_EVENTS = int(os.getenv("BENCH_EVENTS", "200000"))
+BENCH_RUNS = int(os.getenv("BENCH_RUNS", "30"))
+PAGE_SIZE = 20
+
+
+@dataclass
+class Shape:
+	source: str
+	label: str
+	sql: str
+	params: Dict[str, Any] = field(default_factory=dict)
+	seq_scan_ok: bool = False  # reads every row anyway, so no index can help
+
+
+def filter_values(conn: Any) -> Dict[str, Any]:
+	category = conn.execute(
+		"select category from events group by category order by count(*) desc limit 1"
+	).fetchone()[0]
+	org_id, created_by = conn.execute(
+		"select org_id, created_by from events group by org_id, created_by order by count(*) desc limit 1"
+	).fetchone()
+	return {
+		"categories": [category],
+		"category": category,
+		"org_ids": [org_id],
+		"organizer": created_by,
+		"date_from": conn.execute("select now()").fetchone()[0],
+		"date_to": conn.execute("select now() + interval '30 days'").fetchone()[0],
+		# listEvents trims and wraps q in %...%; a title fragment of one seeded event
+		"like": "%" + conn.execute("select substr(md5('42'), 1, 8)").fetchone()[0] + "%",
+	}
+
+
+def list_events_shapes(values: Dict[str, Any]) -> List[Shape]:
+	clauses: List[Tuple[str, str]] = [
+		("categories", "category = any(%(categories)s)"),
+		("orgIds", "org_id = any(%(org_ids)s)"),
+		("dateFrom", "starts_at >= %(date_from)s"),
+		("dateTo", "starts_at <= %(date_to)s"),
+		("q", "(title ilike %(like)s or description ilike %(like)s)"),
+	]
+	orders = {"soonest": "starts_at asc", "newest": "created_at desc"}
+	shapes = []
+	for mask in itertools.product([False, True], repeat=len(clauses)):
+		used = [c for c, on in zip(clauses, mask) if on]
+		where = " and ".join(sql for _, sql in used) or "true"
+		for sort, order in orders.items():
+			label = "+".join(name for name, _ in used) or "(none)"
+			shapes.append(Shape(
+				"listEvents",
+				f"{label} sort={sort}",
+				f"select * from events where {where} order by {order}",
+				values,
+				seq_scan_ok=not used,
+			))
+	return shapes
+
+
+def get_events_shapes(values: Dict[str, Any]) -> List[Shape]:
+	approved = {
+		None: None,
+		True: "status = 'published'",
+		False: "status <> 'published'",
+	}
+	shapes = []
+	for organizer, appr, search, category in itertools.product([False, True], approved, [False, True], [False, True]):
+		used: List[Tuple[str, str]] = []
+		if organizer:
+			used.append(("organizerId", "created_by = %(organizer)s"))
+		if appr is not None:
+			used.append((f"approved={str(appr).lower()}", approved[appr]))
+		if search:
+			used.append(("search", "title ilike %(like)s"))
+		if category:
+			used.append(("category", "category = %(category)s"))
+		where = " and ".join(sql for _, sql in used) or "true"
+		label = "+".join(name for name, _ in used) or "(none)"
+		shapes.append(Shape(
+			"getEvents",
+			label,
+			f"select * from events where {where} order by starts_at desc limit {PAGE_SIZE} offset 0",
+			values,
+		))
+		shapes.append(Shape(
+			"getEvents", f"{label} count", f"select count(*) from events where {where}", values, seq_scan_ok=not used,
+		))
+	return shapes
+
+
+def measure(conn: Any, shape: Shape, runs: int) -> Dict[str, Any]:
+	samples = pg_bench.time_calls(lambda: conn.execute(shape.sql, shape.params).fetchall(), runs)
+	explained = pg_bench.explain(conn, shape.sql, shape.params)
+	summary = pg_bench.plan_summary(explained)
+	return {
+		"source": shape.source,
+		"shape": shape.label,
+		**pg_bench.latency_summary(samples),
+		**summary,
+		"seq_scan": "events" in summary["seq_scans"],
+		"seq_scan_ok": shape.seq_scan_ok,
+		"sql": shape.sql,
+		"plan": explained["Plan"],
+	}
+
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description="Benchmark every listEvents/getEvents filter combination")
+	parser.add_argument("--events", type=int, default=BENCH_EVENTS)
+	parser.add_argument("--runs", type=int, default=BENCH_RUNS)
+	parser.add_argument("--only", choices=["listEvents", "getEvents"])
+	args = parser.parse_args()
+
+	with pg_bench.connect() as conn:
+		if pg_bench.BENCH_SCHEMA != "public":
+			added = pg_bench.seed_events(conn, args.events)
+			if added:
+				print(f"[BENCH] seeded {added} events")
+		print(f"[BENCH] events: {pg_bench.row_count(conn, 'events')} rows in schema {pg_bench.BENCH_SCHEMA}")
+
+		values = filter_values(conn)
+		shapes = list_events_shapes(values) + get_events_shapes(values)
+		if args.only:
+			shapes = [s for s in shapes if s.source == args.only]
+
+		results = []
+		for i, shape in enumerate(shapes, 1):
+			results.append(measure(conn, shape, args.runs))
+			if i % 10 == 0:
+				print(f"[BENCH] {i}/{len(shapes)} shapes")
+
+	results.sort(key=lambda r: r["p95_ms"], reverse=True)
+	for r in results:
+		r["flag"] = "" if not r["seq_scan"] else "seq scan (expected)" if r["seq_scan_ok"] else "SEQ SCAN"
+	pg_bench.print_table(
+		results,
+		["source", "shape", "p50_ms", "p95_ms", "p99_ms", "rows_scanned", "rows_returned", "shared_read", "flag"],
+	)
+	path = pg_bench.write_report("query_shapes", results)
+
+	flagged = [r for r in results if r["seq_scan"] and not r["seq_scan_ok"]]
+	expected = sum(1 for r in results if r["seq_scan"] and r["seq_scan_ok"])
+	print(f"[SUMMARY] {len(results)} shapes, {len(flagged)} with an unexpected seq scan on events "
+		f"({expected} unfiltered ones expected); plans in {path}")
+	return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+	raise SystemExit(main())
@@ -0,0 +1,476 @@
+"""
+Realtime fan-out load generator for the app's Supabase channels
+
+What it does
+- Opens VIEWERS websockets from one asyncio loop, each one a browser tab speaking the
+  Phoenix protocol supabase-js uses, with the channels the app joins:
+	card    EventCard / EventDetails: reg_count_<id>, UPDATE on event_counters filtered
+	        to one event (CARDS_PER_VIEWER cards per tab)
+	admin   ApproveEvents: pending-events-live, UPDATE and DELETE on events
+	friends Friends: friends-events-regs/-legacy, * on event_registrations and registrations
+  in the proportions of VIEWER_MIX, ramping up at CONNECT_RATE sockets per second
+- Mutates rows at MUTATION_RATE per second for DURATION_SEC. Against a real database the
+  mutations are identity updates (set x = x), so they produce change events without
+  changing data: event_counters of TARGET_EVENTS events, events, and registrations
+- Measures, per delivered change, commit_timestamp -> receive latency; the fan-out
+  throughput (deliveries per second); the delivery ratio against the deliveries the
+  subscriptions should have produced; join failures and dropped sockets
+- Measures server RSS per connection (psutil) for the stand-in, or for REALTIME_PID /
+  the first beam.smp process, plus the generator's own RSS per connection
+
+Targets
+- default: the local Supabase realtime server (REALTIME_URL, derived from SUPABASE_URL)
+  with mutations through DATABASE_URL; the tables must be in the supabase_realtime
+  publication
+- --stand-in: a minimal realtime server (`python realtime_bench.py serve`) started as a
+  subprocess, broadcasting the generator's own mutations; no Supabase needed. It measures
+  the generator and a single-process fan-out baseline, not the Elixir server
+
+Output: a table on stdout and .harness\\bench\\realtime.json.
+
+Environment options (PowerShell)
+- $env:REALTIME_URL = "ws://127.0.0.1:54321/realtime/v1/websocket"
+- $env:REALTIME_PID = "12345"        # server process for memory figures
+- $env:VIEWERS = "2000"
+- $env:VIEWER_MIX = "card=0.8,admin=0.05,friends=0.15"
+- $env:MUTATION_RATE = "20"
+- $env:DURATION_SEC = "60"
+- see supabase_rest.py for SUPABASE_URL / keys and pg_bench.py for DATABASE_URL
+
+Requires: pip install websockets psycopg[binary] psutil (psycopg only without --stand-in;
+psutil only for memory figures). Raise the open-file limit for thousands of sockets.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+	import websockets
+except ImportError:  # optional: only the async suites and this generator need it
+	websockets = None
+
+try:
+	import psutil
+except ImportError:  # optional: memory figures are skipped without it
+	psutil = None
+
+import pg_bench
+from supabase_rest import SUPABASE_KEY, SUPABASE_URL
+
+
+def _default_realtime_url() -> str:
+	base = SUPABASE_URL or "http://127.0.0.1:54321"
+	return base.replace("https://", "wss://").replace("http://", "ws://") + "/realtime/v1/websocket"
+
+
+REALTIME_URL = os.getenv("REALTIME_URL") or _default_realtime_url()
+REALTIME_PID = int(os.getenv("REALTIME_PID", "0"))
+VIEWERS = int(os.getenv("VIEWERS", "2000"))
+VIEWER_MIX = os.getenv("VIEWER_MIX", "card=0.8,admin=0.05,friends=0.15")
+MUTATION_RATE = float(os.getenv("MUTATION_RATE", "20"))
+DURATION_SEC = float(os.getenv("DURATION_SEC", "60"))
+CONNECT_RATE = 200
+CARDS_PER_VIEWER = 6
+TARGET_EVENTS = 50
+HEARTBEAT_SEC = 25
+JOIN_TIMEOUT_SEC = 10
+DRAIN_SEC = 3
+STAND_IN_PORT = 4010
+
+# Which mutation kinds are drawn, and how often
+MUTATION_WEIGHTS = {"event_counters": 0.8, "events": 0.1, "registrations": 0.1}
+
+MB = 1024 * 1024
+
+
+def warn(msg: str) -> None:
+	print(f"[REALTIME] {msg}")
+
+
+# ───────────── Subscriptions (what the app joins) ─────────────
+
+def channels_for(kind: str, viewer: int, events: List[str], rng: random.Random) -> List[Tuple[str, List[dict]]]:
+	if kind == "card":
+		return [
+			(f"reg_count_{event_id}", [{"event": "UPDATE", "schema": "public", "table": "event_counters", "filter": f"event_id=eq.{event_id}"}])
+			for event_id in rng.sample(events, min(CARDS_PER_VIEWER, len(events)))
+		]
+	if kind == "admin":
+		return [("pending-events-live", [
+			{"event": "DELETE", "schema": "public", "table": "events"},
+			{"event": "UPDATE", "schema": "public", "table": "events"},
+		])]
+	return [
+		(f"friends-events-regs-{viewer}", [{"event": "*", "schema": "public", "table": "event_registrations"}]),
+		(f"friends-events-legacy-{viewer}", [{"event": "*", "schema": "public", "table": "registrations"}]),
+	]
+
+
+def matches(change: dict, table: str, event_type: str, record: dict) -> bool:
+	if change["table"] != table or change["event"] not in ("*", event_type):
+		return False
+	flt = change.get("filter")
+	if not flt:
+		return True
+	column, _, value = flt.partition("=eq.")
+	return str(record.get(column)) == value
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+	mix = {k: float(v) for k, v in (part.split("=") for part in spec.split(",") if part)}
+	total = sum(mix.values()) or 1.0
+	return {k: v / total for k, v in mix.items()}
+
+
+# ───────────── Generator ─────────────
+
+class Stats:
+	def __init__(self) -> None:
+		self.latencies_ms: List[float] = []
+		self.delivered = 0
+		self.expected = 0
+		self.joined = 0
+		self.join_failures: Dict[str, int] = defaultdict(int)
+		self.dropped = 0
+		self.mutations: Dict[str, int] = defaultdict(int)
+		self.first_delivery: Optional[float] = None
+		self.last_delivery: Optional[float] = None
+
+	def delivery(self, commit_ts: Optional[str]) -> None:
+		now = time.time()
+		self.delivered += 1
+		self.first_delivery = self.first_delivery or now
+		self.last_delivery = now
+		if commit_ts:
+			sent = datetime.fromisoformat(commit_ts.replace("Z", "+00:00")).timestamp()
+			self.latencies_ms.append(max(0.0, (now - sent) * 1000))
+
+
+class Viewer:
+	def __init__(self, url: str, channels: List[Tuple[str, List[dict]]], stats: Stats) -> None:
+		self.url = url
+		self.channels = channels
+		self.stats = stats
+		self._refs = itertools.count(1)
+		self.ws: Any = None
+
+	def _message(self, topic: str, event: str, payload: dict, join_ref: Optional[str] = None) -> str:
+		ref = str(next(self._refs))
+		return json.dumps({"topic": topic, "event": event, "payload": payload, "ref": ref, "join_ref": join_ref or ref})
+
+	async def connect(self) -> bool:
+		try:
+			self.ws = await websockets.connect(self.url, max_size=None, ping_interval=None, open_timeout=JOIN_TIMEOUT_SEC)
+			for name, changes in self.channels:
+				await self.ws.send(self._message(f"realtime:{name}", "phx_join", {
+					"config": {"broadcast": {"self": False}, "presence": {"key": ""}, "postgres_changes": changes},
+					"access_token": SUPABASE_KEY,
+				}))
+			pending = len(self.channels)
+			deadline = time.time() + JOIN_TIMEOUT_SEC
+			while pending:
+				msg = json.loads(await asyncio.wait_for(self.ws.recv(), max(0.1, deadline - time.time())))
+				if msg.get("event") == "phx_reply":
+					status = msg.get("payload", {}).get("status")
+					if status != "ok":
+						self.stats.join_failures[str(msg.get("payload", {}).get("response"))[:80]] += 1
+						return False
+					pending -= 1
+			self.stats.joined += 1
+			return True
+		except Exception as e:
+			self.stats.join_failures[type(e).__name__] += 1
+			return False
+
+	async def listen(self) -> None:
+		heartbeat = asyncio.ensure_future(self._heartbeat())
+		try:
+			async for raw in self.ws:
+				msg = json.loads(raw)
+				if msg.get("event") == "postgres_changes":
+					data = msg.get("payload", {}).get("data", {})
+					self.stats.delivery(data.get("commit_timestamp"))
+		except Exception:
+			self.stats.dropped += 1
+		finally:
+			heartbeat.cancel()
+
+	async def _heartbeat(self) -> None:
+		while True:
+			await asyncio.sleep(HEARTBEAT_SEC)
+			await self.ws.send(self._message("phoenix", "heartbeat", {}))
+
+	async def close(self) -> None:
+		if self.ws is not None:
+			await self.ws.close()
+
+
+class DatabaseMutator:
+	"""Identity updates on the real tables, so realtime sees changes but no data moves."""
+
+	def __init__(self) -> None:
+		self.conn: Any = None
+		self.events: List[str] = []
+		self.registrations: List[str] = []
+
+	async def open(self) -> List[str]:
+		pg_bench.require_psycopg()
+		self.conn = await pg_bench.psycopg.AsyncConnection.connect(pg_bench.DATABASE_URL, autocommit=True)
+		published = {r[0] for r in await (await self.conn.execute(
+			"select tablename from pg_publication_tables where pubname = 'supabase_realtime'"
+		)).fetchall()}
+		for table in ("event_counters", "events", "registrations"):
+			if table not in published:
+				warn(f"{table} is not in the supabase_realtime publication; its subscribers will get nothing")
+		rows = await (await self.conn.execute(
+			"select event_id::text from public.event_counters limit %s", (TARGET_EVENTS,)
+		)).fetchall()
+		self.events = [r[0] for r in rows]
+		rows = await (await self.conn.execute("select registration_id::text from public.registrations limit 100")).fetchall()
+		self.registrations = [r[0] for r in rows]
+		return self.events
+
+	async def mutate(self, kind: str, rng: random.Random) -> Optional[Tuple[str, str, dict]]:
+		if kind == "event_counters" and self.events:
+			event_id = rng.choice(self.events)
+			await self.conn.execute("update public.event_counters set reg_count = reg_count where event_id = %s", (event_id,))
+			return "event_counters", "UPDATE", {"event_id": event_id}
+		if kind == "events" and self.events:
+			event_id = rng.choice(self.events)
+			await self.conn.execute("update public.events set status = status where event_id = %s", (event_id,))
+			return "events", "UPDATE", {"event_id": event_id}
+		if kind == "registrations" and self.registrations:
+			reg_id = rng.choice(self.registrations)
+			await self.conn.execute("update public.registrations set event_id = event_id where registration_id = %s", (reg_id,))
+			return "registrations", "UPDATE", {"registration_id": reg_id}
+		return None
+
+	async def close(self) -> None:
+		if self.conn is not None:
+			await self.conn.close()
+
+
+class StandInMutator:
+	"""Asks the stand-in server to broadcast a change, as if the database had committed it."""
+
+	def __init__(self, url: str) -> None:
+		self.url = url
+		self.ws: Any = None
+		self.events = [str(uuid.uuid4()) for _ in range(TARGET_EVENTS)]
+
+	async def open(self) -> List[str]:
+		self.ws = await websockets.connect(self.url, max_size=None, ping_interval=None)
+		return self.events
+
+	async def mutate(self, kind: str, rng: random.Random) -> Optional[Tuple[str, str, dict]]:
+		record = {"event_id": rng.choice(self.events)} if kind != "registrations" else {"registration_id": str(uuid.uuid4())}
+		await self.ws.send(json.dumps({"topic": "bench", "event": "bench_mutate", "payload": {
+			"table": kind, "type": "UPDATE", "record": record,
+		}, "ref": None}))
+		return kind, "UPDATE", record
+
+	async def close(self) -> None:
+		if self.ws is not None:
+			await self.ws.close()
+
+
+def process_rss_mb(pid: Optional[int]) -> Optional[float]:
+	if psutil is None or not pid:
+		return None
+	try:
+		return psutil.Process(pid).memory_info().rss / MB
+	except psutil.Error:
+		return None
+
+
+def find_server_pid() -> Optional[int]:
+	if REALTIME_PID:
+		return REALTIME_PID
+	if psutil is None:
+		return None
+	for proc in psutil.process_iter(["name"]):
+		if proc.info["name"] == "beam.smp":
+			return proc.pid
+	return None
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+	rng = random.Random(341)
+	stats = Stats()
+	url = REALTIME_URL
+	server: Optional[subprocess.Popen] = None
+	if args.stand_in:
+		url = f"ws://127.0.0.1:{args.port}/realtime/v1/websocket"
+		server = subprocess.Popen([sys.executable, os.path.abspath(__file__), "serve", "--port", str(args.port)])
+		await asyncio.sleep(1.5)
+		mutator: Any = StandInMutator(url)
+		server_pid: Optional[int] = server.pid
+	else:
+		mutator = DatabaseMutator()
+		server_pid = find_server_pid()
+	if "apikey=" not in url and not args.stand_in:
+		url += ("&" if "?" in url else "?") + f"apikey={SUPABASE_KEY}&vsn=1.0.0"
+
+	try:
+		events = await mutator.open()
+		if not events:
+			raise SystemExit("[REALTIME] no event_counters rows to subscribe to")
+		mix = parse_mix(VIEWER_MIX)
+		kinds = rng.choices(list(mix), weights=list(mix.values()), k=args.viewers)
+		viewers = [Viewer(url, channels_for(kind, i, events, rng), stats) for i, kind in enumerate(kinds)]
+
+		client_before = process_rss_mb(os.getpid())
+		server_before = process_rss_mb(server_pid)
+		connect_start = time.time()
+		live: List[Viewer] = []
+		for start in range(0, len(viewers), CONNECT_RATE):
+			batch_start = time.time()
+			batch = viewers[start:start + CONNECT_RATE]
+			ok = await asyncio.gather(*(v.connect() for v in batch))
+			live += [v for v, joined in zip(batch, ok) if joined]
+			await asyncio.sleep(max(0.0, batch_start + 1.0 - time.time()))
+		listeners = [asyncio.ensure_future(v.listen()) for v in live]
+		connect_sec = time.time() - connect_start
+		client_after = process_rss_mb(os.getpid())
+		server_after = process_rss_mb(server_pid)
+		warn(f"{stats.joined}/{len(viewers)} viewers joined in {connect_sec:.1f}s")
+
+		# Deliveries the joined subscriptions should see, to tell loss from slowness
+		subscriptions = [change for v in live for _, changes in v.channels for change in changes]
+
+		interval = 1.0 / args.rate
+		end = time.time() + args.duration
+		tick = time.time()
+		while time.time() < end:
+			kind = rng.choices(list(MUTATION_WEIGHTS), weights=list(MUTATION_WEIGHTS.values()))[0]
+			change = await mutator.mutate(kind, rng)
+			if change:
+				table, event_type, record = change
+				stats.mutations[table] += 1
+				stats.expected += sum(1 for c in subscriptions if matches(c, table, event_type, record))
+			tick += interval
+			await asyncio.sleep(max(0.0, tick - time.time()))
+		await asyncio.sleep(DRAIN_SEC)
+
+		for v in viewers:
+			await v.close()
+		for task in listeners:
+			task.cancel()
+	finally:
+		await mutator.close()
+		if server is not None:
+			server.terminate()
+			server.wait()
+
+	span = (stats.last_delivery - stats.first_delivery) if stats.delivered > 1 else 0.0
+	joined = max(1, stats.joined)
+	return {
+		"target": "stand-in" if args.stand_in else url.split("?")[0],
+		"viewers": args.viewers,
+		"joined": stats.joined,
+		"join_failures": dict(stats.join_failures),
+		"dropped": stats.dropped,
+		"connect_sec": round(connect_sec, 1),
+		"mutations": dict(stats.mutations),
+		"expected_deliveries": stats.expected,
+		"delivered": stats.delivered,
+		"delivery_ratio": round(stats.delivered / stats.expected, 4) if stats.expected else None,
+		"fanout_per_sec": round(stats.delivered / span, 1) if span else None,
+		"latency": pg_bench.latency_summary(stats.latencies_ms),
+		"client_kb_per_conn": round((client_after - client_before) * 1024 / joined, 1) if client_before and client_after else None,
+		"server_kb_per_conn": round((server_after - server_before) * 1024 / joined, 1) if server_before and server_after else None,
+	}
+
+
+# ───────────── Stand-in server ─────────────
+
+class StandInServer:
+	"""Just enough of the realtime protocol: joins, heartbeats and postgres_changes fan-out."""
+
+	def __init__(self) -> None:
+		self.subscriptions: Dict[Any, List[Tuple[str, dict]]] = defaultdict(list)
+
+	async def handler(self, ws: Any) -> None:
+		try:
+			async for raw in ws:
+				msg = json.loads(raw)
+				event = msg.get("event")
+				if event == "phx_join":
+					changes = msg["payload"]["config"].get("postgres_changes", [])
+					self.subscriptions[ws] += [(msg["topic"], c) for c in changes]
+					await ws.send(json.dumps({"topic": msg["topic"], "event": "phx_reply", "ref": msg["ref"], "payload": {
+						"status": "ok", "response": {"postgres_changes": [dict(c, id=i) for i, c in enumerate(changes)]},
+					}}))
+				elif event == "heartbeat":
+					await ws.send(json.dumps({"topic": "phoenix", "event": "phx_reply", "ref": msg["ref"], "payload": {"status": "ok", "response": {}}}))
+				elif event == "bench_mutate":
+					await self.broadcast(msg["payload"])
+		except Exception:
+			pass
+		finally:
+			self.subscriptions.pop(ws, None)
+
+	async def broadcast(self, change: dict) -> None:
+		commit_ts = datetime.now(timezone.utc).isoformat()
+		sends = []
+		for ws, subs in list(self.subscriptions.items()):
+			for topic, sub in subs:
+				if matches(sub, change["table"], change["type"], change["record"]):
+					sends.append(ws.send(json.dumps({"topic": topic, "event": "postgres_changes", "ref": None, "payload": {
+						"data": {
+							"schema": "public", "table": change["table"], "type": change["type"],
+							"commit_timestamp": commit_ts, "record": change["record"],
+						},
+					}})))
+		await asyncio.gather(*sends, return_exceptions=True)
+
+
+async def serve(port: int) -> None:
+	server = StandInServer()
+	async with websockets.serve(server.handler, "127.0.0.1", port, max_size=None, ping_interval=None):
+		await asyncio.Future()
+
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description="Realtime subscription fan-out load test")
+	parser.add_argument("command", nargs="?", choices=["run", "serve"], default="run")
+	parser.add_argument("--viewers", type=int, default=VIEWERS)
+	parser.add_argument("--rate", type=float, default=MUTATION_RATE, help="mutations per second")
+	parser.add_argument("--duration", type=float, default=DURATION_SEC)
+	parser.add_argument("--stand-in", action="store_true", help="use the built-in realtime stand-in")
+	parser.add_argument("--port", type=int, default=STAND_IN_PORT)
+	args = parser.parse_args()
+	if websockets is None:
+		raise SystemExit("[REALTIME] websockets is not installed: pip install websockets")
+
+	if args.command == "serve":
+		asyncio.run(serve(args.port))
+		return 0
+
+	report = asyncio.run(run(args))
+	pg_bench.print_table([{
+		"viewers": f"{report['joined']}/{report['viewers']}",
+		"delivered": f"{report['delivered']}/{report['expected_deliveries']}",
+		"fanout/s": report["fanout_per_sec"],
+		**report["latency"],
+		"client_kb/conn": report["client_kb_per_conn"],
+		"server_kb/conn": report["server_kb_per_conn"],
+	}], ["viewers", "delivered", "fanout/s", "p50_ms", "p95_ms", "p99_ms", "client_kb/conn", "server_kb/conn"])
+	path = pg_bench.write_report("realtime", report)
+	print(f"[SUMMARY] delivery ratio {report['delivery_ratio']}, {report['dropped']} dropped sockets; details in {path}")
+	return 0 if report["joined"] == report["viewers"] and (report["delivery_ratio"] or 0) >= 0.99 else 1
+
+
+if __name__ == "__main__":
+	raise SystemExit(main())
@@ -0,0 +1,267 @@
+"""
+Large-result rendering benchmark for /search, /all-events and /approve-events
+
+What it does
+- Seeds RENDER_SIZES events per page through the fixtures layer (published ones for
+  /search and /all-events, pending ones for /approve-events), topping up between sizes,
+  and deletes them again at the end (--keep leaves them for `fixtures.py sweep`)
+- Logs in as an admin (account pool lease) and, for each page and size:
+	- loads the page with an observer injected before any app code, which records when
+	  the first and the last event card appeared (cards stop changing for SETTLE_MS);
+	  skeletons, the filter panel and loading placeholders are not event cards
+	- counts DOM nodes and cards once rendering has settled
+	- scrolls to the bottom frame by frame, counting long tasks (> 50 ms) and slow
+	  frames, which is the jank a user feels
+	- on /search, opens Categories, ticks the first one and times click -> "Showing N of
+	  M events" update
+- Flags page/size combinations over RENDER_BUDGET_MS to the last card, or with more than
+  SLOW_FRAME_PCT slow frames while scrolling: that is where list virtualization or server
+  pagination is due
+
+Output: a table on stdout and .harness\\bench\\render.json.
+
+Environment options (PowerShell)
+- $env:APP_BASE_URL = "http://localhost:5173"
+- $env:HEADLESS = "1"
+- $env:RENDER_SIZES = "1000,10000,50000"
+- $env:RENDER_BUDGET_MS = "2000"
+- $env:ADMIN_EMAIL / $env:ADMIN_PASSWORD      # when there is no account pool
+- see supabase_rest.py / fixtures.py for seeding
+"""
+
+import argparse
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from webdriver_manager.chrome import ChromeDriverManager
+
+import account_pool
+import fixtures
+import pg_bench
+from supabase_rest import SupabaseError
+
+
+APP_BASE_URL = os.getenv("APP_BASE_URL", "http://localhost:5173").rstrip("/")
+HEADLESS = os.getenv("HEADLESS", "1")
+ADMIN_EMAIL = os.getenv("ADMIN_EMAIL", "admin")
+ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "admin1")
+RENDER_SIZES = os.getenv("RENDER_SIZES", "1000,10000,50000")
+RENDER_BUDGET_MS = float(os.getenv("RENDER_BUDGET_MS", "2000"))
+SLOW_FRAME_PCT = 5.0
+SETTLE_MS = 1500
+RENDER_TIMEOUT_SEC = 180
+FILTER_TIMEOUT_MS = 60000
+CATEGORIES = ["Technology", "Career", "Social", "Sports", "Arts"]
+
+# route -> status of the events it lists
+PAGES = {
+	"/search": "published",
+	"/all-events": "published",
+	"/approve-events": "pending",
+}
+
+# Installed before the app's own scripts on every navigation. Every shadcn <Card> has class
+# bg-card, including the search filter panel, loading skeletons (animate-pulse) and the
+# "Loading pending events…" card, so only cards laid out in an event list count: EventCards
+# in a .grid (search, all events) and the cards of the .space-y-6 list (approve events).
+# The live collections decide when a recount is needed, which keeps it cheap at 50k cards.
+OBSERVER_JS = """
+(() => {
+	const bench = window.__renderBench = { firstCard: null, lastCard: null, cards: 0, longTasks: [] };
+	const EVENT_CARDS = '.grid > .bg-card:not(.animate-pulse), .space-y-6 > .bg-card';
+	const cards = document.getElementsByClassName('bg-card');
+	const skeletons = document.getElementsByClassName('animate-pulse');
+	let seen = [0, 0];
+	try {
+		new PerformanceObserver(list => {
+			for (const e of list.getEntries()) bench.longTasks.push([e.startTime, e.duration]);
+		}).observe({ type: 'longtask', buffered: true });
+	} catch (e) {}
+	new MutationObserver(() => {
+		if (cards.length === seen[0] && skeletons.length === seen[1]) return;
+		seen = [cards.length, skeletons.length];
+		const count = document.querySelectorAll(EVENT_CARDS).length;
+		if (count === bench.cards) return;
+		const t = performance.now();
+		if (bench.firstCard === null) bench.firstCard = t;
+		bench.lastCard = t;
+		bench.cards = count;
+	}).observe(document, { childList: true, subtree: true });
+})();
+"""
+
+SNAPSHOT_JS = """
+const b = window.__renderBench;
+return b && {
+	firstCard: b.firstCard, lastCard: b.lastCard, cards: b.cards, now: performance.now(),
+	longTasks: b.longTasks.length, domNodes: document.getElementsByTagName('*').length,
+};
+"""
+
+SCROLL_JS = """
+const done = arguments[arguments.length - 1];
+const bench = window.__renderBench;
+const before = bench.longTasks.length;
+const frames = [];
+let last = performance.now();
+window.scrollTo(0, 0);
+const step = () => {
+	const now = performance.now();
+	frames.push(now - last);
+	last = now;
+	window.scrollBy(0, Math.round(innerHeight * 0.8));
+	const bottom = innerHeight + scrollY >= document.documentElement.scrollHeight - 2;
+	if (bottom || frames.length >= 2000) {
+		return done({
+			frames: frames.length,
+			slowFrames: frames.filter(f => f > 50).length,
+			maxFrameMs: Math.max(...frames),
+			longTasks: bench.longTasks.length - before,
+		});
+	}
+	requestAnimationFrame(step);
+};
+requestAnimationFrame(step);
+"""
+
+FILTER_JS = """
+const [timeoutMs, done] = arguments;
+const label = () => [...document.querySelectorAll('p')].find(p => p.textContent.startsWith('Showing'))?.textContent;
+const trigger = [...document.querySelectorAll('button')].find(b => b.textContent.startsWith('Categories'));
+if (!trigger) return done({ error: 'no Categories button' });
+const before = label();
+trigger.click();
+setTimeout(() => {
+	const box = document.querySelector('[role="dialog"] button[role="checkbox"]');
+	if (!box) return done({ error: 'no category option' });
+	const t0 = performance.now();
+	box.click();
+	const tick = () => {
+		const now = label();
+		if (now && now !== before) return done({ ms: performance.now() - t0 });
+		if (performance.now() - t0 > timeoutMs) return done({ error: 'list did not update' });
+		requestAnimationFrame(tick);
+	};
+	requestAnimationFrame(tick);
+}, 300);
+"""
+
+
+def build_driver():
+	chrome_options = Options()
+	if HEADLESS == "1":
+		chrome_options.add_argument("--headless=new")
+	chrome_options.add_argument("--no-sandbox")
+	chrome_options.add_argument("--disable-dev-shm-usage")
+	chrome_options.add_argument("--window-size=1366,900")
+	chrome_options.add_experimental_option("excludeSwitches", ["enable-logging"])
+	drv = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
+	drv.set_script_timeout(RENDER_TIMEOUT_SEC)
+	drv.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": OBSERVER_JS})
+	return drv
+
+
+def login(drv, account) -> None:
+	drv.get(APP_BASE_URL)
+	email = WebDriverWait(drv, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='email']")))
+	email.send_keys(account.email)
+	drv.find_element(By.CSS_SELECTOR, "input[type='password']").send_keys(account.password)
+	drv.find_element(By.XPATH, "//button[contains(text(), 'Login') or contains(text(), 'Sign In')]").click()
+	WebDriverWait(drv, 15).until(EC.invisibility_of_element_located((By.CSS_SELECTOR, "input[type='password']")))
+
+
+def wait_rendered(drv) -> Dict[str, Any]:
+	"""Poll the injected observer until the card count has not changed for SETTLE_MS."""
+	deadline = time.time() + RENDER_TIMEOUT_SEC
+	snap: Optional[Dict[str, Any]] = None
+	while time.time() < deadline:
+		snap = drv.execute_script(SNAPSHOT_JS)
+		if snap and snap["lastCard"] is not None and snap["now"] - snap["lastCard"] > SETTLE_MS:
+			return snap
+		time.sleep(0.25)
+	return dict(snap or {}, timedOut=True)
+
+
+def measure_page(drv, route: str) -> Dict[str, Any]:
+	drv.get(f"{APP_BASE_URL}{route}")
+	snap = wait_rendered(drv)
+	scroll = drv.execute_async_script(SCROLL_JS)
+	row: Dict[str, Any] = {
+		"first_card_ms": round(snap.get("firstCard") or 0),
+		"last_card_ms": round(snap.get("lastCard") or 0),
+		"cards": snap.get("cards", 0),
+		"dom_nodes": snap.get("domNodes", 0),
+		"load_long_tasks": snap.get("longTasks", 0),
+		"scroll_frames": scroll["frames"],
+		"scroll_slow_frames": scroll["slowFrames"],
+		"scroll_max_frame_ms": round(scroll["maxFrameMs"]),
+		"scroll_long_tasks": scroll["longTasks"],
+		"timed_out": bool(snap.get("timedOut")),
+	}
+	if route == "/search":
+		drv.execute_script("window.scrollTo(0, 0)")
+		result = drv.execute_async_script(FILTER_JS, FILTER_TIMEOUT_MS)
+		row["filter_ms"] = round(result["ms"]) if "ms" in result else result.get("error")
+	slow_pct = 100.0 * row["scroll_slow_frames"] / max(1, row["scroll_frames"])
+	row["verdict"] = (
+		"virtualize/paginate"
+		if row["timed_out"] or row["last_card_ms"] > RENDER_BUDGET_MS or slow_pct > SLOW_FRAME_PCT
+		else "ok"
+	)
+	return row
+
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description="Measure list rendering with thousands of events")
+	parser.add_argument("--sizes", default=RENDER_SIZES)
+	parser.add_argument("--pages", default=",".join(PAGES), help="comma-separated routes")
+	parser.add_argument("--keep", action="store_true", help="leave seeded events for a later sweep")
+	args = parser.parse_args()
+	sizes = sorted(int(s) for s in args.sizes.split(","))
+	routes = [r for r in args.pages.split(",") if r in PAGES]
+
+	fx = fixtures.Fixtures()
+	if not fx.enabled:
+		raise SystemExit("[RENDER] seeding needs SUPABASE_URL and a key (see supabase_rest.py)")
+	drv = build_driver()
+	results: List[Dict[str, Any]] = []
+	seeded = {status: 0 for status in set(PAGES[r] for r in routes)}
+	try:
+		with account_pool.lease("admin", account_pool.Account("admin", ADMIN_EMAIL, ADMIN_PASSWORD)) as admin:
+			login(drv, admin)
+			for size in sizes:
+				for status in seeded:
+					fx.seed_events(size - seeded[status], status=status, categories=CATEGORIES, spread_days=90)
+					seeded[status] = size
+				print(f"[RENDER] seeded {size} {'/'.join(seeded)} events")
+				for route in routes:
+					row = {"page": route, "seeded": size, **measure_page(drv, route)}
+					results.append(row)
+					print(f"[RENDER] {route} @ {size}: last card {row['last_card_ms']} ms, {row['dom_nodes']} nodes")
+	finally:
+		drv.quit()
+		if not args.keep:
+			try:
+				fx.teardown()
+			except SupabaseError as e:
+				print(f"[warn] Fixture teardown failed: {e}; run: python fixtures.py sweep --older-than 0")
+
+	pg_bench.print_table(results, [
+		"page", "seeded", "cards", "dom_nodes", "first_card_ms", "last_card_ms",
+		"scroll_long_tasks", "scroll_slow_frames", "filter_ms", "verdict",
+	])
+	path = pg_bench.write_report("render", results)
+	flagged = [r for r in results if r["verdict"] != "ok"]
+	print(f"[SUMMARY] {len(flagged)} of {len(results)} page/size combinations need virtualization or pagination; details in {path}")
+	return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+	raise SystemExit(main())
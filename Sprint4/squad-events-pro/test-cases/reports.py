@@ -0,0 +1,67 @@
+"""
+JUnit XML output for master.py (one <testsuite> per script and lane, one <testcase> per case)
+
+Failures in the quarantine lane are written as <skipped> so CI does not block on them.
+"""
+
+import os
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Tuple
+
+from scheduling import UnitResult
+
+
+# Per-case figures added by resources.py and tracing.py
+PROPERTY_KEYS = [
+	"rss_peak_mb", "rss_mean_mb", "cpu_peak_pct", "cpu_mean_pct", "heap_peak_mb", "heap_mean_mb", "trace",
+]
+
+
+def write_junit(path: str, results: List[UnitResult]) -> None:
+	root = ET.Element("testsuites")
+	by_suite: Dict[Tuple[str, str], List[UnitResult]] = {}
+	for result in results:
+		by_suite.setdefault((result.unit.script, result.unit.lane), []).append(result)
+
+	for (script, lane), runs in by_suite.items():
+		classname = script[:-3] if script.endswith(".py") else script
+		blocking = lane == "main"
+		suite = ET.SubElement(root, "testsuite", name=script if blocking else f"{script} ({lane})")
+		tests = failures = skipped = 0
+		for run in runs:
+			for row in run.cases:
+				tc = ET.SubElement(
+					suite, "testcase", classname=classname, name=row["case"], time=f"{row['duration']:.3f}"
+				)
+				tests += 1
+				props = {k: row[k] for k in PROPERTY_KEYS if k in row}
+				if row.get("flaky"):
+					props["flaky"] = "true"
+				if props:
+					properties = ET.SubElement(tc, "properties")
+					for name, value in props.items():
+						ET.SubElement(properties, "property", name=name, value=str(value))
+				if row["ok"]:
+					continue
+				if blocking:
+					ET.SubElement(tc, "failure", message=row.get("message", ""))
+					failures += 1
+				else:
+					ET.SubElement(tc, "skipped", message=f"quarantined: {row.get('message', '')}")
+					skipped += 1
+			# A crash or login failure exits non-zero without any failing case to show for it
+			if blocking and run.returncode != 0 and all(row["ok"] for row in run.cases):
+				tc = ET.SubElement(
+					suite, "testcase", classname=classname, name=f"{run.unit.label} (process)",
+					time=f"{run.duration:.3f}",
+				)
+				ET.SubElement(tc, "failure", message=f"exit code {run.returncode}")
+				tests += 1
+				failures += 1
+		suite.set("tests", str(tests))
+		suite.set("failures", str(failures))
+		suite.set("skipped", str(skipped))
+		suite.set("time", f"{sum(r.duration for r in runs):.3f}")
+
+	os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+	ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
@@ -0,0 +1,179 @@
+"""
+Chrome / chromedriver resource sampling for the E2E scripts
+
+What it does
+- Every RESOURCE_SAMPLE_SEC, a background thread sums RSS and CPU over each watched process
+  tree (chromedriver -> Chrome -> renderer/GPU/utility children)
+- Reads the JS heap (JSHeapUsedSize from CDP Performance.getMetrics) of every watched browser;
+  for Selenium drivers over a DevTools websocket of its own, since the WebDriver session
+  belongs to the test thread and is not safe to share
+- Attributes each sample to the case(s) running at that moment and adds peak/mean figures
+  to the case's harness row (rss_*_mb, cpu_*_pct, heap_*_mb), so master.py can tell which
+  script and case is the memory hog
+
+Cases of the asyncio suites run concurrently in one browser, so each of them is charged
+with that whole browser while it is running.
+
+Environment options (PowerShell)
+- $env:RESOURCE_SAMPLING = "0"      # disable sampling
+- $env:RESOURCE_SAMPLE_SEC = "0.5"  # sampling interval
+
+Requires: pip install psutil (sampling is skipped without it); websockets for the heap of
+Selenium drivers
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+	import psutil
+except ImportError:  # optional: scripts run without resource figures
+	psutil = None
+
+import async_driver
+import harness
+
+
+RESOURCE_SAMPLING = os.getenv("RESOURCE_SAMPLING", "1") == "1"
+RESOURCE_SAMPLE_SEC = float(os.getenv("RESOURCE_SAMPLE_SEC", "0.5"))
+HEAP_PROBE_TIMEOUT_SEC = 2.0
+
+MB = 1024 * 1024
+
+# (rss_mb, cpu_pct, heap_mb or None)
+Sample = Tuple[float, float, Optional[float]]
+
+
+def summarize(samples: List[Sample]) -> Dict[str, float]:
+	if not samples:
+		return {}
+	summary: Dict[str, float] = {}
+	columns = {"rss": [s[0] for s in samples], "cpu": [s[1] for s in samples]}
+	heaps = [s[2] for s in samples if s[2] is not None]
+	if heaps:
+		columns["heap"] = heaps
+	for key, values in columns.items():
+		unit = "pct" if key == "cpu" else "mb"
+		summary[f"{key}_peak_{unit}"] = round(max(values), 1)
+		summary[f"{key}_mean_{unit}"] = round(sum(values) / len(values), 1)
+	return summary
+
+
+class ResourceSampler:
+	def __init__(self, interval: float = RESOURCE_SAMPLE_SEC) -> None:
+		self.interval = interval
+		self._roots: List[Tuple[int, Optional[Callable[[], float]]]] = []
+		self._procs: Dict[int, Any] = {}  # kept alive so cpu_percent() has a baseline
+		self._active: Dict[str, List[Sample]] = {}
+		self._lock = threading.Lock()
+		self._thread: Optional[threading.Thread] = None
+
+	def watch(self, pid: int, heap_probe: Optional[Callable[[], float]] = None) -> None:
+		with self._lock:
+			self._roots.append((pid, heap_probe))
+		if self._thread is None:
+			harness.add_listener(self)
+			self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+			self._thread.start()
+
+	def _tree(self, pid: int) -> List[Any]:
+		root = psutil.Process(pid)
+		return [root] + root.children(recursive=True)
+
+	def sample(self, with_heap: bool = True) -> Sample:
+		rss = cpu = 0.0
+		heap: Optional[float] = None
+		with self._lock:
+			roots = list(self._roots)
+		for pid, probe in roots:
+			try:
+				tree = self._tree(pid)
+			except psutil.NoSuchProcess:
+				with self._lock:
+					self._roots = [r for r in self._roots if r[0] != pid]
+				continue
+			for proc in tree:
+				cached = self._procs.setdefault(proc.pid, proc)
+				try:
+					rss += cached.memory_info().rss / MB
+					cpu += cached.cpu_percent(None)
+				except (psutil.NoSuchProcess, psutil.AccessDenied):
+					self._procs.pop(proc.pid, None)
+			if probe and with_heap:
+				try:
+					heap = (heap or 0.0) + probe()
+				except Exception:
+					pass
+		return rss, cpu, heap
+
+	def _run(self) -> None:
+		while True:
+			# Sample even when idle so cpu_percent() always has a recent baseline
+			sample = self.sample()
+			with self._lock:
+				for samples in self._active.values():
+					samples.append(sample)
+			time.sleep(self.interval)
+
+	def case_started(self, name: str) -> None:
+		with self._lock:
+			self._active[name] = []
+
+	def case_finished(self, name: str, ok: bool) -> Dict[str, float]:
+		with self._lock:
+			samples = self._active.pop(name, [])
+		if not samples:
+			# Shorter than one interval; the heap probe may need this very thread, so skip it
+			samples = [self.sample(with_heap=False)]
+		return summarize(samples)
+
+
+_sampler: Optional[ResourceSampler] = None
+
+
+def _get_sampler() -> Optional[ResourceSampler]:
+	global _sampler
+	if psutil is None or not RESOURCE_SAMPLING:
+		return None
+	if _sampler is None:
+		_sampler = ResourceSampler()
+	return _sampler
+
+
+def watch_driver(drv: Any) -> None:
+	"""Sample a Selenium Chrome driver (chromedriver and the Chrome it started)."""
+	sampler = _get_sampler()
+	if sampler is None:
+		return
+	probe: Optional[Callable[[], float]] = None
+	if async_driver.websockets is not None:
+		loop = asyncio.new_event_loop()
+		threading.Thread(target=loop.run_forever, name="heap-probe", daemon=True).start()
+
+		def run(coro: Any) -> Any:
+			return asyncio.run_coroutine_threadsafe(coro, loop).result(HEAP_PROBE_TIMEOUT_SEC)
+
+		try:
+			conn = run(async_driver.CDPConnection.connect(async_driver.page_ws_url(drv)))
+			run(conn.send("Performance.enable"))
+			probe = lambda: async_driver.heap_from_metrics(run(conn.send("Performance.getMetrics")))
+		except Exception:
+			loop.call_soon_threadsafe(loop.stop)
+	sampler.watch(drv.service.process.pid, probe)
+
+
+def watch_async_browser(browser: Any) -> None:
+	"""Sample an async_driver.AsyncBrowser; must be called from its event loop."""
+	sampler = _get_sampler()
+	if sampler is None:
+		return
+	loop = asyncio.get_running_loop()
+
+	def probe() -> float:
+		future = asyncio.run_coroutine_threadsafe(browser.js_heap_used(), loop)
+		return future.result(HEAP_PROBE_TIMEOUT_SEC)
+
+	sampler.watch(browser.proc.pid, probe)
@@ -0,0 +1,153 @@
+"""
+Timing cache and longest-first scheduling for master.py
+
+What it does
+- Keeps an exponentially weighted duration per case and a per-script overhead (driver
+  start-up, login, ...) learned from previous runs, plus each script's peak RSS
+- Splits a script whose expected time exceeds the ideal per-worker share into case
+  shards, bin-packed longest-processing-time first (each shard pays the overhead again)
+- Runs quarantined cases (see flakes.py) in a separate "quarantine" lane
+- Orders every unit longest first, so a worker pool fed in that order gets close to the
+  minimum possible makespan
+"""
+
+import json
+import math
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+
+DEFAULT_SCRIPT_SEC = 60.0
+EWMA_ALPHA = 0.5
+PEAK_DECAY = 0.8
+
+
+@dataclass
+class WorkUnit:
+	script: str
+	cases: Optional[List[str]] = None  # None runs every case not in skip_cases
+	skip_cases: List[str] = field(default_factory=list)
+	expected: float = DEFAULT_SCRIPT_SEC
+	lane: str = "main"  # "quarantine" units never fail the run
+
+	@property
+	def complete(self) -> bool:
+		return self.cases is None and not self.skip_cases
+
+	@property
+	def label(self) -> str:
+		if self.complete:
+			label = self.script
+		elif self.cases is not None:
+			label = f"{self.script} [{len(self.cases)} cases]"
+		else:
+			label = f"{self.script} [all but {len(self.skip_cases)} cases]"
+		return label if self.lane == "main" else f"{label} ({self.lane})"
+
+
+@dataclass
+class UnitResult:
+	unit: WorkUnit
+	returncode: int
+	duration: float
+	cases: List[Dict[str, Any]]
+	output: str = ""
+
+
+def _ewma(old: Optional[float], new: float) -> float:
+	return new if old is None else EWMA_ALPHA * new + (1 - EWMA_ALPHA) * old
+
+
+class TimingCache:
+	def __init__(self, path: str) -> None:
+		self.path = path
+		self.data: Dict[str, Any] = {"scripts": {}}
+		if os.path.exists(path):
+			try:
+				with open(path, encoding="utf-8") as fh:
+					self.data = json.load(fh)
+			except (OSError, ValueError):
+				pass
+
+	def _entry(self, script: str) -> Dict[str, Any]:
+		return self.data.setdefault("scripts", {}).setdefault(script, {"overhead": None, "cases": {}})
+
+	def case_durations(self, script: str) -> Dict[str, float]:
+		return dict(self._entry(script)["cases"])
+
+	def overhead(self, script: str) -> float:
+		entry = self._entry(script)
+		if entry["overhead"] is not None:
+			return entry["overhead"]
+		return 0.0 if entry["cases"] else DEFAULT_SCRIPT_SEC
+
+	def peak_rss(self, script: str) -> Optional[float]:
+		return self._entry(script).get("peak_rss_mb")
+
+	def expected(self, script: str) -> float:
+		return self.overhead(script) + sum(self.case_durations(script).values())
+
+	def update(self, result: UnitResult) -> None:
+		entry = self._entry(result.unit.script)
+		seen = {}
+		for row in result.cases:
+			seen[row["case"]] = row["duration"]
+			entry["cases"][row["case"]] = _ewma(entry["cases"].get(row["case"]), row["duration"])
+		if result.unit.complete:
+			# A full run is authoritative about which cases still exist
+			entry["cases"] = {k: v for k, v in entry["cases"].items() if k in seen}
+		entry["overhead"] = _ewma(entry["overhead"], max(0.0, result.duration - sum(seen.values())))
+		peaks = [row["rss_peak_mb"] for row in result.cases if "rss_peak_mb" in row]
+		if peaks:
+			# Decaying maximum: a new high counts at once, an old one fades over a few runs
+			old = entry.get("peak_rss_mb") or 0.0
+			entry["peak_rss_mb"] = round(max(max(peaks), old * PEAK_DECAY), 1)
+
+	def save(self) -> None:
+		os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+		tmp = f"{self.path}.tmp"
+		with open(tmp, "w", encoding="utf-8") as fh:
+			json.dump(self.data, fh, indent=2, sort_keys=True)
+		os.replace(tmp, self.path)
+
+
+def lpt_partition(durations: Dict[str, float], k: int) -> List[Tuple[float, List[str]]]:
+	bins: List[Tuple[float, List[str]]] = [(0.0, []) for _ in range(k)]
+	for name, duration in sorted(durations.items(), key=lambda kv: kv[1], reverse=True):
+		idx = min(range(k), key=lambda i: bins[i][0])
+		load, names = bins[idx]
+		bins[idx] = (load + duration, names + [name])
+	return [b for b in bins if b[1]]
+
+
+def plan(
+	scripts: List[str], cache: TimingCache, workers: int, quarantine: Optional[Dict[str, List[str]]] = None
+) -> List[WorkUnit]:
+	quarantine = quarantine or {}
+	expected = {s: cache.expected(s) for s in scripts}
+	share = sum(expected.values()) / max(workers, 1)
+	units: List[WorkUnit] = []
+
+	for script in scripts:
+		known = cache.case_durations(script)
+		held = quarantine.get(script, [])
+		cases = {k: v for k, v in known.items() if k not in held}
+		overhead = cache.overhead(script)
+		if held:
+			held_sec = sum(known.get(name, 0.0) for name in held)
+			units.append(WorkUnit(script, list(held), [], overhead + held_sec, lane="quarantine"))
+		main_expected = overhead + sum(cases.values())
+		if workers > 1 and len(cases) > 1 and main_expected > share:
+			k = min(workers, len(cases), math.ceil(sum(cases.values()) / max(share - overhead, 1e-3)))
+			shards = lpt_partition(cases, k) if k > 1 else []
+			if len(shards) > 1:
+				# The first shard also picks up any case the cache has not seen yet
+				rest = [name for _, names in shards[1:] for name in names]
+				units.append(WorkUnit(script, None, rest + list(held), overhead + shards[0][0]))
+				units.extend(WorkUnit(script, names, [], overhead + load) for load, names in shards[1:])
+				continue
+		units.append(WorkUnit(script, None, list(held), main_expected))
+
+	units.sort(key=lambda u: u.expected, reverse=True)
+	return units
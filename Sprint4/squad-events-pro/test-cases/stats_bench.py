@@ -0,0 +1,266 @@
+"""
+Scaling benchmark for the analytics RPCs behind the Stats / Analytics pages
+
+What it does
+- Grows the bench schema's tickets table through BENCH_TICKET_SIZES (10k, 100k, 1M by
+  default) and, at each size, times the two ways of answering db.getGlobalStats() and
+  db.getOrganizerStats():
+	aggregate: get_global_stats() / get_organizer_stats(p_organizer), counting tickets
+	           on every call as the RPCs do today
+	summary:   the same results read from event_ticket_stats, a per-event counter table
+	           kept current by a trigger on tickets
+- Reports p50/p95/p99 per RPC and size, the per-insert cost the trigger adds to RSVPs,
+  and, by extrapolating the last two sizes, the ticket count at which each RPC's p95
+  crosses STATS_BUDGET_MS
+- Writes .harness\\bench\\stats_scaling.json and, with matplotlib, stats_scaling.png
+  (latency against tickets, log-log)
+
+The RPC bodies are not in the repo, so the bench schema gets aggregate versions returning
+the columns the app reads (total_registrations, checked_in, attendance_rate). With
+BENCH_SCHEMA=public the deployed RPCs are timed as they are and the summary variant is
+skipped.
+
+Environment options (PowerShell)
+- $env:BENCH_TICKET_SIZES = "10000,100000,1000000"
+- $env:BENCH_EVENTS = "20000"
+- $env:BENCH_RUNS = "30"
+- $env:STATS_BUDGET_MS = "500"
+- see pg_bench.py for DATABASE_URL / BENCH_SCHEMA
+
+Requires: pip install matplotlib (optional, for the plot)
+"""
+
+import argparse
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+try:
+	import matplotlib
+	matplotlib.use("Agg")
+	import matplotlib.pyplot as plt
+except ImportError:  # optional: the JSON report is written either way
+	plt = None
+
+import pg_bench
+
+
+BENCH_TICKET_SIZES = os.getenv("BENCH_TICKET_SIZES", "10000,100000,1000000")
+BENCH_EVENTS = int(os.getenv("BENCH_EVENTS", "20000"))
+BENCH_RUNS = int(os.getenv("BENCH_RUNS", "30"))
+STATS_BUDGET_MS = float(os.getenv("STATS_BUDGET_MS", "500"))
+TRIGGER_SAMPLE = 2000
+
+AGGREGATE_SQL = """
+create or replace function {schema}.get_global_stats()
+returns table(total_registrations bigint, checked_in bigint, attendance_rate numeric)
+language sql stable as $$
+	select count(*), count(*) filter (where t.is_checked_in),
+		case when count(*) = 0 then 0
+			else round(100.0 * count(*) filter (where t.is_checked_in) / count(*)) end
+	from {schema}.tickets t
+$$;
+create or replace function {schema}.get_organizer_stats(p_organizer uuid)
+returns table(total_registrations bigint, checked_in bigint, attendance_rate numeric)
+language sql stable as $$
+	select count(*), count(*) filter (where t.is_checked_in),
+		case when count(*) = 0 then 0
+			else round(100.0 * count(*) filter (where t.is_checked_in) / count(*)) end
+	from {schema}.tickets t join {schema}.events e on e.event_id = t.event_id
+	where e.created_by = p_organizer
+$$;
+"""
+
+SUMMARY_SQL = """
+create table if not exists {schema}.event_ticket_stats (
+	event_id uuid primary key,
+	created_by uuid,
+	total bigint not null default 0,
+	checked_in bigint not null default 0
+);
+create index if not exists event_ticket_stats_created_by_idx on {schema}.event_ticket_stats (created_by);
+create or replace function {schema}.bump_event_ticket_stats()
+returns trigger language plpgsql as $$
+declare
+	eid uuid;
+	d_total int := 0;
+	d_checked int := 0;
+begin
+	if tg_op = 'INSERT' then
+		eid := new.event_id; d_total := 1; d_checked := new.is_checked_in::int;
+	elsif tg_op = 'DELETE' then
+		eid := old.event_id; d_total := -1; d_checked := -old.is_checked_in::int;
+	else
+		eid := new.event_id; d_checked := new.is_checked_in::int - old.is_checked_in::int;
+	end if;
+	insert into {schema}.event_ticket_stats as s (event_id, created_by, total, checked_in)
+		select eid, e.created_by, d_total, d_checked from {schema}.events e where e.event_id = eid
+		on conflict (event_id) do update
+			set total = s.total + excluded.total, checked_in = s.checked_in + excluded.checked_in;
+	return null;
+end
+$$;
+drop trigger if exists event_ticket_stats_trg on {schema}.tickets;
+create trigger event_ticket_stats_trg after insert or delete or update of is_checked_in on {schema}.tickets
+	for each row execute function {schema}.bump_event_ticket_stats();
+create or replace function {schema}.get_global_stats_summary()
+returns table(total_registrations bigint, checked_in bigint, attendance_rate numeric)
+language sql stable as $$
+	select sum(s.total)::bigint, sum(s.checked_in)::bigint,
+		case when coalesce(sum(s.total), 0) = 0 then 0 else round(100.0 * sum(s.checked_in) / sum(s.total)) end
+	from {schema}.event_ticket_stats s
+$$;
+create or replace function {schema}.get_organizer_stats_summary(p_organizer uuid)
+returns table(total_registrations bigint, checked_in bigint, attendance_rate numeric)
+language sql stable as $$
+	select sum(s.total)::bigint, sum(s.checked_in)::bigint,
+		case when coalesce(sum(s.total), 0) = 0 then 0 else round(100.0 * sum(s.checked_in) / sum(s.total)) end
+	from {schema}.event_ticket_stats s where s.created_by = p_organizer
+$$;
+"""
+
+REBUILD_SQL = """
+truncate event_ticket_stats;
+insert into event_ticket_stats (event_id, created_by, total, checked_in)
+	select e.event_id, e.created_by, count(*), count(*) filter (where t.is_checked_in)
+	from tickets t join events e on e.event_id = t.event_id
+	group by e.event_id, e.created_by;
+analyze event_ticket_stats;
+"""
+
+RPCS = {
+	"aggregate": ("select * from get_global_stats()", "select * from get_organizer_stats(%(org)s)"),
+	"summary": ("select * from get_global_stats_summary()", "select * from get_organizer_stats_summary(%(org)s)"),
+}
+
+
+def install(conn: Any) -> None:
+	pg_bench.ensure_schema(conn)
+	conn.execute(AGGREGATE_SQL.format(schema=pg_bench.BENCH_SCHEMA))
+	conn.execute(SUMMARY_SQL.format(schema=pg_bench.BENCH_SCHEMA))
+
+
+def grow(conn: Any, tickets: int) -> Dict[str, float]:
+	"""Seed up to `tickets` with the trigger off, then rebuild the summary in one pass."""
+	conn.execute("alter table tickets disable trigger event_ticket_stats_trg")
+	try:
+		added = pg_bench.seed_tickets(conn, tickets)
+	finally:
+		conn.execute("alter table tickets enable trigger event_ticket_stats_trg")
+	start = time.perf_counter()
+	conn.execute(REBUILD_SQL)
+	return {"added": added, "rebuild_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+
+def busiest_organizer(conn: Any) -> Any:
+	return conn.execute(
+		"select e.created_by from tickets t join events e on e.event_id = t.event_id "
+		"group by e.created_by order by count(*) desc limit 1"
+	).fetchone()[0]
+
+
+def insert_cost_ms(conn: Any, with_trigger: bool) -> float:
+	"""Mean cost of one RSVP-style ticket insert; every insert is rolled back."""
+	event_id = conn.execute("select event_id from events limit 1").fetchone()[0]
+	with conn.transaction(force_rollback=True):
+		if not with_trigger:
+			conn.execute("alter table tickets disable trigger event_ticket_stats_trg")
+		samples = pg_bench.time_calls(
+			lambda: conn.execute(
+				"insert into tickets (event_id, user_id, qr_code) values (%s, gen_random_uuid(), 'QR_bench')",
+				(event_id,),
+			),
+			TRIGGER_SAMPLE,
+		)
+	return round(sum(samples) / len(samples), 4)
+
+
+def crossing(points: List[Dict[str, Any]], key: str, budget_ms: float) -> Optional[int]:
+	"""Ticket count where `key`'s p95 reaches the budget, extrapolated from the last two sizes."""
+	pts = [(p["tickets"], p[key]["p95_ms"]) for p in points if key in p]
+	if len(pts) < 2:
+		return None
+	(n1, t1), (n2, t2) = pts[-2], pts[-1]
+	if t2 >= budget_ms:
+		return next(n for n, t in pts if t >= budget_ms)
+	if t2 <= t1:
+		return None
+	return int(n2 + (budget_ms - t2) * (n2 - n1) / (t2 - t1))
+
+
+def plot(points: List[Dict[str, Any]], keys: List[str], path: str) -> None:
+	fig, ax = plt.subplots(figsize=(8, 5))
+	for key in keys:
+		xs = [p["tickets"] for p in points if key in p]
+		ax.plot(xs, [p[key]["p95_ms"] for p in points if key in p], marker="o", label=f"{key} p95")
+	ax.axhline(STATS_BUDGET_MS, color="grey", linestyle="--", label=f"budget {STATS_BUDGET_MS:.0f} ms")
+	ax.set_xscale("log")
+	ax.set_yscale("log")
+	ax.set_xlabel("tickets")
+	ax.set_ylabel("latency (ms)")
+	ax.set_title("Analytics RPC latency vs data size")
+	ax.legend()
+	fig.tight_layout()
+	fig.savefig(path)
+	plt.close(fig)
+
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description="Benchmark get_global_stats / get_organizer_stats against data size")
+	parser.add_argument("--sizes", default=BENCH_TICKET_SIZES, help="comma-separated ticket counts")
+	parser.add_argument("--events", type=int, default=BENCH_EVENTS)
+	parser.add_argument("--runs", type=int, default=BENCH_RUNS)
+	args = parser.parse_args()
+	sizes = sorted(int(s) for s in args.sizes.split(","))
+	variants = ["aggregate"] if pg_bench.BENCH_SCHEMA == "public" else list(RPCS)
+
+	points: List[Dict[str, Any]] = []
+	with pg_bench.connect() as conn:
+		if pg_bench.BENCH_SCHEMA == "public":
+			sizes = [pg_bench.row_count(conn, "tickets")]
+		else:
+			install(conn)
+			pg_bench.seed_events(conn, args.events)
+		for size in sizes:
+			point: Dict[str, Any] = {"tickets": size}
+			if pg_bench.BENCH_SCHEMA != "public":
+				current = pg_bench.row_count(conn, "tickets")
+				if current > size:
+					print(f"[BENCH] skipping {size}: tickets already has {current} rows")
+					continue
+				point.update(grow(conn, size))
+				point["insert_ms_plain"] = insert_cost_ms(conn, with_trigger=False)
+				point["insert_ms_trigger"] = insert_cost_ms(conn, with_trigger=True)
+			org = busiest_organizer(conn)
+			for variant in variants:
+				global_sql, org_sql = RPCS[variant]
+				for rpc, sql in ((f"global_{variant}", global_sql), (f"organizer_{variant}", org_sql)):
+					samples = pg_bench.time_calls(lambda: conn.execute(sql, {"org": org}).fetchall(), args.runs)
+					point[rpc] = pg_bench.latency_summary(samples)
+			points.append(point)
+			print(f"[BENCH] {size} tickets: " + ", ".join(
+				f"{k} p95 {v['p95_ms']}ms" for k, v in point.items() if isinstance(v, dict)
+			))
+
+	keys = [f"{scope}_{variant}" for variant in variants for scope in ("global", "organizer")]
+	rows = [
+		{"tickets": p["tickets"], **{k: p[k]["p95_ms"] for k in keys if k in p},
+			"insert_ms_plain": p.get("insert_ms_plain", ""), "insert_ms_trigger": p.get("insert_ms_trigger", "")}
+		for p in points
+	]
+	print("p95 latency (ms) by ticket count")
+	pg_bench.print_table(rows, ["tickets", *keys, "insert_ms_plain", "insert_ms_trigger"])
+
+	budget = {key: crossing(points, key, STATS_BUDGET_MS) for key in keys}
+	for key, at in budget.items():
+		print(f"[SUMMARY] {key}: " + (f"p95 reaches {STATS_BUDGET_MS:.0f} ms at ~{at} tickets" if at else "stays within budget"))
+	path = pg_bench.write_report("stats_scaling", {"budget_ms": STATS_BUDGET_MS, "crossing": budget, "points": points})
+	if plt is not None and points:
+		png = os.path.splitext(path)[0] + ".png"
+		plot(points, keys, png)
+		print(f"[BENCH] plot: {png}")
+	return 0
+
+
+if __name__ == "__main__":
+	raise SystemExit(main())
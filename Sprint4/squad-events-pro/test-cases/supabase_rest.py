@@ -0,0 +1,158 @@
+"""
+Minimal Supabase REST client for the test harness (stdlib only)
+
+What it does
+- Talks to PostgREST (/rest/v1) and RPCs directly, so fixtures can be seeded and removed
+  without driving the UI
+- Wraps the GoTrue endpoints (/auth/v1) the load tests and account pools need: password
+  sign-in, sign-up, token refresh and admin user creation
+- Uses the service-role key when available so RLS does not hide harness rows
+
+Environment options (PowerShell)
+- $env:SUPABASE_URL = "http://127.0.0.1:54321"     # defaults to VITE_SUPABASE_URL
+- $env:SUPABASE_SERVICE_ROLE_KEY = "..."           # defaults to VITE_SUPABASE_ANON_KEY
+"""
+
+import json
+import os
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Any, Dict, Iterable, List, Optional
+
+
+SUPABASE_URL = (os.getenv("SUPABASE_URL") or os.getenv("VITE_SUPABASE_URL") or "").rstrip("/")
+SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("VITE_SUPABASE_ANON_KEY") or ""
+# What the app itself sends; sign-in / sign-up traffic should look like the app's
+SUPABASE_ANON_KEY = os.getenv("VITE_SUPABASE_ANON_KEY") or SUPABASE_KEY
+
+REQUEST_TIMEOUT_SEC = 15
+
+
+class SupabaseError(Exception):
+	def __init__(self, status: int, message: str) -> None:
+		super().__init__(f"HTTP {status}: {message}")
+		self.status = status
+
+
+def in_filter(values: Iterable[Any]) -> str:
+	quoted = ",".join('"' + str(v).replace('"', '\\"') + '"' for v in values)
+	return f"in.({quoted})"
+
+
+class SupabaseRest:
+	def __init__(self, url: Optional[str] = None, key: Optional[str] = None) -> None:
+		self.url = (url or SUPABASE_URL).rstrip("/")
+		self.key = key or SUPABASE_KEY
+
+	@property
+	def enabled(self) -> bool:
+		return bool(self.url and self.key)
+
+	def request(
+		self,
+		method: str,
+		path: str,
+		*,
+		params: Optional[Dict[str, str]] = None,
+		body: Any = None,
+		headers: Optional[Dict[str, str]] = None,
+		token: Optional[str] = None,
+	) -> Any:
+		if not self.enabled:
+			raise SupabaseError(0, "SUPABASE_URL / key not configured")
+		url = f"{self.url}{path}"
+		if params:
+			url += "?" + urllib.parse.urlencode(params)
+		data = json.dumps(body).encode("utf-8") if body is not None else None
+		req = urllib.request.Request(url, data=data, method=method)
+		req.add_header("apikey", self.key)
+		req.add_header("Authorization", f"Bearer {token or self.key}")
+		req.add_header("Content-Type", "application/json")
+		for name, value in (headers or {}).items():
+			req.add_header(name, value)
+		try:
+			with urllib.request.urlopen(req, timeout=REQUEST_TIMEOUT_SEC) as resp:
+				raw = resp.read()
+		except urllib.error.HTTPError as e:
+			raise SupabaseError(e.code, e.read().decode("utf-8", "replace")) from None
+		except urllib.error.URLError as e:
+			raise SupabaseError(0, str(e.reason)) from None
+		return json.loads(raw) if raw else None
+
+	def select(self, table: str, params: Optional[Dict[str, str]] = None) -> List[dict]:
+		return self.request("GET", f"/rest/v1/{table}", params=params) or []
+
+	def insert(self, table: str, rows: List[dict]) -> List[dict]:
+		return self.request(
+			"POST",
+			f"/rest/v1/{table}",
+			body=rows,
+			headers={"Prefer": "return=representation"},
+		) or []
+
+	def update(self, table: str, filters: Dict[str, str], values: dict) -> List[dict]:
+		return self.request(
+			"PATCH",
+			f"/rest/v1/{table}",
+			params=filters,
+			body=values,
+			headers={"Prefer": "return=representation"},
+		) or []
+
+	def delete(self, table: str, filters: Dict[str, str]) -> List[dict]:
+		return self.request(
+			"DELETE",
+			f"/rest/v1/{table}",
+			params=filters,
+			headers={"Prefer": "return=representation"},
+		) or []
+
+	def upsert(self, table: str, rows: List[dict], on_conflict: str) -> None:
+		"""Insert rows, leaving existing ones (by on_conflict) untouched."""
+		self.request(
+			"POST",
+			f"/rest/v1/{table}",
+			params={"on_conflict": on_conflict},
+			body=rows,
+			headers={"Prefer": "resolution=ignore-duplicates,return=minimal"},
+		)
+
+	def rpc(self, name: str, args: Optional[dict] = None) -> Any:
+		return self.request("POST", f"/rest/v1/rpc/{name}", body=args or {})
+
+	# ── auth (GoTrue) ────────────────────────────────────────────────────────
+
+	def sign_in(self, email: str, password: str) -> dict:
+		"""Session dict with access_token, refresh_token, expires_at and user."""
+		return self.request(
+			"POST", "/auth/v1/token", params={"grant_type": "password"},
+			body={"email": email, "password": password},
+		)
+
+	def sign_up(self, email: str, password: str, full_name: Optional[str] = None) -> dict:
+		return self.request(
+			"POST", "/auth/v1/signup",
+			body={"email": email, "password": password, "data": {"full_name": full_name}},
+		)
+
+	def refresh(self, refresh_token: str) -> dict:
+		return self.request(
+			"POST", "/auth/v1/token", params={"grant_type": "refresh_token"},
+			body={"refresh_token": refresh_token},
+		)
+
+	def admin_create_user(self, email: str, password: str, full_name: Optional[str] = None) -> dict:
+		"""Confirmed user without any e-mail round trip; needs the service-role key."""
+		return self.request(
+			"POST", "/auth/v1/admin/users",
+			body={
+				"email": email,
+				"password": password,
+				"email_confirm": True,
+				"user_metadata": {"full_name": full_name},
+			},
+		)
+
+	def admin_delete_user(self, user_id: str) -> None:
+		self.request("DELETE", f"/auth/v1/admin/users/{user_id}")
@@ -0,0 +1,63 @@
+"""
+Worker sizing of capacity.auto_workers
+
+Usage
+- python -m pytest test_capacity.py      (or python -m unittest test_capacity)
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import capacity
+from scheduling import TimingCache, UnitResult, WorkUnit
+
+
+class AutoWorkersTest(unittest.TestCase):
+	def setUp(self) -> None:
+		self.tmp = tempfile.TemporaryDirectory()
+		self.cache = TimingCache(os.path.join(self.tmp.name, "timings.json"))
+		self.patches = [
+			mock.patch.object(capacity, "CORES_PER_WORKER", 1.5),
+			mock.patch.object(capacity, "WORKER_MEMORY_MB", 700.0),
+			mock.patch.object(capacity, "MEMORY_RESERVE_PCT", 10.0),
+		]
+		for p in self.patches:
+			p.start()
+
+	def tearDown(self) -> None:
+		for p in self.patches:
+			p.stop()
+		self.tmp.cleanup()
+
+	def workers(self, cores: int, memory, scripts) -> int:
+		with mock.patch.object(capacity.os, "cpu_count", return_value=cores), \
+				mock.patch.object(capacity, "memory_mb", return_value=memory):
+			return capacity.auto_workers(self.cache, scripts)[0]
+
+	def peak(self, script: str, mb: float) -> None:
+		row = {"case": "c", "ok": True, "duration": 1.0, "rss_peak_mb": mb}
+		self.cache.update(UnitResult(WorkUnit(script), 0, 1.0, [row]))
+
+	def test_cpu_bound_without_memory_figures(self) -> None:
+		self.assertEqual(self.workers(6, (None, None), ["a.py"]), 4)
+
+	def test_memory_bound_with_default_footprint(self) -> None:
+		# 16 cores allow 10; 3000 MB free minus a 1000 MB reserve fits two 700 MB workers
+		self.assertEqual(self.workers(16, (3000.0, 10000.0), ["a.py", "b.py"]), 2)
+
+	def test_heaviest_scripts_are_budgeted_first(self) -> None:
+		self.peak("heavy.py", 1200.0)
+		# 2500 MB budget: 1200 (heavy) + 700 (light) leaves 600, not enough for another heavy one
+		self.assertEqual(self.workers(16, (3500.0, 10000.0), ["light.py", "heavy.py"]), 2)
+
+	def test_never_below_one_worker(self) -> None:
+		self.assertEqual(self.workers(16, (500.0, 10000.0), ["a.py"]), 1)
+
+	def test_cpu_caps_memory(self) -> None:
+		self.assertEqual(self.workers(3, (64000.0, 64000.0), ["a.py"]), 2)
+
+
+if __name__ == "__main__":
+	unittest.main()
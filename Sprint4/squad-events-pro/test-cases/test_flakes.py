@@ -0,0 +1,81 @@
+"""
+Quarantine transitions of flakes.FlakeStats
+
+Usage
+- python -m pytest test_flakes.py      (or python -m unittest test_flakes)
+"""
+
+import os
+import tempfile
+import unittest
+
+from flakes import FLAKE_MIN_RUNS, FLAKE_REBLOCK_STREAK, FLAKE_RELEASE_STREAK, FlakeStats
+from scheduling import UnitResult, WorkUnit
+
+
+SCRIPT = "admin-approve-events.py"
+CASE = "test_approve_event"
+
+
+def run(stats: FlakeStats, ok: bool, attempts: int = 1) -> None:
+	row = {"case": CASE, "ok": ok, "attempts": attempts}
+	stats.update([UnitResult(WorkUnit(SCRIPT), 0 if ok else 1, 1.0, [row])])
+
+
+class QuarantineTest(unittest.TestCase):
+	def setUp(self) -> None:
+		self.tmp = tempfile.TemporaryDirectory()
+		self.stats = FlakeStats(os.path.join(self.tmp.name, "flakes.json"))
+
+	def tearDown(self) -> None:
+		self.tmp.cleanup()
+
+	def quarantine(self) -> None:
+		for _ in range(FLAKE_MIN_RUNS - 1):
+			run(self.stats, True)
+		run(self.stats, True, attempts=2)
+		self.assertEqual(self.stats.quarantined(), {SCRIPT: [CASE]})
+
+	def test_flaky_case_is_quarantined(self) -> None:
+		self.quarantine()
+
+	def test_never_passing_case_keeps_blocking(self) -> None:
+		for _ in range(FLAKE_MIN_RUNS * 2):
+			run(self.stats, False)
+		self.assertEqual(self.stats.quarantined(), {})
+
+	def test_first_hard_failure_keeps_blocking(self) -> None:
+		for _ in range(FLAKE_MIN_RUNS - 1):
+			run(self.stats, True)
+		run(self.stats, False)
+		run(self.stats, False)
+		self.assertEqual(self.stats.quarantined(), {})
+
+	def test_clean_streak_releases(self) -> None:
+		self.quarantine()
+		for _ in range(FLAKE_RELEASE_STREAK):
+			run(self.stats, True)
+		self.assertEqual(self.stats.quarantined(), {})
+
+	def test_fail_streak_moves_back_to_blocking(self) -> None:
+		self.quarantine()
+		for _ in range(FLAKE_REBLOCK_STREAK - 1):
+			run(self.stats, False)
+		self.assertEqual(self.stats.quarantined(), {SCRIPT: [CASE]})
+		run(self.stats, False)
+		self.assertEqual(self.stats.quarantined(), {})
+		# Still failing: broken, so it stays in the blocking lane
+		for _ in range(FLAKE_MIN_RUNS):
+			run(self.stats, False)
+		self.assertEqual(self.stats.quarantined(), {})
+
+	def test_flaky_failures_do_not_reblock(self) -> None:
+		self.quarantine()
+		for _ in range(FLAKE_REBLOCK_STREAK):
+			run(self.stats, False)
+			run(self.stats, True, attempts=2)
+		self.assertEqual(self.stats.quarantined(), {SCRIPT: [CASE]})
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,67 @@
+"""
+Latency histogram buckets and percentiles of load_store.py
+
+Usage
+- python -m pytest test_load_store.py      (or python -m unittest test_load_store)
+"""
+
+import unittest
+from collections import Counter
+
+from load_store import HALF, bucket_ms, bucket_of, histogram_percentiles
+
+
+# Worst case of a log-linear bucket: half its width over its lower bound (1/64)
+MAX_RELATIVE_ERROR = 0.02
+
+
+def geometric(start: float, stop: float, factor: float = 1.01):
+	value = start
+	while value < stop:
+		yield value
+		value *= factor
+
+
+class BucketTest(unittest.TestCase):
+	def test_small_values_are_exact_microseconds(self) -> None:
+		for us in range(2 * HALF):
+			self.assertEqual(bucket_ms(bucket_of(us / 1000)), us / 1000)
+
+	def test_round_trip_error(self) -> None:
+		worst = 0.0
+		for ms in geometric(0.1, 600_000):
+			worst = max(worst, abs(bucket_ms(bucket_of(ms)) - ms) / ms)
+		self.assertLess(worst, MAX_RELATIVE_ERROR)
+
+	def test_buckets_are_monotonic(self) -> None:
+		values = list(geometric(0.001, 600_000, 1.001))
+		buckets = [bucket_of(ms) for ms in values]
+		self.assertEqual(buckets, sorted(buckets))
+		midpoints = [bucket_ms(b) for b in sorted(set(buckets))]
+		self.assertEqual(midpoints, sorted(midpoints))
+
+	def test_negative_and_zero_land_in_bucket_zero(self) -> None:
+		self.assertEqual(bucket_of(-5), 0)
+		self.assertEqual(bucket_of(0), 0)
+
+
+class PercentileTest(unittest.TestCase):
+	def test_uniform_ranks(self) -> None:
+		counts = Counter(bucket_of(ms) for ms in range(1, 101))
+		result = histogram_percentiles(counts)
+		for q, expected in ((50, 50), (95, 95), (99, 99)):
+			self.assertAlmostEqual(result[f"p{q}_ms"], expected, delta=expected * MAX_RELATIVE_ERROR)
+
+	def test_tail_only_shows_above_its_rank(self) -> None:
+		counts = Counter({bucket_of(10): 99, bucket_of(1000): 1})
+		result = histogram_percentiles(counts, (50, 99, 99.9))
+		self.assertAlmostEqual(result["p50_ms"], 10, delta=0.2)
+		self.assertAlmostEqual(result["p99_ms"], 10, delta=0.2)
+		self.assertAlmostEqual(result["p99.9_ms"], 1000, delta=1000 * MAX_RELATIVE_ERROR)
+
+	def test_empty_histogram(self) -> None:
+		self.assertEqual(histogram_percentiles({}), {"p50_ms": None, "p95_ms": None, "p99_ms": None})
+
+
+if __name__ == "__main__":
+	unittest.main()
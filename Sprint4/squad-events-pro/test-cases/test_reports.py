@@ -0,0 +1,76 @@
+"""
+JUnit output of reports.write_junit
+
+Usage
+- python -m pytest test_reports.py      (or python -m unittest test_reports)
+"""
+
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+from reports import write_junit
+from scheduling import UnitResult, WorkUnit
+
+
+def row(case: str, ok: bool, **extra) -> dict:
+	return {"case": case, "ok": ok, "duration": 1.5, "message": "" if ok else f"{case} broke", **extra}
+
+
+class WriteJunitTest(unittest.TestCase):
+	def setUp(self) -> None:
+		self.tmp = tempfile.TemporaryDirectory()
+		self.path = os.path.join(self.tmp.name, "junit.xml")
+
+	def tearDown(self) -> None:
+		self.tmp.cleanup()
+
+	def write(self, results) -> ET.Element:
+		write_junit(self.path, results)
+		return ET.parse(self.path).getroot()
+
+	def suite(self, root: ET.Element, name: str) -> ET.Element:
+		return next(s for s in root.iter("testsuite") if s.get("name") == name)
+
+	def test_failures_flaky_and_quarantine(self) -> None:
+		root = self.write([
+			UnitResult(WorkUnit("a.py"), 1, 10.0, [
+				row("test_pass", True, rss_peak_mb=512.0),
+				row("test_flaky", True, flaky=True, attempts=2),
+				row("test_fail", False),
+			]),
+			UnitResult(WorkUnit("a.py", ["test_held"], lane="quarantine"), 1, 4.0, [row("test_held", False)]),
+		])
+		main = self.suite(root, "a.py")
+		self.assertEqual((main.get("tests"), main.get("failures"), main.get("skipped")), ("3", "1", "0"))
+		cases = {tc.get("name"): tc for tc in main.iter("testcase")}
+		self.assertEqual(cases["test_fail"].find("failure").get("message"), "test_fail broke")
+		self.assertIsNone(cases["test_flaky"].find("failure"))
+		flaky = {p.get("name"): p.get("value") for p in cases["test_flaky"].iter("property")}
+		self.assertEqual(flaky, {"flaky": "true"})
+		self.assertEqual(cases["test_pass"].find("properties/property").get("value"), "512.0")
+		self.assertEqual(cases["test_pass"].get("classname"), "a")
+
+		held = self.suite(root, "a.py (quarantine)")
+		self.assertEqual((held.get("tests"), held.get("failures"), held.get("skipped")), ("1", "0", "1"))
+		self.assertTrue(held.find("testcase/skipped").get("message").startswith("quarantined:"))
+
+	def test_crash_without_failing_case_is_a_failure(self) -> None:
+		root = self.write([UnitResult(WorkUnit("b.py"), 2, 3.0, [row("test_pass", True)])])
+		suite = self.suite(root, "b.py")
+		self.assertEqual((suite.get("tests"), suite.get("failures")), ("2", "1"))
+		process = next(tc for tc in suite.iter("testcase") if tc.get("name") == "b.py (process)")
+		self.assertEqual(process.find("failure").get("message"), "exit code 2")
+
+	def test_shards_of_a_script_share_one_suite(self) -> None:
+		root = self.write([
+			UnitResult(WorkUnit("c.py", None, ["test_2"]), 0, 2.0, [row("test_1", True)]),
+			UnitResult(WorkUnit("c.py", ["test_2"]), 0, 3.0, [row("test_2", True)]),
+		])
+		suite = self.suite(root, "c.py")
+		self.assertEqual((suite.get("tests"), suite.get("time")), ("2", "5.000"))
+
+
+if __name__ == "__main__":
+	unittest.main()
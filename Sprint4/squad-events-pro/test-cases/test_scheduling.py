@@ -0,0 +1,110 @@
+"""
+Timing cache updates and shard planning of scheduling.py
+
+Usage
+- python -m pytest test_scheduling.py      (or python -m unittest test_scheduling)
+"""
+
+import os
+import tempfile
+import unittest
+
+from scheduling import DEFAULT_SCRIPT_SEC, PEAK_DECAY, TimingCache, UnitResult, WorkUnit, lpt_partition, plan
+
+
+def result(script: str, durations: dict, total: float, cases=None, **extra) -> UnitResult:
+	rows = [{"case": name, "ok": True, "duration": sec, **extra} for name, sec in durations.items()]
+	return UnitResult(WorkUnit(script, cases), 0, total, rows)
+
+
+class LptPartitionTest(unittest.TestCase):
+	def test_longest_first_balances_bins(self) -> None:
+		bins = lpt_partition({"a": 5, "b": 4, "c": 3, "d": 3, "e": 3}, 2)
+		self.assertEqual(sorted(load for load, _ in bins), [8, 10])
+		self.assertEqual(sorted(name for _, names in bins for name in names), ["a", "b", "c", "d", "e"])
+
+	def test_empty_bins_are_dropped(self) -> None:
+		self.assertEqual(len(lpt_partition({"a": 1, "b": 1}, 3)), 2)
+
+
+class TimingCacheTest(unittest.TestCase):
+	def setUp(self) -> None:
+		self.tmp = tempfile.TemporaryDirectory()
+		self.path = os.path.join(self.tmp.name, "timings.json")
+		self.cache = TimingCache(self.path)
+
+	def tearDown(self) -> None:
+		self.tmp.cleanup()
+
+	def test_unknown_script_gets_the_default(self) -> None:
+		self.assertEqual(self.cache.expected("new.py"), DEFAULT_SCRIPT_SEC)
+
+	def test_ewma_and_overhead(self) -> None:
+		self.cache.update(result("s.py", {"a": 10, "b": 20}, 40))
+		self.assertEqual(self.cache.case_durations("s.py"), {"a": 10, "b": 20})
+		self.assertEqual(self.cache.overhead("s.py"), 10)
+		self.cache.update(result("s.py", {"a": 20, "b": 20}, 44))
+		self.assertEqual(self.cache.case_durations("s.py"), {"a": 15, "b": 20})
+		self.assertEqual(self.cache.overhead("s.py"), 7)
+		self.assertEqual(self.cache.expected("s.py"), 42)
+
+	def test_full_run_forgets_removed_cases_but_a_shard_does_not(self) -> None:
+		self.cache.update(result("s.py", {"a": 10, "b": 20}, 30))
+		self.cache.update(result("s.py", {"a": 10}, 10, cases=["a"]))
+		self.assertEqual(set(self.cache.case_durations("s.py")), {"a", "b"})
+		self.cache.update(result("s.py", {"a": 10}, 10))
+		self.assertEqual(set(self.cache.case_durations("s.py")), {"a"})
+
+	def test_peak_rss_decays(self) -> None:
+		self.cache.update(result("s.py", {"a": 1}, 1, rss_peak_mb=1000))
+		self.cache.update(result("s.py", {"a": 1}, 1, rss_peak_mb=100))
+		self.assertEqual(self.cache.peak_rss("s.py"), 1000 * PEAK_DECAY)
+		self.cache.update(result("s.py", {"a": 1}, 1, rss_peak_mb=2000))
+		self.assertEqual(self.cache.peak_rss("s.py"), 2000)
+
+	def test_save_and_reload(self) -> None:
+		self.cache.update(result("s.py", {"a": 10}, 12))
+		self.cache.save()
+		self.assertEqual(TimingCache(self.path).expected("s.py"), 12)
+
+
+class PlanTest(unittest.TestCase):
+	def setUp(self) -> None:
+		self.tmp = tempfile.TemporaryDirectory()
+		self.cache = TimingCache(os.path.join(self.tmp.name, "timings.json"))
+		# long.py: 4 x 10 s cases + 5 s overhead; short.py: 5 s case + 2 s overhead
+		self.cache.update(result("long.py", {f"c{i}": 10 for i in range(4)}, 45))
+		self.cache.update(result("short.py", {"only": 5}, 7))
+
+	def tearDown(self) -> None:
+		self.tmp.cleanup()
+
+	def test_one_worker_runs_whole_scripts(self) -> None:
+		units = plan(["short.py", "long.py"], self.cache, 1)
+		self.assertEqual([u.script for u in units], ["long.py", "short.py"])
+		self.assertTrue(all(u.complete for u in units))
+
+	def test_long_script_is_sharded_longest_first(self) -> None:
+		units = plan(["short.py", "long.py"], self.cache, 2)
+		shards = [u for u in units if u.script == "long.py"]
+		self.assertEqual(len(shards), 2)
+		self.assertEqual([u.expected for u in shards], [25, 25])
+		self.assertEqual([u.expected for u in units], sorted((u.expected for u in units), reverse=True))
+		# The first shard runs everything but the other shards' cases, new cases included
+		first = next(u for u in shards if u.cases is None)
+		other = next(u for u in shards if u.cases is not None)
+		self.assertEqual(sorted(first.skip_cases), sorted(other.cases))
+		self.assertEqual(len(other.cases), 2)
+
+	def test_quarantined_cases_get_their_own_lane(self) -> None:
+		units = plan(["long.py"], self.cache, 1, quarantine={"long.py": ["c0"]})
+		held = [u for u in units if u.lane == "quarantine"]
+		main = [u for u in units if u.lane == "main"]
+		self.assertEqual([u.cases for u in held], [["c0"]])
+		self.assertEqual(held[0].expected, 15)
+		self.assertEqual([u.skip_cases for u in main], [["c0"]])
+		self.assertEqual(main[0].expected, 35)
+
+
+if __name__ == "__main__":
+	unittest.main()
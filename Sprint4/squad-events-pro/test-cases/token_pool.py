@@ -0,0 +1,235 @@
+"""
+Pre-provisioned Supabase sessions for load-test virtual users
+
+What it does
+- `python token_pool.py provision --size 500` creates POOL_SIZE confirmed student accounts
+  once (GoTrue admin API with the service-role key, public sign-up otherwise), signs each in
+  and caches access/refresh tokens in .harness/token_pool.json
+- TokenPool hands those sessions to Locust users (least-leased account first), so starting
+  thousands of users causes no login storm and no auth rate limiting
+- A background refresher renews tokens shortly before they expire and writes the rotated
+  refresh tokens back to the cache file, so the next run can reuse them
+- Every Locust process runs a refresher over the same accounts, and GoTrue revokes a whole
+  session when a rotated refresh token is used again. Refreshes therefore happen under a
+  lock file next to the cache (O_EXCL, like account_pool.py), and a process first adopts
+  the tokens another one already rotated instead of refreshing them a second time
+
+Environment options (PowerShell)
+- $env:SUPABASE_URL / $env:SUPABASE_SERVICE_ROLE_KEY   # see supabase_rest.py
+- $env:TOKEN_POOL_FILE = "...\\token_pool.json"
+- $env:POOL_EMAIL_DOMAIN = "loadtest.local"
+- $env:POOL_PASSWORD = "LoadTest!2024"
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from supabase_rest import SUPABASE_ANON_KEY, SupabaseError, SupabaseRest
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TOKEN_POOL_FILE = os.getenv("TOKEN_POOL_FILE", os.path.join(HERE, ".harness", "token_pool.json"))
+POOL_EMAIL_DOMAIN = os.getenv("POOL_EMAIL_DOMAIN", "loadtest.local")
+POOL_PASSWORD = os.getenv("POOL_PASSWORD", "LoadTest!2024")
+POOL_SIZE = 200
+
+REFRESH_MARGIN_SEC = 300
+REFRESH_POLL_SEC = 15
+REFRESH_LOCK_TTL_SEC = 120
+
+
+def pool_email(index: int) -> str:
+	return f"loadtest+{index:05d}@{POOL_EMAIL_DOMAIN}"
+
+
+def _session_fields(session: dict) -> dict:
+	expires_at = session.get("expires_at") or int(time.time()) + int(session.get("expires_in", 3600))
+	return {
+		"access_token": session["access_token"],
+		"refresh_token": session["refresh_token"],
+		"expires_at": expires_at,
+	}
+
+
+def load(path: str = TOKEN_POOL_FILE) -> List[dict]:
+	if not os.path.exists(path):
+		return []
+	with open(path, encoding="utf-8") as fh:
+		return json.load(fh)
+
+
+def save(accounts: List[dict], path: str = TOKEN_POOL_FILE) -> None:
+	os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+	tmp = f"{path}.tmp"
+	with open(tmp, "w", encoding="utf-8") as fh:
+		json.dump(accounts, fh, indent=1)
+	os.replace(tmp, path)
+
+
+def _try_lock(path: str) -> bool:
+	for _ in range(2):
+		try:
+			fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+		except FileExistsError:
+			# Held for one refresh pass only; an old one belongs to a process that died in it
+			try:
+				if time.time() - os.path.getmtime(path) <= REFRESH_LOCK_TTL_SEC:
+					return False
+				os.remove(path)
+			except OSError:
+				pass
+			continue
+		with os.fdopen(fd, "w", encoding="utf-8") as fh:
+			json.dump({"pid": os.getpid(), "ts": time.time()}, fh)
+		return True
+	return False
+
+
+def provision(size: int, path: str = TOKEN_POOL_FILE) -> List[dict]:
+	"""Grow the cached pool to `size` signed-in accounts; existing ones are only re-signed-in
+	when their refresh token no longer works."""
+	admin = SupabaseRest()
+	public = SupabaseRest(key=SUPABASE_ANON_KEY)
+	accounts = {a["email"]: a for a in load(path)}
+	for index in range(size):
+		email = pool_email(index)
+		account = accounts.get(email)
+		if account:
+			try:
+				account.update(_session_fields(public.refresh(account["refresh_token"])))
+				continue
+			except SupabaseError:
+				pass
+		else:
+			full_name = f"Load Test {index:05d}"
+			try:
+				user = admin.admin_create_user(email, POOL_PASSWORD, full_name)
+			except SupabaseError as e:
+				# 422: already registered by an earlier, lost pool file; 401/403: no service key
+				if e.status in (401, 403):
+					user = public.sign_up(email, POOL_PASSWORD, full_name).get("user") or {}
+				elif e.status != 422:
+					raise
+				else:
+					user = {}
+			account = {"email": email, "password": POOL_PASSWORD, "user_id": user.get("id")}
+		session = public.sign_in(email, POOL_PASSWORD)
+		account["user_id"] = session["user"]["id"]
+		account.update(_session_fields(session))
+		accounts[email] = account
+		if (index + 1) % 50 == 0:
+			print(f"[POOL] {index + 1}/{size}")
+
+	rows = list(accounts.values())
+	save(rows, path)
+	# Same profile row the app's ensureProfile() would create on first login
+	try:
+		admin.upsert(
+			"profiles",
+			[{"user_id": a["user_id"], "email": a["email"], "full_name": None, "role": "student"} for a in rows],
+			on_conflict="user_id",
+		)
+	except SupabaseError as e:
+		print(f"[POOL] profiles not created ({e}); the app creates them on first login")
+	return rows
+
+
+class TokenPool:
+	"""Leases cached sessions to virtual users and keeps them fresh in the background."""
+
+	def __init__(self, path: str = TOKEN_POOL_FILE) -> None:
+		self.path = path
+		self.accounts = load(path)
+		self._leases: Dict[str, int] = {a["email"]: 0 for a in self.accounts}
+		self._lock = threading.Lock()
+		self._client = SupabaseRest(key=SUPABASE_ANON_KEY)
+		self._refresher: Optional[threading.Thread] = None
+
+	def __len__(self) -> int:
+		return len(self.accounts)
+
+	def lease(self) -> dict:
+		"""The least-leased account; accounts are shared once there are more users than accounts."""
+		if not self.accounts:
+			raise RuntimeError(f"token pool {self.path} is empty; run: python token_pool.py provision")
+		with self._lock:
+			account = min(self.accounts, key=lambda a: self._leases[a["email"]])
+			self._leases[account["email"]] += 1
+		self._start_refresher()
+		return account
+
+	def release(self, account: dict) -> None:
+		with self._lock:
+			self._leases[account["email"]] = max(0, self._leases[account["email"]] - 1)
+
+	def _start_refresher(self) -> None:
+		if self._refresher is None:
+			self._refresher = threading.Thread(target=self._refresh_loop, name="token-refresh", daemon=True)
+			self._refresher.start()
+
+	def refresh_due(self) -> int:
+		"""Refresh every token expiring within REFRESH_MARGIN_SEC; returns how many were renewed.
+
+		Skips the pass while another process holds the refresh lock; its rotated tokens are
+		adopted on the next poll, well before the old ones expire.
+		"""
+		deadline = time.time() + REFRESH_MARGIN_SEC
+		if all(a["expires_at"] > deadline for a in self.accounts):
+			return 0
+		lock = f"{self.path}.lock"
+		os.makedirs(os.path.dirname(lock) or ".", exist_ok=True)
+		if not _try_lock(lock):
+			return 0
+		renewed = 0
+		try:
+			# Dict updates in place: users holding the lease see the new token on their next request
+			on_disk = {a["email"]: a for a in load(self.path)}
+			for account in self.accounts:
+				newer = on_disk.get(account["email"])
+				if newer and newer["expires_at"] > account["expires_at"]:
+					account.update(_session_fields(newer))
+			for account in self.accounts:
+				if account["expires_at"] > deadline:
+					continue
+				try:
+					session = self._client.refresh(account["refresh_token"])
+				except SupabaseError:
+					session = self._client.sign_in(account["email"], account["password"])
+				account.update(_session_fields(session))
+				renewed += 1
+			return renewed
+		finally:
+			# Also after a failure: tokens rotated so far are the only valid ones now
+			if renewed:
+				save(self.accounts, self.path)
+			try:
+				os.remove(lock)
+			except OSError:
+				pass
+
+	def _refresh_loop(self) -> None:
+		while True:
+			try:
+				self.refresh_due()
+			except SupabaseError as e:
+				print(f"[POOL] refresh failed: {e}")
+			time.sleep(REFRESH_POLL_SEC)
+
+
+def main() -> int:
+	parser = argparse.ArgumentParser(description="Provision the load-test account pool")
+	parser.add_argument("command", choices=["provision"])
+	parser.add_argument("--size", type=int, default=POOL_SIZE)
+	parser.add_argument("--file", default=TOKEN_POOL_FILE)
+	args = parser.parse_args()
+	accounts = provision(args.size, args.file)
+	print(f"[POOL] {len(accounts)} accounts with cached sessions in {args.file}")
+	return 0
+
+
+if __name__ == "__main__":
+	raise SystemExit(main())
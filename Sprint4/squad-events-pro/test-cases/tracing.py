@@ -0,0 +1,182 @@
+"""
+On-demand Chrome performance traces for slow or failed cases
+
+What it does
+- Starts CDP tracing (DevTools timeline categories) when a case starts, in Chrome's ring
+  buffer mode, so only the most recent TRACE_BUFFER_KB of events are ever kept
+- When the case fails or overruns its time budget, reads the buffer back and writes
+  $TRACE_DIR/<script>/<case>.json (open it in the DevTools Performance panel or Perfetto)
+  to see whether time went to scripting, layout, network or Supabase requests
+- Otherwise the buffer is dropped inside Chrome, so green cases never transfer trace data
+
+A case's budget is TRACE_BUDGET_FACTOR x its usual duration from master.py's timing cache
+(at least TRACE_MIN_BUDGET_SEC), or TRACE_BUDGET_SEC when set.
+
+Tracing is off by default: even in ring-buffer mode it slows every case a little, and
+master.py's timing cache would learn those slower durations. JS stack sampling
+(TRACE_STACKS=1) costs the most and is opt-in on top of that.
+
+Tracing talks to the browser over its own DevTools websocket (async_driver.CDPConnection on
+a background event loop), because Selenium's execute_cdp_cmd cannot receive CDP events.
+
+Environment options (PowerShell)
+- $env:TRACE_CASES = "1"             # enable tracing
+- $env:TRACE_STACKS = "1"            # also sample JS stacks (slower cases, richer traces)
+- $env:TRACE_DIR = "...\\traces"      # default: test-cases\\.harness\\traces
+- $env:TRACE_BUDGET_SEC = "20"       # fixed budget for every case
+- $env:TRACE_BUDGET_FACTOR = "2"
+
+Requires: pip install websockets (tracing is skipped without it)
+"""
+
+import asyncio
+import base64
+import json
+import os
+import re
+import threading
+import time
+import urllib.request
+from typing import Any, Dict, Optional
+
+import async_driver
+import harness
+from scheduling import TimingCache
+
+
+TRACE_CASES = os.getenv("TRACE_CASES", "0") == "1"
+TRACE_STACKS = os.getenv("TRACE_STACKS", "0") == "1"
+TRACE_DIR = os.getenv("TRACE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".harness", "traces"))
+TRACE_BUDGET_SEC = float(os.getenv("TRACE_BUDGET_SEC", "0"))
+TRACE_BUDGET_FACTOR = float(os.getenv("TRACE_BUDGET_FACTOR", "2"))
+TRACE_MIN_BUDGET_SEC = 10.0
+TRACE_BUFFER_KB = 64 * 1024
+TRACE_CDP_TIMEOUT_SEC = 30.0
+
+# Same set the DevTools Performance panel records, stack sampling only with TRACE_STACKS=1
+TRACE_CATEGORIES = [
+	"-*",
+	"devtools.timeline",
+	"disabled-by-default-devtools.timeline",
+	"disabled-by-default-devtools.timeline.frame",
+	"v8.execute",
+	"blink.user_timing",
+	"loading",
+	"latencyInfo",
+	"toplevel",
+] + (["disabled-by-default-devtools.timeline.stack"] if TRACE_STACKS else [])
+
+
+def _budget_cache() -> Optional[TimingCache]:
+	path = os.getenv("HARNESS_TIMINGS")
+	return TimingCache(path) if path and os.path.exists(path) else None
+
+
+def case_budget(cache: Optional[TimingCache], case: str) -> float:
+	if TRACE_BUDGET_SEC > 0:
+		return TRACE_BUDGET_SEC
+	usual = cache.case_durations(harness.SCRIPT).get(case) if cache else None
+	return max(TRACE_MIN_BUDGET_SEC, (usual or TRACE_MIN_BUDGET_SEC) * TRACE_BUDGET_FACTOR)
+
+
+def warn(msg: str) -> None:
+	print(f"[TRACE] {msg}")
+
+
+def _safe_name(name: str) -> str:
+	return re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("_") or "case"
+
+
+class CaseTracer:
+	def __init__(self, ws_url: str) -> None:
+		self._loop = asyncio.new_event_loop()
+		threading.Thread(target=self._loop.run_forever, name="case-tracer", daemon=True).start()
+		self._cache = _budget_cache()
+		self._started: Dict[str, float] = {}
+		self._tracing = False
+		self.conn: async_driver.CDPConnection = self._run(async_driver.CDPConnection.connect(ws_url))
+
+	def _run(self, coro: Any) -> Any:
+		return asyncio.run_coroutine_threadsafe(coro, self._loop).result(TRACE_CDP_TIMEOUT_SEC)
+
+	def case_started(self, name: str) -> None:
+		self._started[name] = time.time()
+		if self._tracing:
+			return
+		try:
+			self._run(self.conn.send("Tracing.start", {
+				"traceConfig": {
+					"recordMode": "recordContinuously",
+					"traceBufferSizeInKb": TRACE_BUFFER_KB,
+					"includedCategories": TRACE_CATEGORIES,
+				},
+				"transferMode": "ReturnAsStream",
+				"streamFormat": "json",
+			}))
+			self._tracing = True
+		except Exception as e:
+			# A closed browser must not fail the case itself
+			warn(f"tracing unavailable: {e}")
+
+	def case_finished(self, name: str, ok: bool) -> Dict[str, Any]:
+		duration = time.time() - self._started.pop(name, time.time())
+		if not self._tracing:
+			return {}
+		keep = not ok or duration > case_budget(self._cache, name)
+		path = os.path.join(TRACE_DIR, _safe_name(harness.SCRIPT), f"{_safe_name(name)}.json") if keep else None
+		try:
+			self._run(self._end(path))
+		except Exception as e:
+			warn(f"could not collect trace for '{name}': {e}")
+			return {}
+		finally:
+			self._tracing = False
+		return {"trace": path} if path else {}
+
+	async def _end(self, path: Optional[str]) -> None:
+		done: asyncio.Future = self._loop.create_future()
+
+		def on_complete(params: dict) -> None:
+			if not done.done():
+				done.set_result(params.get("stream"))
+
+		self.conn.on("Tracing.tracingComplete", on_complete)
+		try:
+			await self.conn.send("Tracing.end")
+			stream = await done
+		finally:
+			self.conn.off("Tracing.tracingComplete", on_complete)
+		if not stream:
+			return
+		try:
+			if path:
+				os.makedirs(os.path.dirname(path), exist_ok=True)
+				with open(path, "wb") as fh:
+					while True:
+						chunk = await self.conn.send("IO.read", {"handle": stream, "size": 1 << 20})
+						data = chunk.get("data", "")
+						fh.write(base64.b64decode(data) if chunk.get("base64Encoded") else data.encode("utf-8"))
+						if chunk.get("eof"):
+							break
+		finally:
+			await self.conn.send("IO.close", {"handle": stream})
+
+
+def _browser_ws_url(drv: Any) -> Optional[str]:
+	address = (drv.capabilities.get("goog:chromeOptions") or {}).get("debuggerAddress")
+	if not address:
+		return None
+	with urllib.request.urlopen(f"http://{address}/json/version", timeout=5) as resp:
+		return json.loads(resp.read())["webSocketDebuggerUrl"]
+
+
+def watch_driver(drv: Any) -> None:
+	"""Trace a Selenium Chrome driver case by case, keeping only slow or failed cases."""
+	if not TRACE_CASES or async_driver.websockets is None:
+		return
+	try:
+		ws_url = _browser_ws_url(drv)
+		if ws_url:
+			harness.add_listener(CaseTracer(ws_url))
+	except Exception as e:
+		warn(f"tracing unavailable: {e}")
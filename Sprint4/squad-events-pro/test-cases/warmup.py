@@ -0,0 +1,242 @@
+"""
+Warmup stage: heat the app server and build a warm Chrome profile for the E2E drivers
+
+What it does
+- Crawls every route of src/App.tsx (parameterized ones with a dummy id) in headless
+  Chrome, CRAWL_PASSES times, so the Vite dev server has transformed every module the
+  scripts will ask for (with --preview, the static build is simply fetched once)
+- The crawl runs in a template user-data-dir (.harness/chrome-profile), which ends up
+  with a warm HTTP cache and V8 code cache (Chrome only writes code cache for scripts it
+  has seen before, hence more than one pass)
+- apply_profile(opts) / clone_profile() give each driver its own copy of the template,
+  cloned copy-on-write where the filesystem allows it (cp --reflink=auto on Linux,
+  clonefile on macOS; a plain copy elsewhere), deleted when the script exits
+- Reports first-navigation time (until the app has rendered into #root) for a fresh
+  profile before the crawl, a fresh profile after it (warm server, cold browser) and a
+  cloned warm profile, plus what the clone cost; written to .harness\\warmup.json
+
+master.py runs it once per run and sets WARM_PROFILE=1 for the scripts.
+
+Environment options (PowerShell)
+- $env:WARMUP = "0"                    # master.py: skip the stage (same as --no-warmup)
+- $env:WARM_PROFILE = "1"              # scripts: start Chrome from a clone of the template
+- $env:WARM_PROFILE_DIR = "...\\chrome-profile"   # default: test-cases\\.harness\\chrome-profile
+
+Usage
+- python warmup.py                     (then run a script with $env:WARM_PROFILE = "1")
+"""
+
+import atexit
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+WARM_PROFILE = os.getenv("WARM_PROFILE", "0") == "1"
+WARM_PROFILE_DIR = os.getenv("WARM_PROFILE_DIR", os.path.join(HERE, ".harness", "chrome-profile"))
+REPORT_FILE = os.path.join(HERE, ".harness", "warmup.json")
+CRAWL_PASSES = 2
+RENDER_TIMEOUT_SEC = 60
+
+# Every route of src/App.tsx; ids only have to reach the page component
+ROUTES = [
+	"/",
+	"/signup",
+	"/organization-signup",
+	"/search",
+	"/my-events",
+	"/my-tickets",
+	"/create-event",
+	"/friends",
+	"/analytics",
+	"/dashboard",
+	"/approve-companies",
+	"/approve-events",
+	"/all-events",
+	"/stats",
+	"/events/warmup",
+	"/events/warmup/edit",
+	"/events/warmup/history",
+	"/scan/warmup",
+	"/warmup-not-found",
+]
+
+# Lock and port files of the Chrome that built the template must not follow it
+PROFILE_LOCKS = ["SingletonLock", "SingletonCookie", "SingletonSocket", "DevToolsActivePort", "lockfile"]
+
+# Resolves with ms since navigation start once React has rendered into #root
+RENDERED_JS = """
+const [timeoutMs, done] = arguments;
+const tick = () => {
+	const root = document.getElementById('root');
+	if (root && root.childElementCount > 0) {
+		const res = performance.getEntriesByType('resource');
+		return done({
+			rendered_ms: Math.round(performance.now()),
+			requests: res.length,
+			transfer_kb: Math.round(res.reduce((s, r) => s + (r.transferSize || 0), 0) / 1024),
+			from_cache: res.filter(r => r.transferSize === 0 && r.decodedBodySize > 0).length,
+		});
+	}
+	if (performance.now() > timeoutMs) return done({ error: 'app did not render' });
+	requestAnimationFrame(tick);
+};
+tick();
+"""
+
+_clones: List[str] = []
+
+
+def _cleanup_clones() -> None:
+	for path in _clones:
+		shutil.rmtree(path, ignore_errors=True)
+
+
+atexit.register(_cleanup_clones)
+
+
+def _copy_tree(src: str, dst: str) -> str:
+	"""Copy src's contents into the existing dst, sharing blocks where the filesystem can."""
+	try:
+		if sys.platform.startswith("linux"):
+			subprocess.run(["cp", "-a", "--reflink=auto", os.path.join(src, "."), dst], check=True, capture_output=True)
+			return "reflink"
+		if sys.platform == "darwin":
+			subprocess.run(["cp", "-c", "-R", src.rstrip("/") + "/", dst], check=True, capture_output=True)
+			return "clonefile"
+	except (OSError, subprocess.CalledProcessError):
+		pass
+	shutil.copytree(src, dst, dirs_exist_ok=True)
+	return "copy"
+
+
+def _drop_locks(profile_dir: str) -> None:
+	for name in PROFILE_LOCKS:
+		path = os.path.join(profile_dir, name)
+		if os.path.lexists(path):
+			os.remove(path)
+
+
+def clone_profile(template_dir: str = WARM_PROFILE_DIR) -> Optional[str]:
+	"""A private copy of the warm template, or None without WARM_PROFILE=1 or a template."""
+	if not WARM_PROFILE or not os.path.isdir(template_dir):
+		return None
+	clone = tempfile.mkdtemp(prefix="warm-chrome-")
+	_copy_tree(template_dir, clone)
+	_drop_locks(clone)
+	_clones.append(clone)
+	return clone
+
+
+def apply_profile(opts: Any) -> None:
+	"""Point Selenium Chrome options at a fresh clone of the warm template, if there is one."""
+	clone = clone_profile()
+	if clone:
+		opts.add_argument(f"--user-data-dir={clone}")
+
+
+def _driver(profile_dir: str) -> Any:
+	# Imported here so scripts that only clone profiles do not pay for selenium
+	from selenium import webdriver
+	from selenium.webdriver.chrome.options import Options
+	from selenium.webdriver.chrome.service import Service
+	from webdriver_manager.chrome import ChromeDriverManager
+
+	opts = Options()
+	if os.getenv("HEADLESS", "1") == "1":
+		opts.add_argument("--headless=new")
+	opts.add_argument("--window-size=1280,900")
+	opts.add_argument("--disable-gpu")
+	opts.add_argument("--no-sandbox")
+	opts.add_argument("--disable-dev-shm-usage")
+	opts.add_argument(f"--user-data-dir={profile_dir}")
+	drv = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=opts)
+	drv.set_script_timeout(RENDER_TIMEOUT_SEC + 5)
+	return drv
+
+
+def first_navigation(profile_dir: str, base_url: str) -> Dict[str, Any]:
+	"""Start Chrome on profile_dir and time its first page load of the app."""
+	drv = _driver(profile_dir)
+	try:
+		drv.get(base_url + "/")
+		return drv.execute_async_script(RENDERED_JS, RENDER_TIMEOUT_SEC * 1000)
+	finally:
+		drv.quit()
+
+
+def build_template(base_url: str, template_dir: str = WARM_PROFILE_DIR) -> Dict[str, Any]:
+	shutil.rmtree(template_dir, ignore_errors=True)
+	os.makedirs(template_dir)
+	drv = _driver(template_dir)
+	start = time.time()
+	failed: List[str] = []
+	try:
+		for _ in range(CRAWL_PASSES):
+			for route in ROUTES:
+				drv.get(base_url + route)
+				result = drv.execute_async_script(RENDERED_JS, RENDER_TIMEOUT_SEC * 1000)
+				if result.get("error") and route not in failed:
+					failed.append(route)
+	finally:
+		# Quitting flushes the caches to disk
+		drv.quit()
+	_drop_locks(template_dir)
+	return {"routes": len(ROUTES), "passes": CRAWL_PASSES, "crawl_sec": round(time.time() - start, 1), "not_rendered": failed}
+
+
+def _size_mb(path: str) -> float:
+	total = 0
+	for root, _dirs, files in os.walk(path):
+		for name in files:
+			try:
+				total += os.path.getsize(os.path.join(root, name))
+			except OSError:
+				pass
+	return round(total / (1024 * 1024), 1)
+
+
+def run(base_url: Optional[str] = None, template_dir: str = WARM_PROFILE_DIR) -> Dict[str, Any]:
+	base_url = (base_url or os.getenv("APP_BASE_URL", "http://localhost:5173")).rstrip("/")
+	report: Dict[str, Any] = {"base_url": base_url}
+	with tempfile.TemporaryDirectory(prefix="cold-chrome-") as cold:
+		report["cold_first"] = first_navigation(cold, base_url)
+	report["crawl"] = build_template(base_url, template_dir)
+	with tempfile.TemporaryDirectory(prefix="cold-chrome-") as cold:
+		report["warm_server_cold_browser"] = first_navigation(cold, base_url)
+	with tempfile.TemporaryDirectory(prefix="warm-chrome-") as clone:
+		start = time.perf_counter()
+		method = _copy_tree(template_dir, clone)
+		report["clone"] = {"method": method, "ms": round((time.perf_counter() - start) * 1000), "template_mb": _size_mb(template_dir)}
+		report["warm"] = first_navigation(clone, base_url)
+
+	os.makedirs(os.path.dirname(REPORT_FILE), exist_ok=True)
+	with open(REPORT_FILE, "w", encoding="utf-8") as fh:
+		json.dump(report, fh, indent=2)
+	crawl = report["crawl"]
+	print(f"[WARMUP] crawled {crawl['routes']} routes x{crawl['passes']} in {crawl['crawl_sec']}s"
+		+ (f"; not rendered: {', '.join(crawl['not_rendered'])}" if crawl["not_rendered"] else ""))
+	for label in ("cold_first", "warm_server_cold_browser", "warm"):
+		r = report[label]
+		if r.get("error"):
+			print(f"[WARMUP] {label}: {r['error']}")
+		else:
+			print(f"[WARMUP] {label}: first navigation {r['rendered_ms']} ms, {r['requests']} requests, "
+				f"{r['transfer_kb']} KB transferred, {r['from_cache']} from cache")
+	print(f"[WARMUP] template {report['clone']['template_mb']} MB, cloned ({report['clone']['method']}) in {report['clone']['ms']} ms")
+	return report
+
+
+def main() -> int:
+	report = run()
+	return 1 if report["warm"].get("error") else 0
+
+
+if __name__ == "__main__":
+	raise SystemExit(main())